@@ -0,0 +1,16 @@
+"""Benchmarks for the serving path.
+
+    python -m benchmarks run [--suite load,server,micro] [--out results.json]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.2]
+
+``run`` builds fixture models offline (fixtures.py), registers them in a throwaway database and
+artifact directory, and measures:
+
+* load:   POST /predict through the Flask test client at each concurrency and batch size
+* server: the same against a real local server process (``--server flask|gunicorn``)
+* micro:  ModelRuntime.load/predict, Registry operations and training.fit_csv in isolation
+
+Results are saved as JSON (results.py); ``compare`` exits non-zero when any metric regressed by
+more than the threshold. The single-purpose scripts (bench_decode, bench_executor, bench_import,
+stress_registry) stay runnable on their own.
+"""
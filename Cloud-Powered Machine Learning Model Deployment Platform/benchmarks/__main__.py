@@ -0,0 +1,97 @@
+import argparse, os, sys
+from . import fixtures, results
+
+SUITES = ("load", "server", "micro")
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "latest.json")
+
+def _ints(value):
+    return [int(x) for x in value.split(",") if x]
+
+def _print(key, r):
+    errors = f"  {r['errors']} errors" if r["errors"] else ""
+    print(f"{key:<44} {r['throughput']:>10.1f}/s  p50 {r['p50_ms']:>8.2f}  p95 {r['p95_ms']:>8.2f}  "
+          f"p99 {r['p99_ms']:>8.2f} ms{errors}", flush=True)
+
+def _report(rows, regressions, threshold):
+    for key, metric, b, c, change in rows:
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{key:<44} {metric:<10} {b:>10.2f} -> {c:>10.2f}  {change:+7.1%}{flag}")
+    print(f"{len(regressions)} regression(s) over {threshold:.0%} in {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+def run(args):
+    suites = [s for s in args.suite.split(",") if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        sys.exit(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    root = fixtures.sandbox()
+    fixture_list, skipped = fixtures.build(args.frameworks.split(",") if args.frameworks else None)
+    for framework, why in skipped.items():
+        print(f"skipping {framework}: {why}")
+    if not fixture_list:
+        sys.exit("no fixture models could be built")
+
+    from mlserve.app import app
+    fixtures.register(app.test_client(), fixture_list)
+    concurrency, batches = _ints(args.concurrency), _ints(args.batch)
+
+    out = {}
+    def collect(items):
+        for key, r in items:
+            out[key] = r
+            _print(key, r)
+
+    if "load" in suites:
+        from . import load
+        collect(load.run(fixture_list, concurrency, batches, args.requests))
+    if "server" in suites:
+        from . import load
+        with load.Server(args.server, workers=args.server_workers) as server:
+            collect(load.run(fixture_list, concurrency, batches, args.requests, server=server))
+    if "micro" in suites:
+        from . import micro
+        collect(micro.run(fixture_list, os.path.join(root, "micro"), batches, args.repeat))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    results.save(args.out, out, args={k: v for k, v in vars(args).items() if k != "func"})
+    print(f"saved {len(out)} results to {args.out}")
+    if args.baseline:
+        rows, regressions = results.compare(results.load(args.baseline), results.load(args.out), args.threshold)
+        return _report(rows, regressions, args.threshold)
+    return 0
+
+def compare(args):
+    metrics = tuple(m for m in args.metrics.split(",") if m)
+    rows, regressions = results.compare(results.load(args.baseline), results.load(args.current), args.threshold, metrics)
+    return _report(rows, regressions, args.threshold)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="Serving-path benchmarks.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="build fixtures, run the suites and save the results")
+    r.add_argument("--suite", default="load,server,micro", help=f"comma-separated, from {', '.join(SUITES)}")
+    r.add_argument("--frameworks", default=None, help="comma-separated (default: every installed one)")
+    r.add_argument("--concurrency", default="1,4,16", help="client threads, comma-separated")
+    r.add_argument("--batch", default="1,32", help="rows per request, comma-separated")
+    r.add_argument("--requests", type=int, default=400, help="requests per load point")
+    r.add_argument("--repeat", type=int, default=50, help="calls per microbenchmark")
+    r.add_argument("--server", choices=("flask", "gunicorn"), default="flask")
+    r.add_argument("--server-workers", type=int, default=2, help="gunicorn workers")
+    r.add_argument("--out", default=DEFAULT_OUT)
+    r.add_argument("--baseline", default=None, help="results file to compare this run against")
+    r.add_argument("--threshold", type=float, default=0.2, help="relative regression that fails the run")
+    r.set_defaults(func=run)
+
+    c = sub.add_parser("compare", help="compare two results files; exit 1 on a regression")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.2)
+    c.add_argument("--metrics", default=",".join(results.DEFAULT_METRICS))
+    c.set_defaults(func=compare)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Request decoding for list-of-objects inputs: pd.DataFrame(rows) vs schema-driven columns.
+
+    python -m benchmarks.bench_decode [--rows 1,100,10000] [--repeat 50]
+"""
+import argparse, json, time
+import pandas as pd
+from mlserve import formats
+from mlserve.validation import compile_validator
+
+NUM_COLS = [f"f{i}" for i in range(8)]
+STR_COLS = ["gender", "blood_group"]
+
+def make_schema():
+    props = {c: {"type": "number"} for c in NUM_COLS} | {c: {"type": "string"} for c in STR_COLS}
+    return {
+        "type": "object",
+        "properties": {"inputs": {"type": "array", "items": {
+            "type": "object", "properties": props,
+            "required": NUM_COLS + STR_COLS, "additionalProperties": False}}},
+        "required": ["inputs"],
+        "additionalProperties": False,
+    }
+
+def make_body(n):
+    rows = [{c: float(i + j) for j, c in enumerate(NUM_COLS)} | {"gender": "F", "blood_group": "O+"}
+            for i in range(n)]
+    return json.dumps({"inputs": rows}).encode()
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def run(sizes, repeat):
+    validator = compile_validator(make_schema())
+    results = []
+    for n in sizes:
+        body = make_body(n)
+        reps = max(3, repeat // max(1, n // 1000))
+
+        def baseline():
+            payload = json.loads(body)
+            return pd.DataFrame(payload["inputs"])
+
+        def columnar():
+            payload = formats.loads_json(body)
+            return formats.rows_to_frame(payload["inputs"], validator.columns)
+
+        pd.testing.assert_frame_equal(baseline(), columnar(), check_dtype=False)
+        b, c = best_of(baseline, reps), best_of(columnar, reps)
+        results.append({"rows": n, "baseline_ms": b * 1e3, "columnar_ms": c * 1e3, "speedup": b / c})
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", default="1,100,10000")
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+    print(f"json parser: {'orjson' if formats._orjson is not None else 'json'}")
+    print(f"{'rows':>7} {'DataFrame(rows) ms':>20} {'columnar ms':>12} {'speedup':>8}")
+    for r in run([int(x) for x in args.rows.split(",")], args.repeat):
+        print(f"{r['rows']:>7} {r['baseline_ms']:>20.3f} {r['columnar_ms']:>12.3f} {r['speedup']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of a CPU-bound sklearn model served in-thread vs. through the process-pool executor.
+
+    python -m benchmarks.bench_executor [--threads 8] [--rows 200] [--seconds 10] [--workers N]
+
+Client threads call the predict path concurrently, as threaded server workers would. In-thread
+inference serialises on the GIL; with the executor throughput should grow with the number of
+cores (compare runs with --workers 1..nproc).
+"""
+import argparse, os, tempfile, threading, time
+import numpy as np
+
+def _model(path, n_features=20):
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, n_features))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    joblib.dump(RandomForestClassifier(n_estimators=100, random_state=0).fit(X, y), path)
+
+def _drive(infer, batch, threads, seconds):
+    done = [0] * threads
+    deadline = time.monotonic() + seconds
+
+    def client(i):
+        while time.monotonic() < deadline:
+            infer(batch)
+            done[i] += 1
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sum(done) / seconds
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--rows", type=int, default=200)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    from mlserve.runtime import ModelRuntime
+    from mlserve.executor import ProcessExecutor
+    path = os.path.join(tempfile.mkdtemp(prefix="mlserve-bench-"), "rf.joblib")
+    _model(path)
+    batch = np.random.default_rng(1).normal(size=(args.rows, 20))
+
+    runtime = ModelRuntime(max_cache_bytes=0)
+    model = runtime.load("sklearn", path)
+    inproc = _drive(lambda x: runtime.infer("sklearn", model, x), batch, args.threads, args.seconds)
+
+    executor = ProcessExecutor("bench", "1", "sklearn", path, args.workers, max_queue=args.threads)
+    executor.infer("sklearn", None, batch)  # wait for the workers to load
+    pooled = _drive(lambda x: executor.infer("sklearn", None, x), batch, args.threads, args.seconds)
+    executor.close(wait=True)
+
+    print(f"{args.threads} client threads, {args.rows} rows/request, {os.cpu_count()} CPUs")
+    print(f"  in-thread            {inproc:8.1f} req/s")
+    print(f"  process x{args.workers:<3}        {pooled:8.1f} req/s  ({pooled / inproc:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Cold-start cost of importing the server, and which framework libraries it pulls in.
+
+    python -m benchmarks.bench_import [--repeat 5] [--module mlserve.app]
+
+Each sample imports the module in a fresh interpreter. Framework backends are imported only when
+a version using them is first loaded, so for an sklearn-only deployment none of torch,
+onnxruntime, sklearn or joblib should show up here.
+"""
+import argparse, json, os, statistics, subprocess, sys
+
+HEAVY = ("torch", "onnxruntime", "sklearn", "joblib")
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - t, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def sample(module):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+                         cwd=root, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--module", default="mlserve.app")
+    args = ap.parse_args(argv)
+
+    runs = [sample(args.module) for _ in range(args.repeat)]
+    times = sorted(r["seconds"] for r in runs)
+    print(f"import {args.module}: median {statistics.median(times) * 1000:.0f} ms, "
+          f"min {times[0] * 1000:.0f} ms over {len(times)} runs")
+    print(f"framework modules loaded at import: {', '.join(runs[-1]['loaded']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Fixture models for the benchmarks, trained offline on Iris like artifacts/examples/train_iris.py.
+
+Every fixture takes the same input, rows of four floats, so load results compare across
+frameworks. A framework whose libraries are not installed is skipped (see build()).
+"""
+import io, json, os, tempfile
+from collections import namedtuple
+
+Fixture = namedtuple("Fixture", ["name", "framework", "filename", "artifact", "schema"])
+
+N_FEATURES = 4
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"inputs": {"type": "array", "items": {
+        "type": "array", "items": {"type": "number"}, "minItems": N_FEATURES, "maxItems": N_FEATURES}}},
+    "required": ["inputs"],
+    "additionalProperties": False,
+}
+
+def sandbox(root=None):
+    """Point the server's database, artifacts, logs and jobs at a fresh directory.
+
+    Must run before anything imports mlserve (Config reads the environment once).
+    """
+    root = root or tempfile.mkdtemp(prefix="mlserve-bench-")
+    os.environ.update(
+        DB_URL=f"sqlite:///{os.path.join(root, 'mlserve.db')}",
+        ARTIFACT_DIR=os.path.join(root, "artifacts"),
+        LOG_DIR=os.path.join(root, "logs"),
+        JOB_DIR=os.path.join(root, "jobs"),
+        FLASK_ENV="production",
+    )
+    return root
+
+def _iris():
+    from sklearn.datasets import load_iris
+    X, y = load_iris(return_X_y=True)
+    return X.astype("float32"), y
+
+def _sklearn(X, y):
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    buf = io.BytesIO()
+    joblib.dump(LogisticRegression(max_iter=200).fit(X, y), buf)
+    return buf.getvalue()
+
+def _torch(X, y):
+    import torch
+    torch.manual_seed(0)
+    net = torch.nn.Sequential(torch.nn.Linear(N_FEATURES, 16), torch.nn.ReLU(), torch.nn.Linear(16, 3))
+    opt = torch.optim.Adam(net.parameters(), lr=0.05)
+    Xt, yt = torch.from_numpy(X), torch.from_numpy(y).long()
+    for _ in range(200):
+        opt.zero_grad()
+        torch.nn.functional.cross_entropy(net(Xt), yt).backward()
+        opt.step()
+    buf = io.BytesIO()
+    torch.jit.save(torch.jit.trace(net.eval(), Xt[:1]), buf)
+    return buf.getvalue()
+
+def _onnx(X, y):
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.linear_model import LogisticRegression
+    model = LogisticRegression(max_iter=200).fit(X, y)
+    # the onnx backend feeds a bare array as the input named "input"
+    onx = convert_sklearn(model, initial_types=[("input", FloatTensorType([None, N_FEATURES]))],
+                          options={id(model): {"zipmap": False}})
+    return onx.SerializeToString()
+
+_BUILDERS = [
+    ("sklearn", "model.joblib", _sklearn),
+    ("torch", "model.pt", _torch),
+    ("onnx", "model.onnx", _onnx),
+]
+
+def build(frameworks=None):
+    """Return ``(fixtures, skipped)``; ``skipped`` maps framework -> why it has no fixture."""
+    X, y = _iris()
+    fixtures, skipped = [], {}
+    for framework, filename, builder in _BUILDERS:
+        if frameworks and framework not in frameworks:
+            continue
+        try:
+            artifact = builder(X, y)
+        except ImportError as e:
+            skipped[framework] = str(e)
+            continue
+        fixtures.append(Fixture(f"bench-{framework}", framework, filename, artifact, SCHEMA))
+    return fixtures, skipped
+
+def rows(n, seed=0):
+    """``n`` Iris-like input rows."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return np.round(rng.uniform(0.1, 7.9, size=(n, N_FEATURES)), 1).tolist()
+
+def auth_headers():
+    import base64
+    from mlserve.config import Config
+    token = base64.b64encode(f"{Config.AUTH_USERNAME}:{Config.AUTH_PASSWORD}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+def register(client, fixtures, version="1.0"):
+    """Register and activate every fixture through the API of a Flask test client."""
+    headers = auth_headers()
+    for f in fixtures:
+        r = client.post("/models/register", headers=headers, content_type="multipart/form-data", data={
+            "name": f.name, "version": version, "framework": f.framework,
+            "artifact": (io.BytesIO(f.artifact), f.filename),
+            "input_schema": (io.BytesIO(json.dumps(f.schema).encode()), "schema.json"),
+        })
+        if r.status_code != 200:
+            raise RuntimeError(f"registering {f.name} failed: {r.status_code} {r.get_data(as_text=True)[:200]}")
+        r = client.post(f"/models/{f.name}/activate", headers=headers, json={"version": version})
+        if r.status_code != 200:
+            raise RuntimeError(f"activating {f.name} failed: {r.status_code}")
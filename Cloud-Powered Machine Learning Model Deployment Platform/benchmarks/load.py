@@ -0,0 +1,142 @@
+"""Closed-loop load on POST /predict: each client thread sends its next request as soon as the
+previous one returns, through the Flask test client or over HTTP to a real local server."""
+import http.client, json, os, socket, subprocess, sys, threading, time
+import urllib.request
+from . import fixtures
+from .results import summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def drive(make_send, concurrency, requests, warmup=10):
+    """Run ``requests`` calls split over ``concurrency`` threads; ``make_send()`` is called once per
+    thread and returns a ``send()`` that performs one request and returns True on success."""
+    send = make_send()
+    for _ in range(warmup):
+        send()
+    per_thread = max(1, requests // concurrency)
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start = threading.Barrier(concurrency + 1)
+
+    def client(i):
+        send = make_send()
+        start.wait()
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            ok = send()
+            latencies[i].append(time.perf_counter() - t0)
+            errors[i] += not ok
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return summarize([x for lat in latencies for x in lat], elapsed, sum(errors))
+
+def _body(batch):
+    return json.dumps({"inputs": fixtures.rows(batch)}).encode()
+
+def client_sender(app, path, body, headers):
+    def make_send():
+        client = app.test_client()
+
+        def send():
+            return client.post(path, data=body, headers=headers, content_type="application/json").status_code == 200
+        return send
+    return make_send
+
+def http_sender(host, port, path, body, headers):
+    headers = dict(headers, **{"Content-Type": "application/json"})
+
+    def make_send():
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+
+        def send():
+            try:
+                conn.request("POST", path, body, headers)
+                r = conn.getresponse()
+                r.read()
+                return r.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()  # reconnects on the next request
+                return False
+        return send
+    return make_send
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Server:
+    """A server process on a free local port, serving the sandbox database (fixtures.sandbox)."""
+
+    def __init__(self, kind="flask", workers=2, ready_timeout=120):
+        self.kind = kind
+        self.workers = workers
+        self.ready_timeout = ready_timeout
+        self.host, self.port = "127.0.0.1", _free_port()
+        self._proc = None
+        self._out = None
+
+    def __enter__(self):
+        env = dict(os.environ, SERVER_HOST=self.host, SERVER_PORT=str(self.port), WEB_CONCURRENCY=str(self.workers))
+        if self.kind == "gunicorn":
+            cmd = [sys.executable, "-m", "gunicorn", "-c", "python:mlserve.gunicorn_conf", "mlserve.app:app"]
+        else:
+            cmd = [sys.executable, "-m", "mlserve.app"]
+        os.makedirs(os.environ["LOG_DIR"], exist_ok=True)
+        self._out = open(os.path.join(os.environ["LOG_DIR"], f"bench-{self.kind}.out"), "wb")
+        self._proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=self._out, stderr=subprocess.STDOUT)
+        try:
+            self._wait_ready()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"{self.kind} server exited with {self._proc.returncode}, see {self._out.name}")
+            try:
+                with urllib.request.urlopen(f"http://{self.host}:{self.port}/ready", timeout=2) as r:
+                    if r.status == 200:
+                        return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{self.kind} server not ready after {self.ready_timeout}s, see {self._out.name}")
+
+    def __exit__(self, *exc):
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._out.close()
+
+def run(fixture_list, concurrency, batches, requests, server=None):
+    """Load results keyed ``load/<framework>/c<threads>/b<rows>`` (``server/...`` over HTTP).
+
+    Without ``server`` requests go through the Flask test client in this process.
+    """
+    from mlserve.app import app
+    headers = fixtures.auth_headers()
+    prefix = "server" if server is not None else "load"
+    for f in fixture_list:
+        path = f"/predict/{f.name}"
+        for batch in batches:
+            body = _body(batch)
+            if server is not None:
+                make_send = http_sender(server.host, server.port, path, body, headers)
+            else:
+                make_send = client_sender(app, path, body, headers)
+            for c in concurrency:
+                yield f"{prefix}/{f.framework}/c{c}/b{batch}", drive(make_send, c, requests)
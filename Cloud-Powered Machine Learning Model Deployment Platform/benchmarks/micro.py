@@ -0,0 +1,67 @@
+"""Microbenchmarks of the pieces behind a request, each timed in isolation."""
+import itertools, os, time
+from . import fixtures
+from .results import summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def timed(fn, repeat):
+    latencies = []
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - t0)
+
+def runtime(fixture_list, workdir, batches, repeat):
+    """ModelRuntime.load (cold: unloaded after every call) and ModelRuntime.predict per batch size."""
+    from mlserve.runtime import ModelRuntime
+    rt = ModelRuntime()
+    for f in fixture_list:
+        path = os.path.join(workdir, f.framework, f.filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(f.artifact)
+
+        def cold_load():
+            rt.load(f.framework, path)
+            rt.unload(f.framework, path)
+
+        yield f"micro/runtime.load/{f.framework}", timed(cold_load, max(5, repeat // 5))
+        model = rt.load(f.framework, path)
+        for batch in batches:
+            payload = {"inputs": fixtures.rows(batch)}
+            yield f"micro/runtime.predict/{f.framework}/b{batch}", timed(lambda: rt.predict(f.framework, model, payload), repeat)
+
+def registry(fixture, workdir, repeat):
+    """Registry.register / activate / resolve_active / list_models on the sandbox database."""
+    from mlserve.registry import Registry
+    from mlserve.training import LocalFile
+    reg = Registry()
+    src = os.path.join(workdir, "registry", fixture.filename)
+    os.makedirs(os.path.dirname(src), exist_ok=True)
+    with open(src, "wb") as fh:
+        fh.write(fixture.artifact)
+    name = "bench-registry"
+    versions = (f"v{i}" for i in itertools.count())
+    yield "micro/registry.register", timed(
+        lambda: reg.register(name, next(versions), fixture.framework, LocalFile(src, fixture.filename)), repeat)
+    toggle = itertools.cycle(["v0", "v1"])
+    yield "micro/registry.activate", timed(lambda: reg.activate(name, next(toggle)), repeat)
+    reg.resolve_active(name)
+    yield "micro/registry.resolve_active", timed(lambda: reg.resolve_active(name), repeat * 10)
+    yield "micro/registry.list_models", timed(reg.list_models, repeat)
+
+def training(repeat):
+    """training.fit_csv on the bundled Iris.csv."""
+    from mlserve.training import fit_csv
+    csv_path = os.path.join(ROOT, "Iris.csv")
+    yield "micro/training.fit_csv", timed(lambda: fit_csv(csv_path, "Species"), repeat)
+
+def run(fixture_list, workdir, batches, repeat):
+    yield from runtime(fixture_list, workdir, batches, repeat)
+    sklearn = next((f for f in fixture_list if f.framework == "sklearn"), None)
+    if sklearn is not None:
+        yield from registry(sklearn, workdir, repeat)
+    yield from training(max(3, repeat // 10))
@@ -0,0 +1,66 @@
+"""Latency summaries, the results file, and regression comparison between two runs.
+
+A results file is ``{"meta": {...}, "results": {key: {metric: value}}}``. Metrics ending in
+``_ms`` are latencies (lower is better); ``throughput`` is per second (higher is better).
+"""
+import json, os, platform, sys
+from datetime import datetime, timezone
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(latencies, elapsed, errors=0):
+    """Throughput and p50/p95/p99 (ms) from per-call latencies in seconds."""
+    lat = sorted(latencies)
+    return {
+        "calls": len(lat),
+        "errors": errors,
+        "throughput": len(lat) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(lat, 0.50) * 1e3,
+        "p95_ms": percentile(lat, 0.95) * 1e3,
+        "p99_ms": percentile(lat, 0.99) * 1e3,
+    }
+
+def meta(args=None):
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": args or {},
+    }
+
+def save(path, results, args=None):
+    with open(path, "w") as fh:
+        json.dump({"meta": meta(args), "results": results}, fh, indent=2, sort_keys=True)
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+DEFAULT_METRICS = ("throughput", "p50_ms", "p95_ms")
+
+def compare(baseline, current, threshold=0.2, metrics=DEFAULT_METRICS):
+    """Return ``(rows, regressions)`` for every metric present in both runs.
+
+    Each row is ``(key, metric, baseline, current, change)`` where ``change`` is the relative
+    change in the "worse" direction (positive = slower); it is a regression above ``threshold``.
+    """
+    rows, regressions = [], []
+    base, cur = baseline["results"], current["results"]
+    for key in sorted(set(base) & set(cur)):
+        for metric in metrics:
+            b, c = base[key].get(metric), cur[key].get(metric)
+            if not b or c is None:
+                continue
+            change = (b - c) / b if metric == "throughput" else (c - b) / b
+            row = (key, metric, b, c, change)
+            rows.append(row)
+            if change > threshold:
+                regressions.append(row)
+    return rows, regressions
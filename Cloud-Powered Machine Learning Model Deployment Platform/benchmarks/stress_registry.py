@@ -0,0 +1,100 @@
+"""Concurrency stress for the registry database: many processes registering, activating and
+predicting against the same models at once.
+
+    python -m benchmarks.stress_registry [--workers 8] [--seconds 20] [--models 3] [--db-url URL]
+
+Each worker is a separate process with its own app instance (as gunicorn workers are), all
+sharing one database and ARTIFACT_DIR. Any 5xx response, and in particular SQLite's
+"database is locked", makes the run exit non-zero.
+"""
+import argparse, base64, collections, io, json, multiprocessing, os, sys, tempfile, time
+
+def _artifact():
+    import joblib
+    from sklearn.dummy import DummyClassifier
+    buf = io.BytesIO()
+    joblib.dump(DummyClassifier(strategy="most_frequent").fit([[0.0, 0.0]], ["a"]), buf)
+    return buf.getvalue()
+
+SCHEMA = json.dumps({"type": "object", "properties": {"inputs": {"type": "array", "items": {
+    "type": "array", "items": {"type": "number"}, "minItems": 2, "maxItems": 2}}},
+    "required": ["inputs"]}).encode()
+
+def _worker(wid, seconds, models, results):
+    try:
+        from mlserve.app import app
+        from mlserve.config import Config
+    except Exception as e:  # e.g. a locked database while creating the schema
+        results.put((wid, {"startup 599": 1}, [f"startup: {e}"]))
+        raise
+    client = app.test_client()
+    auth = base64.b64encode(f"{Config.AUTH_USERNAME}:{Config.AUTH_PASSWORD}".encode()).decode()
+    headers = {"Authorization": f"Basic {auth}"}
+    artifact = _artifact()
+    counts = collections.Counter()
+    errors = []
+    deadline = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < deadline:
+        name = f"stress{i % models}"
+        version = f"w{wid}-{i}"
+        calls = [
+            ("register", lambda: client.post("/models/register", headers=headers, data={
+                "name": name, "version": version, "framework": "sklearn",
+                "artifact": (io.BytesIO(artifact), "model.joblib"),
+                "input_schema": (io.BytesIO(SCHEMA), "schema.json")}, content_type="multipart/form-data")),
+            ("activate", lambda: client.post(f"/models/{name}/activate", headers=headers, json={"version": version})),
+            ("predict", lambda: client.post(f"/predict/{name}", headers=headers, json={"inputs": [[1.0, 2.0]]})),
+            ("list", lambda: client.get("/models?limit=10")),
+        ]
+        for op, call in calls:
+            try:
+                status = call().status_code
+            except Exception as e:  # the app re-raises outside its handlers only on bugs
+                status = 599
+                errors.append(f"{op}: {e}")
+            counts[f"{op} {status}"] += 1
+        i += 1
+    results.put((wid, dict(counts), errors[:5]))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--seconds", type=float, default=20)
+    ap.add_argument("--models", type=int, default=3, help="model names the workers contend on")
+    ap.add_argument("--db-url", default=None, help="default: a fresh SQLite file in a temp dir")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="mlserve-stress-")
+    os.environ["DB_URL"] = args.db_url or f"sqlite:///{tmp}/mlserve.db"
+    os.environ.setdefault("ARTIFACT_DIR", os.path.join(tmp, "artifacts"))
+    os.environ.setdefault("LOG_DIR", os.path.join(tmp, "logs"))
+    os.environ.setdefault("PRELOAD_ON_START", "0")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(w, args.seconds, args.models, results)) for w in range(args.workers)]
+    started = time.monotonic()
+    for p in procs:
+        p.start()
+    totals = collections.Counter()
+    errors = []
+    for _ in procs:
+        _, counts, errs = results.get()
+        totals.update(counts)
+        errors.extend(errs)
+    for p in procs:
+        p.join()
+    elapsed = time.monotonic() - started
+
+    print(f"{args.workers} workers, {elapsed:.1f}s, db={os.environ['DB_URL']}")
+    for key in sorted(totals):
+        print(f"  {key:<16} {totals[key]:>7}")
+    server_errors = sum(n for k, n in totals.items() if int(k.rsplit(" ", 1)[1]) >= 500)
+    for e in errors[:10]:
+        print("  error:", e)
+    print(f"  {sum(totals.values()) / elapsed:.0f} requests/s, {server_errors} server errors")
+    return 1 if server_errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Admission control: per-version concurrency and queue limits for /predict.
+
+A version whose options contain ``{"admission": {"max_concurrency": 4, "max_queue": 16}}`` runs
+at most ``max_concurrency`` requests at a time in each worker process; up to ``max_queue`` more
+wait in FIFO order for a slot and the rest are shed at once. A queued request also gives up when
+its deadline passes, or after ``max_wait_ms``. The deadline is the client's time budget, sent in
+milliseconds in the DEADLINE_HEADER request header, and applies to every version. A request
+that cannot finish inside its budget is shed as early as possible: at admission, when the
+expected queue wait already exceeds what remains, or just before inference when it has run out.
+"""
+import collections, math, threading, time
+from concurrent.futures import Future
+from prometheus_client import Counter, Gauge
+from .config import Config
+
+ADMISSION_SHED = Counter(
+    "mlserve_admission_shed_total", "Requests rejected by admission control", ["model", "version", "reason"],
+)
+ADMISSION_QUEUED = Counter(
+    "mlserve_admission_queued_total", "Requests that waited for a concurrency slot", ["model", "version"],
+)
+ADMISSION_WAITING = Gauge(
+    "mlserve_admission_waiting_requests", "Requests waiting for a concurrency slot", ["model", "version"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "mlserve_admission_in_flight_requests", "Requests holding a concurrency slot", ["model", "version"],
+)
+
+class Rejected(RuntimeError):
+    """A request shed by admission control.
+
+    ``reason`` is ``queue_full`` (answered 429), ``queue_timeout`` or ``deadline`` (503);
+    ``retry_after`` is a whole number of seconds.
+    """
+
+    def __init__(self, reason, message, retry_after=1):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+def admission_options(options):
+    """Normalise a version's ``admission`` option to ``(max_concurrency, max_queue, max_wait_s)``,
+    or None when the version is not limited. Raises ValueError for a malformed option."""
+    opt = (options or {}).get("admission")
+    if not opt:
+        return None
+    if not isinstance(opt, dict):
+        raise ValueError('the "admission" option must be a JSON object')
+    if not opt.get("enabled", True):
+        return None
+    try:
+        max_concurrency = max(1, int(opt.get("max_concurrency", 1)))
+        max_queue = max(0, int(opt.get("max_queue", Config.ADMISSION_MAX_QUEUE)))
+        max_wait = float(opt.get("max_wait_ms", Config.ADMISSION_MAX_WAIT_MS)) / 1000.0
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("admission max_concurrency, max_queue and max_wait_ms must be numbers")
+    if not math.isfinite(max_wait):
+        raise ValueError("admission max_wait_ms must be finite")
+    return max_concurrency, max_queue, max(0.0, max_wait)
+
+def deadline(header, start):
+    """The monotonic deadline of a request that arrived at ``start`` and sent ``header``, or None.
+    Raises ValueError when the header is not a number of milliseconds."""
+    if not header:
+        return None
+    budget = float(header)
+    if not math.isfinite(budget) or budget < 0:
+        raise ValueError(f"{Config.DEADLINE_HEADER} must be a non-negative number of milliseconds")
+    return start + budget / 1000.0
+
+class Ticket(Future):
+    """A place in a Limiter: resolved once the request holds a slot."""
+    granted = None  # time.monotonic() when the slot was handed over
+
+class Limiter:
+    """Concurrency slots and a bounded FIFO queue for one model version."""
+
+    def __init__(self, name, version, settings):
+        self.name = name
+        self.version = version
+        self.settings = settings
+        self.running = 0
+        self._waiters = collections.deque()
+        self._service = 0.0  # moving average of how long a slot is held (s)
+        self._lock = threading.Lock()
+
+    def configure(self, settings):
+        """Apply new limits in place; a larger limit hands slots to waiting requests at once."""
+        with self._lock:
+            self.settings = settings
+            self._grant()
+
+    def retry_after(self):
+        return max(1, math.ceil(self.expected_wait()))
+
+    def expected_wait(self):
+        """How long a request queued now would wait for a slot (s), from the recent service time."""
+        max_concurrency = self.settings[0]
+        if self.running < max_concurrency and not self._waiters:
+            return 0.0
+        return self._service * (len(self._waiters) + 1) / max_concurrency
+
+    def enter(self, deadline=None):
+        """Return a Ticket for a slot, already resolved when one is free. Raises Rejected when
+        the queue is full or the wait for a slot would run past ``deadline``."""
+        max_concurrency, max_queue, _ = self.settings
+        ticket = Ticket()
+        with self._lock:
+            if self.running < max_concurrency and not self._waiters:
+                self.running += 1
+                self._gauges()
+                ticket.granted = time.monotonic()
+                ticket.set_result(None)
+                return ticket
+            if len(self._waiters) >= max_queue:
+                raise self._shed("queue_full", f"Too many requests for {self.name}:{self.version} "
+                                               f"({self.running} running, {len(self._waiters)} queued)")
+            wait = self.expected_wait()
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise self._shed("deadline", f"Request deadline is shorter than the expected wait of {wait * 1e3:.0f} ms "
+                                             f"for {self.name}:{self.version}")
+            self._waiters.append(ticket)
+            self._gauges()
+        ADMISSION_QUEUED.labels(model=self.name, version=self.version).inc()
+        return ticket
+
+    def wait_limit(self, deadline=None):
+        """How long a queued request may wait for its slot (s)."""
+        max_wait = self.settings[2]
+        if deadline is None:
+            return max_wait
+        return max(0.0, min(max_wait, deadline - time.monotonic()))
+
+    def abandon(self, ticket, deadline=None):
+        """Leave the queue. Raises Rejected if the ticket was still waiting; returns quietly when
+        its slot was granted in the meantime (the caller holds it and must leave())."""
+        with self._lock:
+            try:
+                self._waiters.remove(ticket)
+            except ValueError:
+                return
+            self._gauges()
+            reason = "deadline" if deadline is not None and time.monotonic() >= deadline else "queue_timeout"
+            raise self._shed(reason, f"Timed out waiting for a free slot for {self.name}:{self.version}")
+
+    def cancel(self, ticket):
+        """Drop a ticket whatever its state: out of the queue, or its slot given back."""
+        with self._lock:
+            try:
+                self._waiters.remove(ticket)
+                self._gauges()
+                return
+            except ValueError:
+                pass
+        if ticket.done():
+            self.leave(ticket)
+
+    def leave(self, ticket):
+        """Give a granted slot back, to the longest waiting request if any."""
+        held = time.monotonic() - ticket.granted
+        with self._lock:
+            self._service = held if not self._service else 0.8 * self._service + 0.2 * held
+            self.running -= 1
+            self._grant()
+
+    def _grant(self):
+        # under the lock
+        while self._waiters and self.running < self.settings[0]:
+            ticket = self._waiters.popleft()
+            self.running += 1
+            ticket.granted = time.monotonic()
+            ticket.set_result(None)
+        self._gauges()
+
+    def _gauges(self):
+        ADMISSION_WAITING.labels(model=self.name, version=self.version).set(len(self._waiters))
+        ADMISSION_IN_FLIGHT.labels(model=self.name, version=self.version).set(self.running)
+
+    def _shed(self, reason, message):
+        ADMISSION_SHED.labels(model=self.name, version=self.version, reason=reason).inc()
+        return Rejected(reason, message, self.retry_after())
+
+def shed_expired(name, version, message="Request deadline passed before inference"):
+    """Count and return the rejection of a request whose deadline has run out."""
+    ADMISSION_SHED.labels(model=name, version=version or "", reason="deadline").inc()
+    return Rejected("deadline", message)
+
+class AdmissionPool:
+    """One Limiter per (model, version) whose options enable admission control."""
+
+    def __init__(self):
+        self._limiters = {}  # (name, version) -> Limiter
+        self._lock = threading.Lock()
+
+    def get(self, active):
+        """Return the limiter for ``active``, or None if it is not limited. Changed options are
+        applied to the existing limiter, so requests already admitted keep their slots."""
+        opts = admission_options(active.options)
+        key = (active.name, active.version)
+        current = self._limiters.get(key)
+        if opts is None:
+            if current is not None:
+                with self._lock:
+                    self._limiters.pop(key, None)
+            return None
+        if current is not None:
+            if current.settings != opts:
+                current.configure(opts)
+            return current
+        with self._lock:
+            current = self._limiters.get(key)
+            if current is None:
+                current = self._limiters[key] = Limiter(active.name, active.version, opts)
+                # limiters of the previous versions are dropped; their requests still leave() them
+                for k in [k for k in self._limiters if k[0] == active.name and k != key]:
+                    del self._limiters[k]
+        return current
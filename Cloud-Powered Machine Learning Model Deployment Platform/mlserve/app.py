@@ -1,18 +1,51 @@
-from flask import Flask, request, jsonify, render_template, abort
+from flask import Flask, Response, request, jsonify, render_template, abort, send_file, g
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-import time, json
-from jsonschema import validate as json_validate, ValidationError
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
+from concurrent import futures
+import os, time, json, base64, hashlib, threading
+from collections import OrderedDict
+from jsonschema import SchemaError, ValidationError
 from .config import Config
-from .logging_utils import setup_logging
+from .logging_utils import setup_logging, log_prediction, prediction_sample_rate
 from .auth import require_basic_auth
 from .registry import Registry
-from .runtime import ModelRuntime
-
-setup_logging()
+from .validation import compile_validator
+from .runtime import ModelRuntime, jsonable, runtime_options
+from . import formats, batch, training
+from .batching import BatcherPool, batching_options
+from .executor import ExecutorPool, ExecutorBusy, executor_options
+from .admission import AdmissionPool, Rejected, admission_options, deadline, shed_expired
+from .result_cache import ResultCache, cache_options, select_rows
+from .backends import known_frameworks
+from .tracing import Trace, UNKNOWN
+from .warmup import Warmer
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
-registry = Registry()
-runtime = ModelRuntime()
+# larger request bodies get a 413 (mlserve.asgi reads the same setting); 0 lifts the limit
+app.config["MAX_CONTENT_LENGTH"] = Config.MAX_REQ_BODY_MB * 1024 * 1024 or None
+if __name__ == "__mp_main__":
+    # re-imported as the main module of a spawned executor, scoring or training process, which
+    # only runs the function it was started with: open no log files, database or pools here
+    registry = runtime = batchers = executors = admissions = result_cache = warmer = None
+else:
+    setup_logging()
+    registry = Registry()
+    runtime = ModelRuntime()
+    batchers = BatcherPool(runtime)
+    executors = ExecutorPool()
+    admissions = AdmissionPool()
+    result_cache = ResultCache()
+    warmer = Warmer(registry, runtime)
+    if Config.PRELOAD_IN_MASTER:
+        # imported once in the gunicorn master (preload_app): load synchronously so the models are
+        # resident before fork, then move them out of the GC's reach so workers share the pages
+        import gc
+        warmer.preload()
+        gc.freeze()
+    elif Config.PRELOAD_ON_START:
+        warmer.start()
+    else:
+        warmer.state = "ready"
 
 REQUEST_COUNT = Counter("mlserve_requests_total", "Total requests", ["endpoint", "model", "status"])
 LATENCY = Histogram("mlserve_request_latency_seconds", "Request latency (s)", ["endpoint", "model"])
@@ -33,97 +66,47 @@ def train_csv():
     version = request.form.get("version") or "1.0.0"
     target = request.form.get("target")
     algo = request.form.get("algo") or "auto"
+    n_jobs = request.form.get("n_jobs")
+    mode = request.form.get("mode") or None
     csv_file = request.files.get("csv")
     if not all([name, target, csv_file]):
         abort(400, description="Missing required fields: name, target, csv")
+    if mode not in (None, "batch", "stream"):
+        abort(400, description="mode must be 'batch' or 'stream'")
+    if mode == "batch" and algo in training.STREAM_ALGOS:
+        abort(400, description=f"Algorithm '{algo}' is only available in stream mode")
+    if mode == "stream" and algo not in training.STREAM_ALGOS + ("auto",):
+        abort(400, description=f"Algorithm '{algo}' cannot be trained in stream mode")
+    if n_jobs is not None and n_jobs != "":
+        try:
+            n_jobs = int(n_jobs)
+        except ValueError:
+            abort(400, description="n_jobs must be an integer")
 
-    import pandas as pd
-    from sklearn.model_selection import train_test_split
-    from sklearn.preprocessing import OneHotEncoder
-    from sklearn.compose import ColumnTransformer
-    from sklearn.pipeline import Pipeline
-    from sklearn.linear_model import LogisticRegression, LinearRegression
-    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-    import joblib, os, json, shutil
-
-    df = pd.read_csv(csv_file)
-    if target not in df.columns:
-        abort(400, description=f"Target column '{target}' not found. Columns: {list(df.columns)}")
-    y = df[target]
-    X = df.drop(columns=[target])
-
-    cat_cols = [c for c in X.columns if X[c].dtype == 'object']
-    num_cols = [c for c in X.columns if c not in cat_cols]
-
-    pre = ColumnTransformer(
-        transformers=[
-            ('num', 'passthrough', num_cols),
-            ('cat', OneHotEncoder(handle_unknown='ignore', sparse=False), cat_cols),
-        ]
-    )
-
-    # choose task
-    if algo in ("logreg","rf_clf"):
-        is_classification = True
-    elif algo in ("linreg","rf_reg"):
-        is_classification = False
-    else:
-        is_classification = (y.dtype == 'object') or (y.nunique() <= 20)
+    job_id, csv_path = training.create_job(name, version, target, algo, n_jobs or None, mode)
+    csv_file.save(csv_path)
+    training.submit(job_id)
+    return jsonify({"ok": True, "job": training.job_status(job_id)}), 202
 
-    if is_classification:
-        model = RandomForestClassifier(n_estimators=200, random_state=42) if algo=="rf_clf" else LogisticRegression(max_iter=1000)
-    else:
-        model = RandomForestRegressor(n_estimators=200, random_state=42) if algo=="rf_reg" else LinearRegression()
-
-    pipe = Pipeline(steps=[('pre', pre), ('model', model)])
-    Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.2, random_state=42)
-    pipe.fit(Xtr, ytr)
-    score = pipe.score(Xte, yte)
-
-    # Save artifact
-    os.makedirs(os.path.join(Config.ARTIFACT_DIR, name, version), exist_ok=True)
-    artifact_path = os.path.join(Config.ARTIFACT_DIR, name, version, "trained.joblib")
-    joblib.dump(pipe, artifact_path)
-
-    # schema: list of objects with original feature names
-    schema = {
-        "$schema": "https://json-schema.org/draft/2020-12/schema",
-        "title": f"{name}_request",
-        "type": "object",
-        "properties": {
-            "inputs": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {col: {"type": "number"} for col in num_cols} | {col: {"type": "string"} for col in cat_cols},
-                    "required": num_cols + cat_cols,
-                    "additionalProperties": False
-                }
-            }
-        },
-        "required": ["inputs"],
-        "additionalProperties": False
-    }
-    schema_json = json.dumps(schema)
-
-    # wrap local file to fit registry.register interface
-    import os, shutil  # make sure these are imported at the top of the file
-
-    class LocalFile:
-        def __init__(self, src, filename):
-            self.filename = filename
-            self._src = src
-        def save(self, dst):
-            # Skip copy if source and destination are the same (Windows-safe)
-            if os.path.abspath(self._src) == os.path.abspath(dst):
-                return
-            shutil.copyfile(self._src, dst)
-
-
-    fwrap = LocalFile(artifact_path, "trained.joblib")
-    out = registry.register(name=name, version=version, framework="sklearn", file_storage=fwrap, input_schema=schema_json)
-
-    return jsonify({"ok": True, "trained": {"name": name, "version": version, "artifact": artifact_path, "score": score}, "registered": out})
+@app.get("/train/jobs/<int:job_id>")
+def training_job_status(job_id):
+    require_basic_auth()
+    status = training.job_status(job_id)
+    if status is None:
+        abort(404, description=f"Training job {job_id} not found")
+    return jsonify({"ok": True, "job": status})
+
+# parsers of the per-version option blocks; each raises ValueError for a block it cannot use
+OPTION_PARSERS = (batching_options, executor_options, admission_options, cache_options, runtime_options,
+                  prediction_sample_rate)
+
+def _check_options(options):
+    # refuse bad options up front rather than failing every /predict of the version
+    try:
+        for parse in OPTION_PARSERS:
+            parse(options)
+    except ValueError as e:
+        abort(400, description=f"Invalid options: {e}")
 
 @app.post("/models/register")
 def register_model():
@@ -133,16 +116,34 @@ def register_model():
     framework = request.form.get("framework")
     f = request.files.get("artifact")
     input_schema = request.files.get("input_schema")
+    options = request.form.get("options")
     if not all([name, version, framework, f]):
         abort(400, description="Missing required fields: name, version, framework, artifact")
+    if framework not in known_frameworks():
+        abort(400, description=f"Unsupported framework '{framework}'; available: {', '.join(known_frameworks())}")
+    if options:
+        try:
+            options = json.loads(options)
+        except Exception:
+            abort(400, description="options must be valid JSON")
+        if not isinstance(options, dict):
+            abort(400, description="options must be a JSON object")
+        _check_options(options)
     schema_json = None
     if input_schema:
         schema_json = input_schema.read().decode("utf-8")
         try:
-            json.loads(schema_json)
+            schema = json.loads(schema_json)
         except Exception:
             abort(400, description="input_schema must be valid JSON")
-    out = registry.register(name=name, version=version, framework=framework, file_storage=f, input_schema=schema_json)
+        if not isinstance(schema, dict):
+            abort(400, description="input_schema must be a JSON object")
+        try:
+            compile_validator(schema)  # what /predict will run: a schema it rejects is refused now
+        except SchemaError as e:
+            abort(400, description=f"input_schema is not a valid JSON Schema: {e.message}")
+    out = registry.register(name=name, version=version, framework=framework, file_storage=f,
+                            input_schema=schema_json, options=options or None)
     return jsonify({"ok": True, "model": out})
 
 @app.post("/models/<name>/activate")
@@ -153,55 +154,345 @@ def activate_version(name):
     if not version:
         abort(400, description="Provide 'version' in JSON body")
     out = registry.activate(name, version)
+    # start loading the new version now; requests keep using the old one until it is resident
+    active = registry.resolve_active(name)
+    if active is not None:
+        warmer.swap_async(active)
     return jsonify({"ok": True, "activation": out})
 
+@app.post("/models/<name>/versions/<version>/options")
+def set_version_options(name, version):
+    require_basic_auth()
+    payload = request.get_json(force=True, silent=True)
+    if not isinstance(payload, dict):
+        abort(400, description="Provide the options as a JSON object")
+    _check_options(payload)
+    try:
+        out = registry.set_options(name, version, payload)
+    except ValueError as e:
+        abort(404, description=str(e))
+    return jsonify({"ok": True, "options": out})
+
+# Rendered GET /models pages keyed by (registry generation, query). register/activate/set_options
+# bump the generation, so stale pages are never served and polling clients get 304s meanwhile.
+_models_cache = OrderedDict()
+_models_cache_lock = threading.Lock()
+
+def _encode_cursor(name):
+    return base64.urlsafe_b64encode(name.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor):
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        abort(400, description="Invalid cursor")
+
 @app.get("/models")
 def list_models():
-    return jsonify({"ok": True, "models": registry.list_models()})
+    args = request.args
+    try:
+        limit = int(args.get("limit", Config.MODELS_PAGE_SIZE))
+    except ValueError:
+        abort(400, description="limit must be an integer")
+    if not 1 <= limit <= Config.MODELS_MAX_PAGE_SIZE:
+        abort(400, description=f"limit must be between 1 and {Config.MODELS_MAX_PAGE_SIZE}")
+    prefix = args.get("prefix") or None
+    framework = args.get("framework") or None
+    active_only = args.get("active_only", "").lower() in ("1", "true", "yes")
+    cursor = args.get("cursor") or None
+    after = _decode_cursor(cursor) if cursor else None
+
+    key = (registry.generation(), prefix, framework, active_only, limit, after)
+    with _models_cache_lock:
+        hit = _models_cache.get(key)
+        if hit is not None:
+            _models_cache.move_to_end(key)
+    if hit is None:
+        models, last = registry.page_models(prefix=prefix, framework=framework, active_only=active_only,
+                                            limit=limit, after=after)
+        body = json.dumps({"ok": True, "models": models,
+                           "next_cursor": _encode_cursor(last) if last is not None else None})
+        hit = (body, hashlib.sha1(body.encode()).hexdigest())
+        with _models_cache_lock:
+            if any(k[0] != key[0] for k in _models_cache):
+                _models_cache.clear()  # generation moved on: every cached page is stale
+            _models_cache[key] = hit
+            while len(_models_cache) > Config.MODELS_CACHE_SIZE:
+                _models_cache.popitem(last=False)
+    body, etag = hit
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"  # always revalidate; the 304 is the cheap path
+    return resp
+
+def _validate(active, payload, trace):
+    if active.validator is not None:
+        with trace.stage("validation"):
+            try:
+                if formats.is_columnar(payload.get("inputs")):
+                    active.validator.validate_columnar(payload["inputs"])
+                else:
+                    active.validator.validate(payload)
+            except ValidationError as e:
+                abort(400, description=f"Schema validation failed: {e.message}")
+
+def _infer(active, model, payload, trace, timeout=None):
+    # validated rows of a tabular schema: decode straight into typed columns
+    inputs = payload.get("inputs")
+    if (active.validator is not None and active.validator.columns and active.framework == "sklearn"
+            and isinstance(inputs, list) and inputs):
+        with trace.stage("decode"):
+            payload = {"inputs": formats.rows_to_frame(inputs, active.validator.columns)}
+
+    executor = executors.get(active)
+    batcher = batchers.get(active, model, executor)
+    try:
+        with trace.stage("inference"):
+            if batcher is not None:
+                return batcher.predict(payload, timeout)
+            if executor is not None:
+                return executor.infer(active.framework, model, payload.get("inputs"), timeout)
+            return runtime.infer(active.framework, model, payload.get("inputs"))
+    except ExecutorBusy as e:
+        abort(503, description=str(e))
+    except futures.TimeoutError:
+        abort(503, description=f"Inference for {active.name}:{active.version} did not finish in time")
+
+def _reject(e):
+    # 429 when the version's queue is full, 503 when the request cannot be served in time
+    exc = TooManyRequests if e.reason == "queue_full" else ServiceUnavailable
+    raise exc(description=str(e), retry_after=e.retry_after)
+
+class PredictCall:
+    """One /predict request: the steps shared by the Flask view below and the ASGI entry point
+    (mlserve.asgi), which runs the blocking ones in its executor. Each step is timed on
+    ``trace``; failures abort() with the HTTP error to return."""
+
+    def __init__(self, name, traceparent=None, timeout=None):
+        self.name = name
+        self.trace = Trace(name, traceparent)
+        self.start = time.monotonic()
+        self.timeout = timeout  # the DEADLINE_HEADER value
+        # metric labels only ever carry registered model names
+        self.model_label, self.version, self.options, self.rows = UNKNOWN, None, None, None
+        self.deadline = self.limiter = self.ticket = None
+
+    def decode(self, mimetype, body, accept):
+        """Return ``(payload, response media type)``; ``accept`` is the request's MIMEAccept."""
+        with self.trace.stage("decode"):
+            media = formats.canonical(mimetype)
+            if media in (None, formats.JSON):
+                media = formats.JSON
+                payload = formats.loads_json(body) or {}
+            else:
+                try:
+                    payload = formats.decode_request(media, body)
+                except formats.CodecUnavailable as e:
+                    abort(415, description=str(e))
+                except formats.CodecError as e:
+                    abort(400, description=str(e))
+            # not a top-level JSON/msgpack array or scalar, nor an unparseable body
+            if not isinstance(payload, dict) or "inputs" not in payload:
+                abort(400, description="request body must be an object with an 'inputs' field")
+            # answer in the request's format unless the client asks for another one
+            default = media if media in formats.RESPONSE_TYPES else formats.ARROW if media == formats.ARROW_FILE else formats.JSON
+            out_media = accept.best_match([default] + formats.RESPONSE_TYPES, default=default)
+            inputs = payload.get("inputs")
+            self.rows = len(inputs) if hasattr(inputs, "__len__") and not isinstance(inputs, dict) else None
+        return payload, out_media
+
+    def resolve(self):
+        with self.trace.stage("registry"):
+            active = registry.resolve_active(self.name)
+            if active is None:
+                if not registry.has_model(self.name):
+                    abort(404, description=f"Model '{self.name}' not found")
+                self.model_label = self.name
+                abort(409, description=f"No active version for model '{self.name}'")
+        self.model_label = self.name
+        return active
+
+    def admit(self, active):
+        """Take a place under the version's admission limits. Returns the Ticket to wait on
+        (see wait_limit/queue_timed_out), or None when the version is not limited."""
+        try:
+            self.deadline = deadline(self.timeout, self.start)
+        except ValueError as e:
+            abort(400, description=str(e))
+        self.check_deadline(active.version, "Request deadline passed before admission")
+        self.limiter = admissions.get(active)
+        if self.limiter is None:
+            return None
+        try:
+            self.ticket = self.limiter.enter(self.deadline)
+        except Rejected as e:
+            _reject(e)
+        return self.ticket
+
+    def wait_limit(self):
+        """Seconds the queued ticket may wait for its slot."""
+        return self.limiter.wait_limit(self.deadline)
+
+    def queue_timed_out(self):
+        try:
+            self.limiter.abandon(self.ticket, self.deadline)
+        except Rejected as e:
+            self.ticket = None
+            _reject(e)
+
+    def wait_admission(self, ticket):
+        if ticket is not None and not ticket.done():
+            with self.trace.stage("admission"):
+                futures.wait([ticket], self.wait_limit())
+                if not ticket.done():
+                    self.queue_timed_out()
+
+    def check_deadline(self, version, message="Request deadline passed before inference"):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            _reject(shed_expired(self.name, version, message))
+
+    def inference_timeout(self):
+        """Seconds to wait for inference run elsewhere: INFERENCE_TIMEOUT, or less to meet the deadline."""
+        if self.deadline is None:
+            return Config.INFERENCE_TIMEOUT
+        return max(0.0, min(Config.INFERENCE_TIMEOUT, self.deadline - time.monotonic()))
+
+    @staticmethod
+    def is_loaded(active):
+        return runtime.key_for(active) in runtime.cache
+
+    def acquire(self, active):
+        """The version and model to serve: may still be the previous version while a new one warms up."""
+        cached = self.is_loaded(active)
+        t = time.perf_counter()
+        requested, (active, m) = active, warmer.acquire(active)
+        self.trace.add("load", time.perf_counter() - t, "hit" if cached or active is not requested else "miss", start=t)
+        self.version, self.options = active.version, active.options
+        return active, m
+
+    def respond(self, active, model, payload, out_media):
+        """Run the request; returns ``(mimetype, body, headers)``."""
+        self.check_deadline(active.version)
+        # the whole request is validated, so a cached answer is only given to a valid one;
+        # rows answered before then skip inference and only the misses go on
+        _validate(active, payload, self.trace)
+        t = time.perf_counter()
+        lookup = result_cache.lookup(active, payload.get("inputs"))
+        if lookup is not None:
+            self.trace.add("result_cache", time.perf_counter() - t, start=t)
+        if lookup is not None and lookup.complete:
+            out = lookup.merge(active.framework)
+        else:
+            if lookup is not None and lookup.partial:
+                payload = dict(payload, inputs=select_rows(payload["inputs"], lookup.misses))
+            out = _infer(active, model, payload, self.trace, self.inference_timeout())
+            if lookup is not None:
+                out = lookup.merge(active.framework, out)
+        meta = {"ok": True, "model": self.name, "version": active.version}
+        with self.trace.stage("serialize"):
+            if out_media == formats.JSON:
+                # what jsonify() writes outside debug mode
+                body = app.json.dumps(dict(meta, result={"predictions": jsonable(active.framework, out)}), separators=(",", ":"))
+                return formats.JSON, body + "\n", {}
+            body = formats.encode_response(out_media, active.framework, out, meta)
+            return out_media, body, {"X-Model-Name": self.name, "X-Model-Version": active.version}
+
+    def finish(self, status):
+        if self.ticket is not None:
+            self.limiter.cancel(self.ticket)
+        trace = self.trace
+        LATENCY.labels(endpoint="/predict", model=self.model_label).observe(trace.elapsed())
+        REQUEST_COUNT.labels(endpoint="/predict", model=self.model_label, status=status).inc()
+        trace.finish(self.model_label, self.version, status)
+        log_prediction(self.options, model=self.model_label, version=self.version, status=int(status), rows=self.rows,
+                       latency_ms=round(trace.elapsed() * 1e3, 3), trace_id=trace.trace_id,
+                       stages_ms={k: round(v * 1e3, 3) for k, (v, _) in trace.totals().items()})
 
 @app.post("/predict/<name>")
 def predict(name):
-    start = time.time()
+    call = PredictCall(name, request.headers.get("traceparent"), request.headers.get(Config.DEADLINE_HEADER))
+    g.trace = call.trace
     status = "200"
     try:
-        require_basic_auth()
-        payload = request.get_json(force=True, silent=True) or {}
-
-        from sqlalchemy import select
-        from .db import SessionLocal, Model, ModelVersion
-
-        with SessionLocal() as s:
-            model = s.execute(select(Model).where(Model.name == name)).scalar_one_or_none()
-            if not model:
-                abort(404, description=f"Model '{name}' not found")
-            active = next((mv for mv in model.versions if mv.active), None)
-            if not active:
-                abort(409, description=f"No active version for model '{name}'")
-
-            if active.input_schema:
-                schema = json.loads(active.input_schema)
-                try:
-                    json_validate(instance=payload, schema=schema)
-                except ValidationError as e:
-                    abort(400, description=f"Schema validation failed: {e.message}")
-
-            m = runtime.load(active.framework, active.path)
-            result = runtime.predict(active.framework, m, payload)
-        return jsonify({"ok": True, "model": name, "version": active.version, "result": result})
+        with call.trace.stage("auth"):
+            require_basic_auth()
+        payload, out_media = call.decode(request.mimetype, request.get_data(), request.accept_mimetypes)
+        active = call.resolve()
+        call.wait_admission(call.admit(active))
+        active, m = call.acquire(active)
+        mimetype, body, headers = call.respond(active, m, payload, out_media)
+        return Response(body, mimetype=mimetype, headers=headers)
     except Exception as e:
         status = "500"
         if hasattr(e, "code"):
             status = str(e.code)
         raise
     finally:
-        LATENCY.labels(endpoint="/predict", model=name).observe(time.time() - start)
-        REQUEST_COUNT.labels(endpoint="/predict", model=name, status=status).inc()
+        call.finish(status)
+
+@app.after_request
+def add_server_timing(resp):
+    trace = g.get("trace")
+    if trace is not None and Config.SERVER_TIMING:
+        resp.headers["Server-Timing"] = trace.server_timing()
+    return resp
+
+@app.post("/jobs/score")
+def create_scoring_job():
+    require_basic_auth()
+    name = request.form.get("model")
+    version = request.form.get("version") or None
+    f = request.files.get("file")
+    if not all([name, f]):
+        abort(400, description="Missing required fields: model, file")
+    ext = os.path.splitext(f.filename or "")[1].lower()
+    if ext not in batch.INPUT_EXTS:
+        abort(400, description=f"file must be one of {', '.join(batch.INPUT_EXTS)}")
+    if registry.get_version(name, version) is None:
+        abort(404, description=f"Model '{name}' has no {'version ' + repr(version) if version else 'active version'}")
+    job_id, input_path = batch.create_job(name, version=version, input_ext=ext)
+    f.save(input_path)  # streamed to disk by werkzeug, never held in memory
+    batch.submit(job_id, registry=registry)
+    return jsonify({"ok": True, "job": batch.job_status(job_id)}), 202
+
+@app.get("/jobs/score/<int:job_id>")
+def scoring_job_status(job_id):
+    require_basic_auth()
+    status = batch.job_status(job_id)
+    if status is None:
+        abort(404, description=f"Scoring job {job_id} not found")
+    return jsonify({"ok": True, "job": status})
+
+@app.get("/jobs/score/<int:job_id>/output")
+def scoring_job_output(job_id):
+    require_basic_auth()
+    status = batch.job_status(job_id)
+    if status is None:
+        abort(404, description=f"Scoring job {job_id} not found")
+    if status["status"] != "succeeded":
+        abort(409, description=f"Scoring job {job_id} is {status['status']}")
+    return send_file(status["output_path"], as_attachment=True)
+
+@app.get("/ready")
+def ready():
+    status = warmer.status()
+    return jsonify(status), (200 if status["ready"] else 503)
 
 @app.get("/metrics")
 def metrics():
     return generate_latest(), 200, {"Content-Type": CONTENT_TYPE_LATEST}
 
 def main():
+    if Config.SERVER_MODE == "asgi":
+        # one uvicorn process; log_config=None keeps our logging setup
+        import sys, uvicorn
+        # under python -m this module is __main__: mlserve.asgi must get it, not a second copy
+        sys.modules.setdefault("mlserve.app", sys.modules[__name__])
+        uvicorn.run("mlserve.asgi:application", host=Config.SERVER_HOST, port=Config.SERVER_PORT, log_config=None)
+        return
     app.run(host=Config.SERVER_HOST, port=Config.SERVER_PORT, debug=Config.FLASK_ENV == "development")
 
 if __name__ == "__main__":
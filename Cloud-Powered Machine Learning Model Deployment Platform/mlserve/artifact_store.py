@@ -0,0 +1,178 @@
+"""Content-addressed artifact storage.
+
+Each artifact is stored once per content as ``ARTIFACT_STORE_DIR/<aa>/<sha256><ext>``, where
+``aa`` is the first two hex digits of the hash. The extension is kept because backends look at it
+(TorchScript ``.pt``). A write streams into a temporary file in the store while hashing it, then
+fsyncs it and renames it into place. If the blob already exists the temporary file is dropped, so
+re-registering identical bytes takes no disk. Every version that points at one blob shares its
+path, and therefore its model-cache entry. Loads check a blob against the hash in its name
+(ARTIFACT_VERIFY) once per process.
+
+    python -m mlserve.artifact_store adopt     # move artifacts registered before the store into it
+"""
+import hashlib, io, os, re, shutil, tempfile, threading
+from collections import namedtuple
+from contextlib import contextmanager
+from .config import Config
+
+CHUNK = 1 << 20
+_BLOB_NAME = re.compile(r"^([0-9a-f]{64})([A-Za-z0-9_.-]*)$")
+_SUFFIX = re.compile(r"^\.[A-Za-z0-9_-]{1,16}$")
+
+# created is False when identical content was already stored
+Blob = namedtuple("Blob", ["sha256", "path", "size", "created"])
+
+class CorruptArtifact(RuntimeError):
+    """A stored artifact no longer matches the hash it was stored under."""
+
+def suffix_of(filename):
+    """The extension to keep for an uploaded ``filename`` ('' if it has none worth keeping)."""
+    ext = os.path.splitext(filename or "")[1]
+    return ext if _SUFFIX.match(ext) else ""
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+class BlobWriter(io.RawIOBase):
+    """The writable file of ArtifactStore.writer(): hashes what goes through it."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self._sha = hashlib.sha256()
+        self.size = 0
+        self.blob = None  # set once committed
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._sha.update(data)
+        self._fh.write(data)
+        n = memoryview(data).nbytes
+        self.size += n
+        return n
+
+    def tell(self):
+        return self.size
+
+    def hexdigest(self):
+        return self._sha.hexdigest()
+
+class ArtifactStore:
+    def __init__(self, root=None):
+        self.root = root or Config.ARTIFACT_STORE_DIR
+        self._tmp = os.path.join(self.root, "tmp")
+        os.makedirs(self._tmp, exist_ok=True)
+
+    def path(self, sha256, suffix=""):
+        return os.path.join(self.root, sha256[:2], sha256 + suffix)
+
+    @contextmanager
+    def writer(self, suffix=""):
+        """Yield a BlobWriter; when the block exits cleanly its content is committed and
+        ``writer.blob`` set. On an error nothing is stored."""
+        fd, tmp = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb", buffering=CHUNK) as fh:
+                w = BlobWriter(fh)
+                yield w
+                fh.flush()
+                os.fsync(fh.fileno())
+            w.blob = self._commit(tmp, w.hexdigest(), w.size, suffix)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def put(self, src, suffix=""):
+        """Store the content of the binary file object ``src``; returns its Blob."""
+        with self.writer(suffix) as w:
+            shutil.copyfileobj(src, w, CHUNK)
+        return w.blob
+
+    def adopt(self, path, suffix=None):
+        """Move a file already on disk into the store (a rename, not a copy, within one
+        filesystem); returns its Blob. The file is gone afterwards."""
+        suffix = suffix_of(path) if suffix is None else suffix
+        sha, size = file_sha256(path), os.path.getsize(path)
+        dest = self.path(sha, suffix)
+        if self._present(dest, size):
+            os.remove(path)
+            return Blob(sha, dest, size, False)
+        fd, tmp = tempfile.mkstemp(dir=self._tmp)
+        os.close(fd)
+        shutil.move(path, tmp)
+        try:
+            return self._commit(tmp, sha, size, suffix)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _present(self, dest, size):
+        # a damaged blob under this name is replaced by the new copy rather than reused
+        try:
+            return os.path.getsize(dest) == size and verify(dest)
+        except (OSError, CorruptArtifact):
+            return False
+
+    def _commit(self, tmp, sha, size, suffix):
+        dest = self.path(sha, suffix)
+        if self._present(dest, size):
+            return Blob(sha, dest, size, False)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.chmod(tmp, 0o644)  # mkstemp creates files readable by the owner only
+        os.replace(tmp, dest)
+        return Blob(sha, dest, size, True)
+
+# ---- verification on load
+
+_verified = {}  # path -> (inode, size, mtime) when its hash last matched
+_verify_lock = threading.Lock()
+
+def blob_digest(path):
+    """The sha256 a store path is named after, or None for a path outside the store layout."""
+    m = _BLOB_NAME.match(os.path.basename(path))
+    if m is None or os.path.basename(os.path.dirname(path)) != m.group(1)[:2]:
+        return None
+    return m.group(1)
+
+def verify(path):
+    """Check a stored blob against its hash, once per process while the file is unchanged.
+    Raises CorruptArtifact on a mismatch; paths outside the store are not checked."""
+    expected = blob_digest(path)
+    if expected is None or not os.path.isfile(path):
+        return False
+    st = os.stat(path)
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    if _verified.get(path) == signature:
+        return True
+    actual = file_sha256(path)
+    if actual != expected:
+        raise CorruptArtifact(f"Artifact {path} is corrupt: its sha256 is {actual}")
+    with _verify_lock:
+        _verified[path] = signature
+    return True
+
+# ---- CLI
+
+def _cli():
+    import json
+    import click
+
+    @click.group()
+    def cli():
+        """Content-addressed artifact store."""
+
+    @cli.command()
+    def adopt():
+        """Move the artifacts of versions registered before the store into it."""
+        from .registry import Registry
+        click.echo(json.dumps(Registry().adopt_artifacts(), indent=2))
+
+    cli()
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,234 @@
+"""ASGI entry point: the API of mlserve.app served from an event loop.
+
+    SERVER_MODE=asgi gunicorn -c python:mlserve.gunicorn_conf    # uvicorn workers
+    uvicorn mlserve.asgi:application                             # one process, for development
+
+POST /predict/<name> is handled here. Reading the body, auth, decoding, the registry lookup and
+logging run on the event loop. Model loading, validation, inference and encoding run in a
+bounded pool of ASGI_INFERENCE_THREADS threads. Idle keep-alive connections, and requests waiting
+for a pool thread, hold no thread. GET /metrics is answered on the loop. Every other route is the
+Flask app itself, run through a WSGI bridge in its own pool (ASGI_WSGI_THREADS), so /models,
+/train, /jobs, ... behave exactly as under a WSGI server.
+"""
+import asyncio, logging, re, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.exceptions import HTTPException, InternalServerError, RequestEntityTooLarge, Unauthorized
+from werkzeug.http import parse_accept_header, parse_options_header
+from .config import Config
+from .app import app as flask_app, PredictCall
+from .auth import check_basic_auth
+
+log = logging.getLogger(__name__)
+
+PREDICT_PATH = re.compile(r"^/predict/([^/]+)$")
+_END = object()
+_CHUNK = 64 * 1024  # bytes of a streamed WSGI response sent per thread hop
+
+class _Disconnected(Exception):
+    pass
+
+async def _read_body(scope, receive, sink=None):
+    """The request body (or its length, written to ``sink``). Raises RequestEntityTooLarge as soon
+    as it is known to exceed the Flask app's MAX_CONTENT_LENGTH, without reading the rest."""
+    limit = flask_app.config["MAX_CONTENT_LENGTH"]
+    declared = _headers(scope).get("content-length", "")
+    if limit is not None and declared.isdigit() and int(declared) > limit:
+        raise RequestEntityTooLarge()
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _Disconnected()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise RequestEntityTooLarge()
+        if sink is not None:
+            sink.write(chunk)
+        else:
+            chunks.append(chunk)
+        if not message.get("more_body"):
+            return size if sink is not None else b"".join(chunks)
+
+def _headers(scope):
+    out = {}
+    for name, value in scope["headers"]:
+        name, value = name.decode("latin-1").lower(), value.decode("latin-1")
+        out[name] = f"{out[name]},{value}" if name in out else value
+    return out
+
+async def _send_response(send, resp):
+    headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in resp.headers.to_wsgi_list()]
+    await send({"type": "http.response.start", "status": resp.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": resp.get_data()})
+
+def _environ(scope, body, length):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or ""),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(length),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in _headers(scope).items():
+        key = name.upper().replace("-", "_")
+        if key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[key] = value
+        else:
+            environ[f"HTTP_{key}"] = value
+    return environ
+
+def _take(it):
+    """The next chunks of a WSGI body, joined up to _CHUNK bytes, or _END."""
+    parts, size = [], 0
+    while size < _CHUNK:
+        chunk = next(it, _END)
+        if chunk is _END:
+            break
+        parts.append(chunk)
+        size += len(chunk)
+    if not parts:
+        return _END
+    return b"".join(parts)
+
+class ASGIApp:
+    def __init__(self, wsgi_app, inference_threads=None, wsgi_threads=None):
+        self.wsgi_app = wsgi_app
+        self._inference = ThreadPoolExecutor(inference_threads or Config.ASGI_INFERENCE_THREADS,
+                                             thread_name_prefix="mlserve-infer")
+        self._wsgi = ThreadPoolExecutor(wsgi_threads or Config.ASGI_WSGI_THREADS, thread_name_prefix="mlserve-wsgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        try:
+            match = PREDICT_PATH.match(scope["path"])
+            if match and scope["method"] == "POST":
+                await self._predict(scope, receive, send, match.group(1))
+            elif scope["path"] == "/metrics" and scope["method"] == "GET":
+                await _send_response(send, flask_app.response_class(generate_latest(), content_type=CONTENT_TYPE_LATEST))
+            else:
+                await self._call_wsgi(scope, receive, send)
+        except _Disconnected:
+            pass
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self):
+        self._inference.shutdown(wait=True)
+        self._wsgi.shutdown(wait=True)
+
+    def _in_pool(self, call, fn, *args):
+        # time spent waiting for a pool thread shows up as the "queue" stage
+        queued = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        def run():
+            call.trace.add("queue", time.perf_counter() - queued, start=queued)
+            return fn(*args)
+        return loop.run_in_executor(self._inference, run)
+
+    async def _predict(self, scope, receive, send, name):
+        try:
+            body = await _read_body(scope, receive)
+        except RequestEntityTooLarge:
+            body = None  # answered below, so it is counted like any other failed request
+        headers = _headers(scope)
+        call = PredictCall(name, headers.get("traceparent"), headers.get(Config.DEADLINE_HEADER.lower()))
+        status = 200
+        try:
+            with call.trace.stage("auth"):
+                error = check_basic_auth(headers.get("authorization"))
+            if error is not None:
+                raise Unauthorized(description=error)
+            if body is None:  # after auth, as in the Flask route
+                raise RequestEntityTooLarge()
+            mimetype, _ = parse_options_header(headers.get("content-type", ""))
+            accept = parse_accept_header(headers.get("accept"), MIMEAccept)
+            payload, out_media = call.decode(mimetype, body, accept)
+            active = call.resolve()
+            ticket = call.admit(active)
+            if ticket is not None and not ticket.done():
+                with call.trace.stage("admission"):
+                    await asyncio.wait([asyncio.wrap_future(ticket)], timeout=call.wait_limit())
+                    if not ticket.done():
+                        call.queue_timed_out()
+            if call.is_loaded(active):
+                active, model = call.acquire(active)
+            else:  # reads the artifact: keep it off the loop
+                active, model = await self._in_pool(call, call.acquire, active)
+            media, out, extra = await self._in_pool(call, call.respond, active, model, payload, out_media)
+            resp = flask_app.response_class(out, mimetype=media, headers=extra)
+        except HTTPException as e:
+            status = e.code
+            resp = e.get_response()
+        except Exception:
+            log.exception("Exception on %s [POST]", scope["path"])
+            status = 500
+            resp = InternalServerError().get_response()
+        finally:
+            call.finish(str(status))
+        if Config.SERVER_TIMING:
+            resp.headers["Server-Timing"] = call.trace.server_timing()
+        await _send_response(send, resp)
+
+    async def _call_wsgi(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        with tempfile.SpooledTemporaryFile(max_size=1 << 20) as body:
+            try:
+                length = await _read_body(scope, receive, sink=body)
+            except RequestEntityTooLarge as e:
+                return await _send_response(send, e.get_response())
+            body.seek(0)
+            environ = _environ(scope, body, length)
+            started = {}
+
+            def start_response(status, headers, exc_info=None):
+                started["status"] = int(status.split(" ", 1)[0])
+                started["headers"] = headers
+                return lambda data: None  # the write() callable; Flask never uses it
+
+            def call():
+                result = self.wsgi_app(environ, start_response)
+                it = iter(result)
+                return result, it, _take(it)
+
+            result, it, chunk = await loop.run_in_executor(self._wsgi, call)
+            try:
+                headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in started["headers"]]
+                await send({"type": "http.response.start", "status": started["status"], "headers": headers})
+                while chunk is not _END:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                    chunk = await loop.run_in_executor(self._wsgi, _take, it)
+                await send({"type": "http.response.body", "body": b""})
+            finally:
+                if hasattr(result, "close"):
+                    await loop.run_in_executor(self._wsgi, result.close)
+
+application = ASGIApp(flask_app)
@@ -2,15 +2,20 @@ from flask import request, abort
 import base64
 from .config import Config
 
-def require_basic_auth():
-    auth = request.headers.get("Authorization")
-    if not auth or not auth.startswith("Basic "):
-        abort(401, description="Missing Basic auth")
+def check_basic_auth(header):
+    """Return why ``header`` (an Authorization value) is rejected, or None if it is valid."""
+    if not header or not header.startswith("Basic "):
+        return "Missing Basic auth"
     try:
-        import base64 as b64
-        decoded = b64.b64decode(auth.split(" ", 1)[1]).decode("utf-8")
+        decoded = base64.b64decode(header.split(" ", 1)[1]).decode("utf-8")
         username, password = decoded.split(":", 1)
     except Exception:
-        abort(401, description="Malformed auth header")
+        return "Malformed auth header"
     if username != Config.AUTH_USERNAME or password != Config.AUTH_PASSWORD:
-        abort(401, description="Invalid credentials")
+        return "Invalid credentials"
+    return None
+
+def require_basic_auth():
+    error = check_basic_auth(request.headers.get("Authorization"))
+    if error is not None:
+        abort(401, description=error)
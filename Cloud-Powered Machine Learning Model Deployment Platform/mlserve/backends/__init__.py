@@ -0,0 +1,83 @@
+"""Framework backends: how ModelRuntime loads and runs each framework's artifacts.
+
+Each backend lives in its own module and is imported the first time a version using its
+framework is loaded (or preloaded), so a deployment serving only sklearn models never imports
+torch or onnxruntime. Other packages add frameworks through the ``mlserve.backends`` entry point
+group, pointing at a Backend subclass (or instance)::
+
+    [project.entry-points."mlserve.backends"]
+    xgboost = "mlserve_xgboost:XGBoostBackend"
+
+or, in-process, with register_backend().
+"""
+import importlib, threading
+
+ENTRY_POINT_GROUP = "mlserve.backends"
+
+# built-in frameworks -> "module:attribute", imported lazily
+_BUILTIN = {
+    "sklearn": "mlserve.backends.sklearn:SklearnBackend",
+    "torch": "mlserve.backends.torch:TorchBackend",
+    "onnx": "mlserve.backends.onnx:OnnxBackend",
+}
+
+class Backend:
+    """Loads one framework's artifacts and runs inference on them."""
+
+    name = None
+
+    def load(self, path, options=None):
+        """Return the model stored at ``path`` (a file or directory). ``options`` is the version's
+        ``runtime`` option (see mlserve.runtime.runtime_options); keys that do not apply to this
+        framework are ignored."""
+        raise NotImplementedError
+
+    def infer(self, model, inputs):
+        """Run ``model`` on decoded request inputs and return its raw output (see ModelRuntime.infer)."""
+        raise NotImplementedError
+
+_backends = {}  # framework -> Backend, or the exception explaining why there is none
+_lock = threading.Lock()
+
+def _entry_points():
+    from importlib.metadata import entry_points
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+def _resolve(framework):
+    try:
+        target = _BUILTIN.get(framework)
+        if target is not None:
+            module, _, attr = target.partition(":")
+            factory = getattr(importlib.import_module(module), attr)
+        else:
+            ep = _entry_points().get(framework)
+            if ep is None:
+                return ValueError(f"Unsupported framework: {framework}")
+            factory = ep.load()
+        return factory() if isinstance(factory, type) else factory
+    except ImportError as e:
+        return RuntimeError(str(e))
+
+def get_backend(framework):
+    """Return the Backend for ``framework``, importing it on first use."""
+    backend = _backends.get(framework)
+    if backend is None:
+        with _lock:
+            backend = _backends.get(framework)
+            if backend is None:
+                backend = _backends[framework] = _resolve(framework)
+    if isinstance(backend, Exception):
+        raise backend
+    return backend
+
+def register_backend(framework, backend):
+    """Serve ``framework`` with ``backend`` (a Backend instance or subclass), replacing any other."""
+    with _lock:
+        _backends[framework] = backend() if isinstance(backend, type) else backend
+
+def known_frameworks():
+    """Names of every framework that can be served, without importing any backend."""
+    return sorted(set(_BUILTIN) | set(_entry_points()) | {k for k, v in _backends.items() if not isinstance(v, Exception)})
+
+def is_frame(obj):
+    return hasattr(obj, "columns") and hasattr(obj, "iloc")
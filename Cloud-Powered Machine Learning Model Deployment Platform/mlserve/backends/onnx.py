@@ -0,0 +1,72 @@
+"""ONNX models run with onnxruntime on the CPU. Outputs are a list of arrays, one per model output."""
+import hashlib, os
+import numpy as np
+from ..artifact_store import blob_digest
+from ..config import Config
+from . import Backend, is_frame
+
+try:
+    import onnxruntime
+except ImportError as e:
+    raise ImportError("onnxruntime not installed.") from e
+
+PROVIDERS = ['CPUExecutionProvider']
+_LEVELS = {
+    "disable": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+def _optimized_path(path, level):
+    # artifact-store blobs are named by content; other paths by location and modification time
+    digest = blob_digest(path)
+    if digest is None:
+        digest = hashlib.sha256(f"{os.path.abspath(path)}:{os.stat(path).st_mtime_ns}".encode()).hexdigest()
+    return os.path.join(Config.ONNX_OPTIMIZED_DIR, f"{digest}.{level}.onnx")
+
+class OnnxBackend(Backend):
+    name = "onnx"
+
+    def load(self, path, options=None):
+        options = options or {}
+        so = onnxruntime.SessionOptions()
+        intra = options.get("intra_op_threads", Config.INFERENCE_INTRA_OP_THREADS)
+        inter = options.get("inter_op_threads", Config.INFERENCE_INTER_OP_THREADS)
+        if intra:
+            so.intra_op_num_threads = intra
+        if inter:
+            # inter-op threads only run independent branches of the graph in parallel mode
+            so.inter_op_num_threads = inter
+            if inter > 1:
+                so.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+        level = options.get("graph_optimization", Config.ONNX_GRAPH_OPTIMIZATION)
+        so.graph_optimization_level = _LEVELS[level]
+        if not options.get("optimized_model_cache") or level == "disable":
+            return onnxruntime.InferenceSession(path, so, providers=PROVIDERS)
+
+        # the graph passes run once per host: later loads read the saved result and skip them
+        # (an "all" graph may hold CPU-specific kernels, so the cache is not meant to be shared)
+        cached = _optimized_path(path, level)
+        if os.path.exists(cached):
+            so.graph_optimization_level = _LEVELS["disable"]
+            return onnxruntime.InferenceSession(cached, so, providers=PROVIDERS)
+        os.makedirs(Config.ONNX_OPTIMIZED_DIR, exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        so.optimized_model_filepath = tmp
+        try:
+            session = onnxruntime.InferenceSession(path, so, providers=PROVIDERS)
+            os.replace(tmp, cached)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return session
+
+    def infer(self, model, inputs):
+        if isinstance(inputs, dict):
+            ort_inputs = {k: (np.array(v) if not hasattr(v, 'dtype') else v) for k, v in inputs.items()}
+        elif is_frame(inputs):
+            ort_inputs = {"input": inputs.to_numpy()}
+        else:
+            ort_inputs = {"input": inputs if isinstance(inputs, np.ndarray) else np.array(inputs)}
+        return model.run(None, ort_inputs)
@@ -0,0 +1,31 @@
+"""scikit-learn estimators and pipelines saved with joblib."""
+import joblib
+import numpy as np
+from ..config import Config
+from . import Backend, is_frame
+
+class SklearnBackend(Backend):
+    name = "sklearn"
+
+    def load(self, path, options=None):
+        # arrays in uncompressed joblib files are mapped, not copied; compressed files load normally
+        return joblib.load(path, mmap_mode="r" if Config.MMAP_ARTIFACTS else None)
+
+    def infer(self, model, inputs):
+        names = getattr(model, "feature_names_in_", None)
+        if isinstance(inputs, np.ndarray):
+            # a bare matrix for a pipeline fitted on a DataFrame: name its columns the same way
+            if names is not None and inputs.ndim == 2 and inputs.shape[1] == len(names):
+                import pandas as pd
+                inputs = pd.DataFrame(inputs, columns=names, copy=False)
+            return model.predict(inputs)
+        # Allow list of dicts (from auto-train) OR list of lists (manual schema)
+        if isinstance(inputs, list) and inputs and isinstance(inputs[0], dict):
+            import pandas as pd
+            inputs = pd.DataFrame(inputs)
+        if is_frame(inputs):
+            # estimators check feature order; request columns arrive in whatever order was sent
+            if names is not None and list(inputs.columns) != list(names):
+                inputs = inputs[list(names)]
+            return model.predict(inputs)
+        return model.predict(np.array(inputs))
@@ -0,0 +1,62 @@
+"""PyTorch modules: TorchScript (``.pt``) or pickled ``nn.Module`` files."""
+import logging
+import numpy as np
+from ..config import Config
+from . import Backend, is_frame
+
+try:
+    import torch
+except ImportError as e:
+    raise ImportError("PyTorch not installed.") from e
+
+log = logging.getLogger(__name__)
+
+class TorchBackend(Backend):
+    name = "torch"
+
+    def load(self, path, options=None):
+        options = options or {}
+        self._set_threads(options)
+        if path.endswith('.pt'):
+            model = torch.jit.load(path)
+        elif Config.MMAP_ARTIFACTS:
+            model = torch.load(path, map_location="cpu", mmap=True)
+        else:
+            model = torch.load(path, map_location="cpu")
+        model.eval()
+        if options.get("optimize_for_inference"):
+            model = self._optimize(model, path)
+        return model
+
+    def _set_threads(self, options):
+        # torch's pools are per process: the last version loaded in a worker sets them
+        intra = options.get("intra_op_threads", Config.INFERENCE_INTRA_OP_THREADS)
+        inter = options.get("inter_op_threads", Config.INFERENCE_INTER_OP_THREADS)
+        if intra and torch.get_num_threads() != intra:
+            torch.set_num_threads(intra)
+        if inter and torch.get_num_interop_threads() != inter:
+            try:
+                torch.set_num_interop_threads(inter)
+            except RuntimeError as e:  # only possible before the first parallel work
+                log.warning("cannot set torch inter-op threads to %d: %s", inter, e)
+
+    def _optimize(self, model, path):
+        # freeze + fuse (conv/bn, linear/relu, ...) for inference; eager modules are scripted first
+        try:
+            scripted = model if isinstance(model, torch.jit.ScriptModule) else torch.jit.script(model)
+            return torch.jit.optimize_for_inference(scripted)
+        except Exception as e:
+            log.warning("optimize_for_inference failed for %s, serving it as loaded: %s", path, e)
+            return model
+
+    def infer(self, model, inputs):
+        if is_frame(inputs):
+            inputs = inputs.to_numpy(dtype=np.float32)
+        if isinstance(inputs, np.ndarray):
+            X = np.asarray(inputs, dtype=np.float32)
+            X = torch.from_numpy(X if X.flags.writeable else X.copy())
+        else:
+            X = torch.tensor(inputs, dtype=torch.float32)
+        with torch.inference_mode():
+            out = model(X)
+        return out.detach().cpu().numpy()
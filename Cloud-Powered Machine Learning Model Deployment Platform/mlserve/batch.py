@@ -0,0 +1,265 @@
+"""Offline batch scoring of large CSV/Parquet files against a registered model.
+
+    python -m mlserve.batch score --model iris --input big.csv --output scored.csv
+
+Input is read in chunks and scored in a process pool whose workers each load the model once
+through ModelRuntime. At most two chunks per worker are in flight and predictions are appended to
+the output as they complete (in input order), so memory stays flat however large the file is.
+"""
+import logging, multiprocessing, os, threading, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+from .config import Config
+from .db import SessionLocal, WriteSession, ScoringJob
+
+log = logging.getLogger(__name__)
+
+PARQUET_EXTS = (".parquet", ".pq")
+INPUT_EXTS = (".csv",) + PARQUET_EXTS
+
+def _is_parquet(path):
+    return path.lower().endswith(PARQUET_EXTS)
+
+def _now():
+    return datetime.now(timezone.utc)
+
+# ---- input / output
+
+def count_rows(path):
+    """Row count when the format records it (Parquet), else None."""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+def iter_chunks(path, chunk_rows):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+class ChunkWriter:
+    """Appends scored chunks to ``<path>.part`` and renames it into place on close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp = f"{path}.part"
+        self._parquet = None
+        self._csv = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self._tmp, table.schema)
+            self._parquet.write_table(table)
+        else:
+            header = self._csv is None
+            if header:
+                self._csv = open(self._tmp, "w", newline="")
+            df.to_csv(self._csv, header=header, index=False)
+
+    def _close_files(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._csv is not None:
+            self._csv.close()
+
+    def close(self):
+        self._close_files()
+        if not os.path.exists(self._tmp):
+            open(self._tmp, "w").close()  # empty input, empty output
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._close_files()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+# ---- pool workers
+
+_worker = {}
+
+def _init_worker(framework, path, load_options=None):
+    from .runtime import ModelRuntime
+    runtime = ModelRuntime(max_cache_bytes=0)
+    _worker.update(runtime=runtime, framework=framework, model=runtime.load(framework, path, options=load_options))
+
+def _score_chunk(features):
+    out = _worker["runtime"].infer(_worker["framework"], _worker["model"], features)
+    if _worker["framework"] == "onnx":
+        out = out[0]
+    return np.asarray(out)
+
+def _attach(chunk, preds):
+    if preds.ndim == 1:
+        chunk["prediction"] = preds
+    else:
+        preds = preds.reshape(len(preds), -1)
+        for i in range(preds.shape[1]):
+            chunk[f"prediction_{i}"] = preds[:, i]
+    return chunk
+
+# ---- jobs
+
+def _update(job_id, **fields):
+    with WriteSession() as s:
+        job = s.get(ScoringJob, job_id)
+        for k, v in fields.items():
+            setattr(job, k, v)
+        s.commit()
+
+def create_job(model_name, input_path=None, version=None, output_path=None, input_ext=".csv"):
+    """Record a queued job. Without ``input_path`` the input is expected at the returned path
+    (for uploads); without ``output_path`` results go next to it in JOB_DIR."""
+    with WriteSession() as s:
+        job = ScoringJob(model_name=model_name, version=version, input_path="", output_path="", status="queued")
+        s.add(job)
+        s.flush()
+        job_dir = os.path.join(Config.JOB_DIR, f"score-{job.id}")
+        os.makedirs(job_dir, exist_ok=True)
+        job.input_path = input_path or os.path.join(job_dir, "input" + input_ext)
+        out_ext = ".parquet" if _is_parquet(job.input_path) else ".csv"
+        job.output_path = output_path or os.path.join(job_dir, "predictions" + out_ext)
+        s.commit()
+        return job.id, job.input_path
+
+def job_status(job_id):
+    with SessionLocal() as s:
+        job = s.get(ScoringJob, job_id)
+        if job is None:
+            return None
+        return {
+            "id": job.id,
+            "model": job.model_name,
+            "version": job.version,
+            "status": job.status,
+            "total_rows": job.total_rows,
+            "rows_done": job.rows_done,
+            "chunks_done": job.chunks_done,
+            "rows_per_sec": job.rows_per_sec,
+            "error": job.error,
+            "output_path": job.output_path,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+def run_job(job_id, workers=None, chunk_rows=None, registry=None, on_progress=None):
+    """Score a queued job to completion in this process (blocking)."""
+    from .registry import Registry
+    from .runtime import runtime_options
+    registry = registry or Registry()
+    workers = workers or Config.SCORING_WORKERS
+    chunk_rows = chunk_rows or Config.SCORING_CHUNK_ROWS
+    with SessionLocal() as s:
+        job = s.get(ScoringJob, job_id)
+        model_name, version, input_path, output_path = job.model_name, job.version, job.input_path, job.output_path
+
+    writer = None
+    rows_done = chunks_done = 0
+
+    def drain_one(window):
+        nonlocal rows_done, chunks_done
+        chunk, future = window.popleft()
+        writer.write(_attach(chunk, future.result()))
+        rows_done += len(chunk)
+        chunks_done += 1
+        rate = rows_done / max(time.monotonic() - started, 1e-9)
+        _update(job_id, rows_done=rows_done, chunks_done=chunks_done, rows_per_sec=rate)
+        if on_progress is not None:
+            on_progress(rows_done, rate)
+
+    # everything from here on fails the job rather than leaving it queued: resolving the model
+    # (a broken schema), reading the input's row count, opening the output
+    try:
+        mv = registry.get_version(model_name, version)
+        if mv is None:
+            what = f"version '{version}'" if version else "an active version"
+            _update(job_id, status="failed", error=f"Model '{model_name}' has no {what}.", finished_at=_now())
+            return job_status(job_id)
+        started = time.monotonic()
+        _update(job_id, status="running", version=mv.version, started_at=_now(), total_rows=count_rows(input_path))
+        columns = [c for c, _ in mv.validator.columns] if mv.validator is not None and mv.validator.columns else None
+        writer = ChunkWriter(output_path)
+        ctx = multiprocessing.get_context("spawn")  # never fork a threaded server process
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(mv.framework, mv.path, runtime_options(mv.options))) as pool:
+            window = deque()
+            for chunk in iter_chunks(input_path, chunk_rows):
+                features = chunk[columns] if columns else chunk
+                if mv.validator is not None:
+                    mv.validator.validate_columnar(features)
+                window.append((chunk, pool.submit(_score_chunk, features)))
+                if len(window) >= 2 * workers:
+                    drain_one(window)
+            while window:
+                drain_one(window)
+        writer.close()
+    except Exception as e:
+        log.exception("scoring job %s failed", job_id)
+        if writer is not None:
+            writer.abort()
+        message = getattr(e, "message", None) or str(e) or e.__class__.__name__
+        _update(job_id, status="failed", error=message, finished_at=_now())
+        return job_status(job_id)
+
+    rate = rows_done / max(time.monotonic() - started, 1e-9)
+    _update(job_id, status="succeeded", rows_per_sec=rate, finished_at=_now())
+    log.info("scoring job %s: %d rows in %d chunks, %.0f rows/s", job_id, rows_done, chunks_done, rate)
+    return job_status(job_id)
+
+# jobs submitted through the API run one at a time per server process, in a background thread
+_executor = None
+_executor_lock = threading.Lock()
+
+def submit(job_id, registry=None):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlserve-scoring")
+    return _executor.submit(run_job, job_id, registry=registry)
+
+# ---- CLI
+
+def _cli():
+    import json
+    import click
+
+    @click.group()
+    def cli():
+        """Offline batch scoring."""
+
+    @cli.command()
+    @click.option("--model", "model_name", required=True, help="Registered model name.")
+    @click.option("--version", default=None, help="Model version (default: the active one).")
+    @click.option("--input", "input_path", required=True, type=click.Path(exists=True, dir_okay=False))
+    @click.option("--output", "output_path", required=True, type=click.Path(dir_okay=False))
+    @click.option("--workers", type=int, default=None, help="Scoring processes (default: SCORING_WORKERS).")
+    @click.option("--chunk-rows", type=int, default=None, help="Rows per chunk (default: SCORING_CHUNK_ROWS).")
+    def score(model_name, version, input_path, output_path, workers, chunk_rows):
+        """Score INPUT (CSV or Parquet) and write predictions to OUTPUT."""
+        if not input_path.lower().endswith(INPUT_EXTS):
+            raise click.BadParameter("input must be a .csv or .parquet file", param_hint="--input")
+        job_id, _ = create_job(model_name, os.path.abspath(input_path), version, os.path.abspath(output_path))
+
+        def progress(rows, rate):
+            click.echo(f"job {job_id}: {rows} rows scored ({rate:.0f} rows/s)", err=True)
+
+        status = run_job(job_id, workers=workers, chunk_rows=chunk_rows, on_progress=progress)
+        click.echo(json.dumps(status, indent=2))
+        if status["status"] != "succeeded":
+            raise SystemExit(1)
+
+    cli()
+
+if __name__ == "__main__":
+    _cli()
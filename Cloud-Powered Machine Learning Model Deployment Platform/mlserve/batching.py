@@ -0,0 +1,204 @@
+import logging, math, queue, threading, time
+from concurrent.futures import Future
+from prometheus_client import Histogram
+from .config import Config
+
+log = logging.getLogger(__name__)
+
+BATCH_SIZE = Histogram(
+    "mlserve_batch_size_rows", "Rows per dispatched inference batch", ["model", "version"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+QUEUE_WAIT = Histogram(
+    "mlserve_batch_queue_wait_seconds", "Time a request waited in the batching queue", ["model", "version"],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25),
+)
+
+def batching_options(options):
+    """Normalise a version's ``batching`` option to ``(max_batch_size, max_wait_s)`` or None.
+    Raises ValueError for a malformed option."""
+    opt = (options or {}).get("batching")
+    if not opt:
+        return None
+    if opt is True:
+        opt = {}
+    if not isinstance(opt, dict):
+        raise ValueError('the "batching" option must be true or a JSON object')
+    if not opt.get("enabled", True):
+        return None
+    try:
+        max_size = int(opt.get("max_batch_size", Config.BATCH_MAX_SIZE))
+        max_wait = float(opt.get("max_wait_ms", Config.BATCH_MAX_WAIT_MS)) / 1000.0
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("batching max_batch_size and max_wait_ms must be numbers")
+    if not math.isfinite(max_wait):
+        raise ValueError("batching max_wait_ms must be finite")
+    return max(1, max_size), max(0.0, max_wait)
+
+class _Pending:
+    __slots__ = ("payload", "rows", "future", "enqueued")
+
+    def __init__(self, payload):
+        self.payload = payload
+        inputs = payload.get("inputs")
+        if isinstance(inputs, dict):
+            first = next(iter(inputs.values()), [])
+            self.rows = len(first) if isinstance(first, list) else 1
+        else:
+            self.rows = len(inputs) if hasattr(inputs, "__len__") else 1
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+class MicroBatcher:
+    """Collects concurrent requests for one model version and runs them as one model call.
+
+    A batch is dispatched once it holds ``max_batch_size`` rows or its oldest request has
+    waited ``max_wait`` seconds, whichever comes first.
+    """
+
+    def __init__(self, name, version, run_batch, max_batch_size, max_wait):
+        self.name = name
+        self.version = version
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._run_batch = run_batch  # list of payloads -> list of raw outputs, same order
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name=f"batcher-{name}-{version}", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload):
+        item = _Pending(payload)
+        with self._lock:
+            # checked and queued under the lock: close() cannot put its marker in between
+            if self._closed:
+                raise RuntimeError("batcher is closed")
+            self._queue.put(item)
+        return item.future
+
+    def predict(self, payload, timeout=None):
+        """Raises TimeoutError after ``timeout`` seconds (default INFERENCE_TIMEOUT); the request
+        is then left out of the batch if it has not been dispatched yet."""
+        future = self.submit(payload)
+        try:
+            return future.result(Config.INFERENCE_TIMEOUT if timeout is None else timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+
+    def _collect(self, first):
+        batch, rows = [first], first.rows
+        deadline = first.enqueued + self.max_wait
+        while rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # let the loop see the close request after this batch
+                break
+            batch.append(item)
+            rows += item.rows
+        return batch, rows
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, rows = self._collect(first)
+            # requests whose callers stopped waiting are dropped
+            batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            rows = sum(item.rows for item in batch)
+            now = time.monotonic()
+            for item in batch:
+                QUEUE_WAIT.labels(model=self.name, version=self.version).observe(now - item.enqueued)
+            BATCH_SIZE.labels(model=self.name, version=self.version).observe(rows)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        try:
+            results = self._run_batch([item.payload for item in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # one bad request must not fail its neighbours: retry them individually
+            log.warning("batched inference failed for %s:%s; retrying %d requests one by one",
+                        self.name, self.version, len(batch))
+            for item in batch:
+                self._dispatch([item])
+            return
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+
+class BatcherPool:
+    """One MicroBatcher per (model, version) whose options enable batching."""
+
+    def __init__(self, runtime):
+        self.runtime = runtime
+        self._batchers = {}  # (name, version) -> MicroBatcher
+        self._routes = {}  # (name, version) -> (options, executor, model key) the batcher was built with
+        self._lock = threading.Lock()
+
+    def get(self, active, model, executor=None):
+        """Return the batcher serving ``model`` for ``active``, or None if batching is off.
+
+        With an ``executor`` (see mlserve.executor) batches run in its worker processes.
+        """
+        opts = batching_options(active.options)
+        key = (active.name, active.version)
+        current = self._batchers.get(key)
+        if opts is None:
+            if current is not None:
+                self.discard(active.name, active.version)
+            return None
+        # a re-registered artifact or new runtime options mean another model: rebuild the batcher
+        route = (opts, executor, self.runtime.key_for(active))
+        if current is not None and self._routes.get(key) == route:
+            return current
+        with self._lock:
+            current = self._batchers.get(key)
+            if current is not None and self._routes.get(key) == route:
+                return current
+            framework = active.framework
+            backend = executor or self.runtime
+
+            # the batcher holds its own model reference, so a retired batcher keeps serving
+            # its queued requests with the version they were routed to
+            def run_batch(payloads):
+                return backend.infer_many(framework, model, [p.get("inputs") for p in payloads])
+
+            batcher = MicroBatcher(active.name, active.version, run_batch, *opts)
+            self._batchers[key] = batcher
+            self._routes[key] = route
+            # a new active version retires the batchers of the previous ones; queued requests
+            # ahead of the close marker are still served
+            stale = [self._batchers.pop(k) for k in list(self._batchers) if k[0] == active.name and k != key]
+            for k in list(self._routes):
+                if k[0] == active.name and k != key:
+                    del self._routes[k]
+        if current is not None:
+            current.close()
+        for b in stale:
+            b.close()
+        return batcher
+
+    def discard(self, name, version=None):
+        with self._lock:
+            keys = [k for k in self._batchers if k[0] == name and (version is None or k[1] == version)]
+            batchers = [self._batchers.pop(k) for k in keys]
+            for k in keys:
+                self._routes.pop(k, None)
+        for b in batchers:
+            b.close()
@@ -7,10 +7,118 @@ class Config:
     FLASK_ENV = os.getenv("FLASK_ENV", "development")
     SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
     SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    # Which app gunicorn (mlserve/gunicorn_conf.py) and python -m mlserve.app serve: "wsgi" (mlserve.app:app) or "asgi"
+    # (mlserve.asgi:application on uvicorn workers). Under ASGI, /predict inference runs in
+    # ASGI_INFERENCE_THREADS threads per worker (requests beyond that wait without a thread; keep
+    # it above BATCH_MAX_SIZE for batched versions) and the other routes in ASGI_WSGI_THREADS.
+    SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+    ASGI_INFERENCE_THREADS = int(os.getenv("ASGI_INFERENCE_THREADS", "32"))
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "8"))
     DB_URL = os.getenv("DB_URL", "sqlite:///mlserve.db")
+    # Connection pool for server databases (Postgres, MySQL); SQLite uses the pragmas below.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 disables
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
     ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(os.path.dirname(__file__), "artifacts"))
+    # Artifacts are stored once per content (sha256) under ARTIFACT_STORE_DIR and checked against
+    # their hash when first loaded in each process.
+    ARTIFACT_STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", os.path.join(ARTIFACT_DIR, "blobs"))
+    ARTIFACT_VERIFY = os.getenv("ARTIFACT_VERIFY", "1") == "1"
     LOG_DIR = os.getenv("LOG_DIR", os.path.join(os.path.dirname(__file__), "logs"))
+    # Log records are queued (at most LOG_QUEUE_SIZE, extra ones are dropped and counted) and
+    # written by a background thread. Files rotate at LOG_MAX_BYTES, or on LOG_ROTATE_WHEN
+    # (a TimedRotatingFileHandler "when", e.g. "midnight") if set, keeping LOG_BACKUP_COUNT gzipped.
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+    LOG_COMPRESS = os.getenv("LOG_COMPRESS", "1") == "1"
+    # Who rotates the log files: "process" (the settings above) or "external" (logrotate or the
+    # like; files moved away are reopened). Rotating from several processes at once is unsafe, so
+    # under gunicorn the default is "external" (mlserve/gunicorn_conf.py).
+    LOG_ROTATION = os.getenv("LOG_ROTATION", "")
+    LOG_TO_CONSOLE = os.getenv("LOG_TO_CONSOLE", "1") == "1"
+    # Share of /predict requests written to predictions.log; a version's {"prediction_log":
+    # {"sample_rate": ...}} option overrides it.
+    PREDICTION_LOG_SAMPLE_RATE = float(os.getenv("PREDICTION_LOG_SAMPLE_RATE", "0"))
     AUTH_USERNAME = os.getenv("AUTH_USERNAME", "admin")
     AUTH_PASSWORD = os.getenv("AUTH_PASSWORD", "admin123")
+    # Largest request body, uploads included (413 beyond it); 0 for no limit.
     MAX_REQ_BODY_MB = int(os.getenv("MAX_REQ_BODY_MB", "5"))
     MAX_JSON_KEYS = int(os.getenv("MAX_JSON_KEYS", "200"))
+    # Active-version resolution cache: the generation file is touched on register/activate so
+    # every worker sharing ARTIFACT_DIR notices; the TTL bounds staleness when it is not shared.
+    GENERATION_FILE = os.getenv("GENERATION_FILE", os.path.join(ARTIFACT_DIR, ".generation"))
+    RESOLVE_CACHE_TTL = float(os.getenv("RESOLVE_CACHE_TTL", "5"))
+    # GET /models: page size, and how many rendered pages (per registry generation) are cached.
+    MODELS_PAGE_SIZE = int(os.getenv("MODELS_PAGE_SIZE", "100"))
+    MODELS_MAX_PAGE_SIZE = int(os.getenv("MODELS_MAX_PAGE_SIZE", "1000"))
+    MODELS_CACHE_SIZE = int(os.getenv("MODELS_CACHE_SIZE", "256"))
+    # Dynamic micro-batching defaults; enabled per version through its "batching" option.
+    BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+    BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+    # Budget for loaded models per worker (estimated from artifact size); 0 disables eviction.
+    MODEL_CACHE_MAX_MB = int(os.getenv("MODEL_CACHE_MAX_MB", "2048"))
+    # Thread pools of onnx/torch models (0 = the library default, one thread per core): set them
+    # to cores / workers so gunicorn workers do not oversubscribe the box. ONNX graphs are
+    # optimised at ONNX_GRAPH_OPTIMIZATION (disable | basic | extended | all); versions with
+    # {"runtime": {"optimized_model_cache": true}} keep the optimised graph in ONNX_OPTIMIZED_DIR.
+    # A version's "runtime" option overrides these (see mlserve.runtime.runtime_options).
+    INFERENCE_INTRA_OP_THREADS = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))
+    INFERENCE_INTER_OP_THREADS = int(os.getenv("INFERENCE_INTER_OP_THREADS", "0"))
+    ONNX_GRAPH_OPTIMIZATION = os.getenv("ONNX_GRAPH_OPTIMIZATION", "all")
+    ONNX_OPTIMIZED_DIR = os.getenv("ONNX_OPTIMIZED_DIR", os.path.join(ARTIFACT_DIR, "optimized"))
+    # Load active models at boot (/ready stays 503 until done), run a synthetic inference built
+    # from the input schema, and keep serving the old version while a new one loads.
+    PRELOAD_ON_START = os.getenv("PRELOAD_ON_START", "1") == "1"
+    WARMUP_INFERENCE = os.getenv("WARMUP_INFERENCE", "1") == "1"
+    HOT_SWAP = os.getenv("HOT_SWAP", "1") == "1"
+    # Store sklearn artifacts as uncompressed joblib and open them with mmap_mode so workers share
+    # the array pages; PRELOAD_IN_MASTER loads active models in the gunicorn master before fork.
+    MMAP_ARTIFACTS = os.getenv("MMAP_ARTIFACTS", "1") == "1"
+    PRELOAD_IN_MASTER = os.getenv("PRELOAD_IN_MASTER", "0") == "1"
+    # Process-pool inference, enabled per version with {"executor": {"mode": "process"}}:
+    # default pool size and how many requests may wait beyond the busy workers. Every server
+    # process (WEB_CONCURRENCY of them) has its own pool, so by default each gets its share of the
+    # cores. A pool only runs requests in parallel if its server process takes several at once:
+    # SERVER_MODE=asgi, or GUNICORN_THREADS > 1 in wsgi mode.
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+    EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", str(max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY)))))
+    EXECUTOR_MAX_QUEUE = int(os.getenv("EXECUTOR_MAX_QUEUE", "64"))
+    # Longest a /predict request waits for inference run by a process pool or a batcher (s); a
+    # shorter client deadline (DEADLINE_HEADER) takes precedence. Such requests get a 503.
+    INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "30"))
+    # Admission control, enabled per version with {"admission": {"max_concurrency": N}}: default
+    # queue depth beyond the running requests and longest wait for a slot. Clients send their time
+    # budget in milliseconds in DEADLINE_HEADER; requests that cannot meet it are shed early.
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+    ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "1000"))
+    DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "X-Request-Timeout-Ms")
+    # Per-row result cache, enabled per version with {"result_cache": {...}}: default backend
+    # (memory | sqlite), entry TTL, entries per store, and the sqlite store's file.
+    RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "memory")
+    RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "60"))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "100000"))
+    RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", os.path.join(ARTIFACT_DIR, ".result-cache.sqlite"))
+    # /predict stage timings: Server-Timing response header, and OpenTelemetry-style spans
+    # appended as JSON lines to TRACE_EXPORT_PATH (off when empty) for a share of requests.
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+    TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+    # Offline batch scoring: uploaded inputs and outputs live under JOB_DIR; chunks are scored
+    # in a pool of SCORING_WORKERS processes, at most two chunks per worker in flight.
+    JOB_DIR = os.getenv("JOB_DIR", os.path.join(os.path.dirname(__file__), "jobs"))
+    SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(os.cpu_count() or 1)))
+    SCORING_CHUNK_ROWS = int(os.getenv("SCORING_CHUNK_ROWS", "50000"))
+    # Background training: TRAIN_WORKERS fits run at once per server process, each using
+    # TRAIN_N_JOBS cores unless the request asks for another count (capped at TRAIN_MAX_N_JOBS).
+    TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", "1"))
+    TRAIN_N_JOBS = int(os.getenv("TRAIN_N_JOBS", "1"))
+    TRAIN_MAX_N_JOBS = int(os.getenv("TRAIN_MAX_N_JOBS", str(os.cpu_count() or 1)))
+    # Streaming (out-of-core) training: rows read per chunk and passes over the file.
+    TRAIN_STREAM_CHUNK_ROWS = int(os.getenv("TRAIN_STREAM_CHUNK_ROWS", "50000"))
+    TRAIN_STREAM_EPOCHS = int(os.getenv("TRAIN_STREAM_EPOCHS", "3"))
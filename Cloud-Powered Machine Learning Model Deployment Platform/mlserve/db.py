@@ -5,13 +5,44 @@ except ImportError:
     from sqlalchemy.ext.declarative import declarative_base
     from sqlalchemy.orm import relationship, sessionmaker
 
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint
+import os
+from sqlalchemy import create_engine, event, Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index, Text, UniqueConstraint
+from sqlalchemy.engine import make_url
 from sqlalchemy.sql import func
 from .config import Config
 
 Base = declarative_base()
-engine = create_engine(Config.DB_URL, echo=False, future=True)
+
+def _create_engine(url):
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url, echo=False, future=True, pool_size=Config.DB_POOL_SIZE,
+                             max_overflow=Config.DB_MAX_OVERFLOW, pool_pre_ping=Config.DB_POOL_PRE_PING,
+                             pool_recycle=Config.DB_POOL_RECYCLE)
+    eng = create_engine(url, echo=False, future=True, pool_pre_ping=Config.DB_POOL_PRE_PING)
+
+    @event.listens_for(eng, "connect")
+    def _sqlite_connect(dbapi_conn, _record):
+        # let SQLAlchemy emit BEGIN itself (below) instead of pysqlite's implicit one
+        dbapi_conn.isolation_level = None
+        cur = dbapi_conn.cursor()
+        cur.execute(f"PRAGMA busy_timeout = {int(Config.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.execute(f"PRAGMA journal_mode = {Config.SQLITE_JOURNAL_MODE}")
+        cur.execute(f"PRAGMA synchronous = {Config.SQLITE_SYNCHRONOUS}")
+        cur.close()
+
+    @event.listens_for(eng, "begin")
+    def _sqlite_begin(conn):
+        # Writers take the write lock up front: a deferred transaction that reads and then writes
+        # fails with "database is locked" (without waiting) if another writer got in between.
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if conn.get_execution_options().get("write") else "BEGIN")
+
+    return eng
+
+engine = _create_engine(Config.DB_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Connections/sessions that modify rows; on SQLite their transactions start with BEGIN IMMEDIATE.
+write_engine = engine.execution_options(write=True)
+WriteSession = sessionmaker(bind=write_engine, autoflush=False, autocommit=False, future=True)
 
 class Model(Base):
     __tablename__ = "models"
@@ -27,12 +58,63 @@ class ModelVersion(Base):
     version = Column(String(32), nullable=False)
     framework = Column(String(32), nullable=False)  # sklearn | torch | onnx
     path = Column(Text, nullable=False)
+    sha256 = Column(String(64), nullable=True)  # content hash: path is a blob of the artifact store
     input_schema = Column(Text, nullable=True)  # JSON string
     state = Column(String(32), default="uploaded")  # uploaded | validated | deployed
     active = Column(Boolean, default=False)
+    options = Column(Text, nullable=True)  # JSON string: per-version serving options (batching, ...)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     model = relationship("Model", back_populates="versions")
-    __table_args__ = (UniqueConstraint("model_id", "version", name="uq_model_version"),)
+    __table_args__ = (
+        UniqueConstraint("model_id", "version", name="uq_model_version"),  # also serves version lookups
+        Index("ix_model_versions_model_id_active", "model_id", "active"),  # active-version resolution
+    )
+
+class TrainingJob(Base):
+    __tablename__ = "training_jobs"
+    id = Column(Integer, primary_key=True)
+    model_name = Column(String(128), nullable=False)
+    version = Column(String(32), nullable=False)
+    target = Column(String(128), nullable=False)
+    algo = Column(String(32), default="auto")
+    mode = Column(String(16), nullable=True)  # batch (in memory) | stream (out of core)
+    n_jobs = Column(Integer, default=1)  # cores the fit may use
+    csv_path = Column(Text, nullable=False)
+    status = Column(String(32), default="queued")  # queued | running | succeeded | failed
+    rows = Column(Integer, nullable=True)
+    score = Column(Float, nullable=True)
+    train_seconds = Column(Float, nullable=True)
+    artifact_path = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class ScoringJob(Base):
+    __tablename__ = "scoring_jobs"
+    id = Column(Integer, primary_key=True)
+    model_name = Column(String(128), nullable=False)
+    version = Column(String(32), nullable=True)  # resolved version actually used
+    input_path = Column(Text, nullable=False)
+    output_path = Column(Text, nullable=False)
+    status = Column(String(32), default="queued")  # queued | running | succeeded | failed
+    total_rows = Column(Integer, nullable=True)  # known up front for Parquet only
+    rows_done = Column(Integer, default=0)
+    chunks_done = Column(Integer, default=0)
+    rows_per_sec = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
 
 def init_db():
-    Base.metadata.create_all(engine)
+    """Bring the schema up to date: the Alembic migrations (``alembic upgrade head``) create what
+    is missing, on a new database or one from an earlier release."""
+    from alembic import command
+    from alembic.config import Config as AlembicConfig
+    cfg = AlembicConfig()
+    cfg.set_main_option("script_location", os.path.join(os.path.dirname(__file__), "migrations"))
+    # one write transaction: on SQLite, workers starting at once upgrade one after the other
+    with write_engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, "head")
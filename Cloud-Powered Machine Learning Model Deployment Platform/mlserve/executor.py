@@ -0,0 +1,454 @@
+"""Out-of-process inference for CPU-bound models.
+
+A version whose options contain ``{"executor": {"mode": "process", ...}}`` is served by a pool of
+long-lived worker processes that each load the model once, so predictions run in parallel
+instead of taking turns on the server's GIL. Every worker owns two shared memory buffers: request
+arrays are written into one and predictions read back from the other, and only a small
+description of their layout goes through the pipe. Values with no flat array form (nullable
+string columns, free-form JSON) are pickled as usual.
+"""
+import atexit, logging, multiprocessing, os, pickle, queue, threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from prometheus_client import Counter, Gauge
+from .config import Config
+from .runtime import run_merged, runtime_options, _is_frame
+
+log = logging.getLogger(__name__)
+
+EXECUTOR_PENDING = Gauge(
+    "mlserve_executor_pending_requests", "Requests queued or running in an inference process pool", ["model", "version"],
+)
+EXECUTOR_REJECTED = Counter(
+    "mlserve_executor_rejected_total", "Requests rejected because the inference pool queue was full", ["model", "version"],
+)
+
+_MIN_BUFFER = 1 << 20
+_ALIGN = 64
+
+class ExecutorBusy(RuntimeError):
+    """Every inference process is busy and the version's queue is full."""
+
+class WorkerDied(RuntimeError):
+    """The inference process went away mid-request; it is restarted for the next one."""
+
+def executor_options(options):
+    """Normalise a version's ``executor`` option to ``(workers, max_queue, cpus)``, or None when
+    inference stays in the serving process. ``cpus`` is a tuple of CPU ids the workers are pinned
+    to round robin (one CPU each), or None."""
+    opt = (options or {}).get("executor")
+    if not opt:
+        return None
+    if not isinstance(opt, dict):
+        raise ValueError('the "executor" option must be a JSON object')
+    mode = opt.get("mode", "thread")
+    if mode not in ("thread", "process"):
+        raise ValueError('executor mode must be "thread" or "process"')
+    if mode != "process":
+        return None
+    try:
+        workers = max(1, int(opt.get("workers", Config.EXECUTOR_WORKERS)))
+        max_queue = max(0, int(opt.get("max_queue", Config.EXECUTOR_MAX_QUEUE)))
+        affinity = opt.get("cpu_affinity", False)
+        if affinity is True:
+            cpus = tuple(sorted(os.sched_getaffinity(0))) if hasattr(os, "sched_getaffinity") else None
+        elif affinity:
+            cpus = tuple(int(c) for c in affinity)
+        else:
+            cpus = None
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("executor workers and max_queue must be numbers, cpu_affinity true or a list of CPU ids")
+    return workers, max_queue, cpus
+
+# ---- shared memory transport
+
+class _Buffer:
+    """A shared memory block owned by this process, replaced by a larger one when needed."""
+
+    def __init__(self):
+        self.shm = None
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm is not None else None
+
+    def reserve(self, nbytes):
+        if self.shm is None or self.shm.size < nbytes:
+            size = max(nbytes, _MIN_BUFFER, 2 * self.shm.size if self.shm is not None else 0)
+            self.release()
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        return self.shm
+
+    def release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+def _flat(value):
+    """``value`` as an array that can live in a shared buffer, or None to pickle it instead."""
+    import numpy as np
+    try:
+        arr = np.asarray(value)
+    except ValueError:  # ragged lists
+        return None
+    if arr.dtype.kind == "O" and arr.size and all(type(x) is str for x in arr.flat):
+        arr = arr.astype(str)  # label / category strings as fixed-width unicode
+    return arr if arr.dtype.kind in "biufU" else None
+
+def _encode(obj, arrays):
+    """Describe ``obj`` for the pipe, collecting its flat arrays into ``arrays``."""
+    def leaf(value):
+        flat = _flat(value)
+        if flat is None:
+            return ("inline", value)
+        arrays.append(flat)
+        return ("shm", len(arrays) - 1)
+
+    if _is_frame(obj):
+        return ("frame", [(c, leaf(obj[c].to_numpy())) for c in obj.columns])
+    if isinstance(obj, dict):
+        return ("named", [(k, leaf(v)) for k, v in obj.items()])
+    if isinstance(obj, list) and obj and all(hasattr(o, "dtype") for o in obj):  # onnx outputs
+        return ("list", [leaf(o) for o in obj])
+    return ("value", leaf(obj))
+
+def _decode(spec, arrays):
+    def leaf(s):
+        return arrays[s[1]] if s[0] == "shm" else s[1]
+
+    kind, body = spec
+    if kind == "frame":
+        import pandas as pd
+        return pd.DataFrame({c: leaf(s) for c, s in body}, copy=False)
+    if kind == "named":
+        return {k: leaf(s) for k, s in body}
+    if kind == "list":
+        return [leaf(s) for s in body]
+    return leaf(body)
+
+def _place(arrays, buf):
+    """Copy ``arrays`` into ``buf`` (growing it if needed); returns their layout."""
+    import numpy as np
+    layout, offset = [], 0
+    for a in arrays:
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout.append((offset, a.dtype.str, a.shape))
+        offset += a.nbytes
+    if arrays:
+        shm = buf.reserve(offset)
+        for a, (off, dtype, shape) in zip(arrays, layout):
+            np.ndarray(shape, dtype, buffer=shm.buf, offset=off)[...] = a
+    return layout
+
+def _views(shm, layout, copy):
+    import numpy as np
+    out = []
+    for off, dtype, shape in layout:
+        view = np.ndarray(shape, dtype, buffer=shm.buf, offset=off)
+        out.append(view.copy() if copy else view)
+    return out
+
+def _portable(exc):
+    # exceptions cross the pipe pickled; some (e.g. with unpicklable args) cannot
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError(f"{exc.__class__.__name__}: {exc}")
+
+# ---- worker process
+
+def _limit_threads(framework, n):
+    # N workers each spinning up a BLAS/OpenMP pool per core would oversubscribe the box
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(n)
+    except ImportError:
+        pass
+    if framework == "torch":
+        import torch
+        torch.set_num_threads(n)
+
+def _serve(conn, framework, path, cpus, load_options=None):
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    from .runtime import ModelRuntime
+    try:
+        _limit_threads(framework, len(cpus) if cpus else 1)
+        runtime = ModelRuntime(max_cache_bytes=0)
+        model = runtime.load(framework, path, options=load_options)
+    except Exception as e:
+        conn.send(("error", _portable(e)))
+        return
+    conn.send(("ready", os.getpid()))
+    inbuf, outbuf = None, _Buffer()
+
+    def handle(in_name, layout, spec):
+        nonlocal inbuf
+        if layout and (inbuf is None or inbuf.name != in_name):
+            if inbuf is not None:
+                inbuf.close()
+            inbuf = shared_memory.SharedMemory(name=in_name)
+        inputs = _decode(spec, _views(inbuf, layout, copy=False) if layout else [])
+        out = runtime.infer(framework, model, inputs)
+        arrays = []
+        out_spec = _encode(out, arrays)
+        layout = _place(arrays, outbuf)
+        return ("ok", outbuf.name, layout, out_spec)
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            try:
+                reply = handle(*msg)
+            except Exception as e:
+                reply = ("error", _portable(e))
+            conn.send(reply)
+            reply = None  # an exception's traceback pins the views into the input buffer
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if inbuf is not None:
+            inbuf.close()
+        outbuf.release()
+
+class _Worker:
+    """Server-side handle of one inference process; used by one thread at a time."""
+
+    def __init__(self, ctx, framework, path, cpus, label, load_options=None):
+        self._conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_serve, args=(child, framework, path, cpus, load_options),
+                                   name=f"mlserve-infer-{label}", daemon=True)
+        self.process.start()
+        child.close()
+        self._in = _Buffer()
+        self._out = None  # our mapping of the worker's output buffer
+        try:
+            status, detail = self._recv()
+        except WorkerDied:
+            self.close()  # died before the handshake: reap it and drop our ends of the pipe
+            raise
+        if status != "ready":
+            self.close()
+            raise detail
+
+    def _recv(self):
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError):
+            raise WorkerDied(f"inference process {self.process.pid} exited (code {self.process.exitcode})")
+
+    def call(self, inputs):
+        arrays = []
+        spec = _encode(inputs, arrays)
+        layout = _place(arrays, self._in)
+        try:
+            self._conn.send((self._in.name, layout, spec))
+        except (BrokenPipeError, OSError):
+            raise WorkerDied(f"inference process {self.process.pid} is gone")
+        status, *rest = self._recv()
+        if status == "error":
+            raise rest[0]
+        out_name, out_layout, out_spec = rest
+        if out_layout and (self._out is None or self._out.name != out_name):
+            if self._out is not None:
+                self._out.close()
+            self._out = shared_memory.SharedMemory(name=out_name)
+        # copied out: the worker reuses its buffer for the next request
+        return _decode(out_spec, _views(self._out, out_layout, copy=True) if out_layout else [])
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self._conn.close()
+        self._in.release()
+        if self._out is not None:
+            self._out.close()
+            if self.process.exitcode != 0:
+                try:
+                    self._out.unlink()  # a killed worker cannot remove its own buffer
+                except FileNotFoundError:
+                    pass
+            self._out = None
+
+class ProcessExecutor:
+    """Runs one model version's inference in ``workers`` long-lived processes.
+
+    Requests wait in a FIFO queue and each worker takes one at a time. At most ``workers +
+    max_queue`` requests are accepted; beyond that submit() raises ExecutorBusy. A worker that
+    dies fails the request it was running and is restarted for the next one.
+    """
+
+    def __init__(self, name, version, framework, path, workers, max_queue, cpus=None, load_options=None):
+        self.name = name
+        self.version = version
+        self.framework = framework
+        self.path = path
+        self.load_options = load_options  # the version's runtime options
+        self.settings = (workers, max_queue, cpus)
+        self._tasks = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._ctx = multiprocessing.get_context("spawn")  # never fork a threaded server process
+        self._threads = [
+            threading.Thread(target=self._run, args=(i,), name=f"executor-{name}-{version}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, inputs):
+        workers, max_queue, _ = self.settings
+        future = Future()
+        with self._lock:
+            # checked and queued under the lock: close() cannot put its stop markers in between
+            if self._closed:
+                raise RuntimeError("executor is closed")
+            if self._pending >= workers + max_queue:
+                EXECUTOR_REJECTED.labels(model=self.name, version=self.version).inc()
+                raise ExecutorBusy(f"Inference queue for {self.name}:{self.version} is full ({self._pending} pending)")
+            self._pending += 1
+            EXECUTOR_PENDING.labels(model=self.name, version=self.version).set(self._pending)
+            self._tasks.put((inputs, future))
+        return future
+
+    # same signatures as ModelRuntime, so batching can run through an executor
+    def infer(self, framework, model, inputs, timeout=None):
+        """Run ``inputs`` in a worker; raises TimeoutError after ``timeout`` seconds
+        (default INFERENCE_TIMEOUT), and the request is dropped if still queued."""
+        if inputs is None:
+            raise ValueError("Payload must include 'inputs'.")
+        future = self.submit(inputs)
+        try:
+            return future.result(Config.INFERENCE_TIMEOUT if timeout is None else timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def infer_many(self, framework, model, inputs_list):
+        return run_merged(self.infer, framework, model, inputs_list)
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def close(self, wait=False):
+        """Stop accepting requests; queued ones are still served before the workers exit."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                for _ in self._threads:
+                    self._tasks.put(None)
+        if wait:
+            for t in self._threads:
+                t.join(10)
+
+    def _run(self, slot):
+        _, _, cpus = self.settings
+        cpus = (cpus[slot % len(cpus)],) if cpus else None
+        label = f"{self.name}-{self.version}-{slot}"
+        worker = error = None
+        while True:
+            if worker is None:
+                try:
+                    worker = _Worker(self._ctx, self.framework, self.path, cpus, label, self.load_options)
+                except Exception as e:
+                    log.exception("failed to start inference process %s", label)
+                    error = e
+            task = self._tasks.get()
+            if task is None:
+                break
+            inputs, future = task
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue  # its caller stopped waiting while it was queued
+                if worker is None:
+                    raise RuntimeError(f"Inference process for {self.name}:{self.version} failed to start: {error}")
+                try:
+                    result = worker.call(inputs)
+                except WorkerDied as e:
+                    # inference has no side effects: retry once on a fresh process
+                    log.error("%s; restarting", e)
+                    worker.close()
+                    worker = None
+                    worker = _Worker(self._ctx, self.framework, self.path, cpus, label, self.load_options)
+                    result = worker.call(inputs)
+                future.set_result(result)
+            except WorkerDied as e:
+                # also a replacement that died before its handshake (worker is None by then)
+                log.error("%s; restarting", e)
+                if worker is not None:
+                    worker.close()
+                worker = None
+                future.set_exception(e)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    EXECUTOR_PENDING.labels(model=self.name, version=self.version).set(self._pending)
+        if worker is not None:
+            worker.close()
+
+class ExecutorPool:
+    """One ProcessExecutor per (model, version) whose options ask for process execution."""
+
+    def __init__(self):
+        self._executors = {}  # (name, version) -> ProcessExecutor
+        self._retired = []  # closed executors that may still be draining their queues
+        self._lock = threading.Lock()
+        atexit.register(self.close_all)
+
+    def get(self, active):
+        """Return the executor serving ``active``, or None if it runs in-process."""
+        opts = executor_options(active.options)
+        load = (active.path, runtime_options(active.options))
+        key = (active.name, active.version)
+        current = self._executors.get(key)
+        if opts is None:
+            if current is not None:
+                self.discard(active.name, active.version)
+            return None
+        if current is not None and current.settings == opts and (current.path, current.load_options) == load:
+            return current
+        with self._lock:
+            current = self._executors.get(key)
+            if current is not None and current.settings == opts and (current.path, current.load_options) == load:
+                return current
+            executor = ProcessExecutor(active.name, active.version, active.framework, active.path, *opts, load_options=load[1])
+            self._executors[key] = executor
+            # a new active version retires the pools of the previous ones once their queues drain
+            stale = [self._executors.pop(k) for k in list(self._executors) if k[0] == active.name and k != key]
+        self._retire(([current] if current is not None else []) + stale)
+        return executor
+
+    def _retire(self, executors):
+        for e in executors:
+            e.close()
+        with self._lock:
+            self._retired = [e for e in self._retired if e.running] + list(executors)
+
+    def discard(self, name, version=None):
+        with self._lock:
+            keys = [k for k in self._executors if k[0] == name and (version is None or k[1] == version)]
+            executors = [self._executors.pop(k) for k in keys]
+        self._retire(executors)
+
+    def close_all(self):
+        """Shut every pool down and wait for the worker processes to exit (runs at exit)."""
+        with self._lock:
+            executors = list(self._executors.values()) + self._retired
+            self._executors.clear()
+            self._retired = []
+        for e in executors:
+            e.close(wait=True)
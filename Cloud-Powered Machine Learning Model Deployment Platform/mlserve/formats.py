@@ -0,0 +1,173 @@
+import io, json
+from operator import itemgetter
+import numpy as np
+
+JSON = "application/json"
+NPY = "application/x-npy"
+ARROW = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+MSGPACK = "application/msgpack"
+
+# request Content-Type / Accept aliases -> canonical media type
+MEDIA_TYPES = {
+    JSON: JSON,
+    NPY: NPY,
+    "application/npy": NPY,
+    ARROW: ARROW,
+    ARROW_FILE: ARROW_FILE,
+    "application/x-arrow": ARROW,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+RESPONSE_TYPES = [JSON, NPY, ARROW, MSGPACK]
+
+class CodecError(ValueError):
+    """The request body cannot be decoded as its declared media type."""
+
+class CodecUnavailable(CodecError):
+    """The media type is known but the package that handles it is not installed."""
+
+def _try_import(module_name):
+    try:
+        return __import__(module_name)
+    except Exception:
+        return None
+
+def _require(module_name, media_type):
+    mod = _try_import(module_name)
+    if mod is None:
+        raise CodecUnavailable(f"{media_type} needs the '{module_name}' package, which is not installed.")
+    return mod
+
+_orjson = _try_import("orjson")
+
+def loads_json(body):
+    """Parse a JSON request body, with orjson when it is installed; None if the body is invalid."""
+    if _orjson is not None:
+        try:
+            return _orjson.loads(body)
+        except _orjson.JSONDecodeError:
+            pass  # json.loads is more lenient (NaN/Infinity literals), let it decide
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+def rows_to_frame(rows, columns):
+    """Decode validated list-of-objects rows into a DataFrame using the schema's columns.
+
+    Each column is filled into a preallocated array of its schema type (float64 for numbers,
+    object for strings), so pandas neither scans dicts for keys nor infers dtypes.
+    """
+    import pandas as pd
+    n = len(rows)
+    data = {}
+    for col, json_type in columns:
+        values = map(itemgetter(col), rows)
+        if json_type == "number":
+            data[col] = np.fromiter(values, dtype=np.float64, count=n)
+        else:
+            arr = np.empty(n, dtype=object)
+            arr[:] = list(values)
+            data[col] = arr
+    return pd.DataFrame(data, copy=False)
+
+def canonical(media_type):
+    return MEDIA_TYPES.get((media_type or "").split(";")[0].strip().lower())
+
+def is_columnar(inputs):
+    """True for inputs decoded from a binary body (numpy array or DataFrame)."""
+    return isinstance(inputs, np.ndarray) or (hasattr(inputs, "columns") and hasattr(inputs, "iloc"))
+
+# ---- decoding
+
+def _decode_npy(body):
+    # parse the header ourselves so the array is a view on the request bytes, not a copy
+    buf = io.BytesIO(body)
+    try:
+        major, _ = np.lib.format.read_magic(buf)
+        if major == 1:
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(buf)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(buf)
+    except ValueError as e:
+        raise CodecError(f"Invalid .npy body: {e}")
+    if dtype.hasobject:
+        raise CodecError("Object arrays are not accepted in .npy bodies.")
+    count = int(np.prod(shape)) if shape else 1
+    try:
+        arr = np.frombuffer(body, dtype=dtype, count=count, offset=buf.tell())
+    except ValueError as e:
+        raise CodecError(f"Invalid .npy body: {e}")
+    return arr.reshape(shape, order="F" if fortran else "C")
+
+def _decode_arrow(body, file_format=False):
+    pa = _require("pyarrow", ARROW)
+    try:
+        buf = pa.py_buffer(body)
+        reader = pa.ipc.open_file(buf) if file_format else pa.ipc.open_stream(buf)
+        table = reader.read_all()
+    except pa.ArrowInvalid as e:
+        raise CodecError(f"Invalid Arrow IPC body: {e}")
+    # split_blocks lets numeric columns without nulls stay views on the Arrow buffers
+    return table.to_pandas(split_blocks=True)
+
+def _decode_msgpack(body):
+    msgpack = _require("msgpack", MSGPACK)
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except Exception as e:
+        raise CodecError(f"Invalid msgpack body: {e}")
+    if not isinstance(payload, dict):
+        raise CodecError("msgpack body must be a map like the JSON payload.")
+    return payload
+
+def decode_request(media_type, body):
+    """Decode a non-JSON request body into a payload dict ``{"inputs": ...}``.
+
+    npy and Arrow bodies carry the inputs themselves (an array or a DataFrame); msgpack carries the
+    same map the JSON endpoint accepts.
+    """
+    if media_type == NPY:
+        return {"inputs": _decode_npy(body)}
+    if media_type in (ARROW, ARROW_FILE):
+        return {"inputs": _decode_arrow(body, file_format=media_type == ARROW_FILE)}
+    if media_type == MSGPACK:
+        return _decode_msgpack(body)
+    raise CodecError(f"Unsupported media type: {media_type}")
+
+# ---- encoding
+
+def _as_array(framework, out):
+    # npy/Arrow carry a single array; for multi-output onnx models that is the first output
+    if framework == "onnx":
+        out = out[0]
+    arr = np.asarray(out)
+    if arr.dtype.hasobject:  # e.g. string class labels; npy/Arrow need a concrete dtype
+        arr = arr.astype(str)
+    return arr
+
+def encode_response(media_type, framework, out, meta):
+    """Encode raw infer() output for a binary response; ``meta`` is the JSON envelope minus result."""
+    if media_type == NPY:
+        buf = io.BytesIO()
+        np.save(buf, _as_array(framework, out), allow_pickle=False)
+        return buf.getvalue()
+    if media_type == ARROW:
+        pa = _require("pyarrow", ARROW)
+        arr = _as_array(framework, out)
+        if arr.ndim == 1:
+            columns = {"prediction": arr}
+        else:
+            arr = arr.reshape(len(arr), -1)
+            columns = {f"prediction_{i}": arr[:, i] for i in range(arr.shape[1])}
+        table = pa.table(columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if media_type == MSGPACK:
+        msgpack = _require("msgpack", MSGPACK)
+        from .runtime import jsonable
+        return msgpack.packb(dict(meta, result={"predictions": jsonable(framework, out)}), use_bin_type=True)
+    raise CodecError(f"Unsupported media type: {media_type}")
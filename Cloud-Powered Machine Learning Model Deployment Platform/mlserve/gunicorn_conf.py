@@ -0,0 +1,33 @@
+# gunicorn -c python:mlserve.gunicorn_conf      (serves the app selected by SERVER_MODE)
+import os
+os.environ.setdefault("WEB_CONCURRENCY", "2")  # before Config reads it to size the process pools
+from mlserve.config import Config
+
+bind = f"{Config.SERVER_HOST}:{Config.SERVER_PORT}"
+workers = Config.WEB_CONCURRENCY
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+if Config.SERVER_MODE == "asgi":
+    # one event loop per worker holds any number of idle keep-alive connections; keep them open
+    # longer than a typical load balancer's idle timeout so it never reuses a closed one
+    wsgi_app = "mlserve.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "75"))
+else:
+    wsgi_app = "mlserve.app:app"
+    keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "2"))
+    # > 1 runs each worker with that many threads; the default sync worker serves one request at
+    # a time, which leaves all but one process of a version's executor pool idle
+    threads = int(os.getenv("GUNICORN_THREADS", "1"))
+# With PRELOAD_IN_MASTER the app (and every active model) is loaded once before fork and the
+# workers share those pages copy-on-write instead of each holding its own copy.
+preload_app = Config.PRELOAD_IN_MASTER
+# Every worker appends to the same log files; renaming and gzipping them from each worker would
+# race, so unless told otherwise they are left to an outside rotator (see README, Logs). Set before
+# the app is loaded, so the workers inherit it.
+if not Config.LOG_ROTATION:
+    Config.LOG_ROTATION = "external"
+
+def post_fork(server, worker):
+    # never share pooled DB connections across processes
+    from mlserve.db import engine
+    engine.dispose(close=False)
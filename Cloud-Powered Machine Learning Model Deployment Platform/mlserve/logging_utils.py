@@ -1,29 +1,173 @@
-import json
-import logging
-import os
-from datetime import datetime
+"""Logging: JSON lines written off the request path.
+
+Handlers on the root logger only enqueue records; a QueueListener thread formats them and writes
+``mlserve.log`` (plus the console), and the ``mlserve.predictions`` logger's records go to
+``predictions.log``. With LOG_ROTATION=process, files rotate by size (or on a schedule with
+LOG_ROTATE_WHEN) and rotated files are gzipped. That is only safe while one process writes them:
+gunicorn workers all append to the same files, so there (LOG_ROTATION=external) they are left to
+logrotate, and each worker reopens a file once it has been moved away. When the queue is full
+records are dropped and counted in ``mlserve_log_records_dropped_total`` rather than blocking
+the request.
+"""
+import atexit, copy, gzip, logging, os, queue, random, shutil, threading
+import logging.handlers
+from datetime import datetime, timezone
+from prometheus_client import Counter
 from .config import Config
 
 os.makedirs(Config.LOG_DIR, exist_ok=True)
 
+LOG_DROPPED = Counter("mlserve_log_records_dropped_total", "Log records dropped because the log queue was full", ["logger"])
+
+def _dumps():
+    try:
+        import orjson
+        return lambda obj: orjson.dumps(obj, default=str).decode()
+    except ImportError:
+        import json
+        return lambda obj: json.dumps(obj, default=str)
+
 class JsonFormatter(logging.Formatter):
+    _dumps = staticmethod(_dumps())
+
     def format(self, record):
         payload = {
-            "ts": datetime.utcnow().isoformat() + "Z",
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(payload)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return self._dumps(payload)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues without blocking; a full queue drops the record and counts it."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.labels(logger=record.name).inc()
+
+    def prepare(self, record):
+        # resolve the message and traceback here (the args may change after we return) but
+        # leave the JSON encoding to the listener thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+def _file_handler(filename):
+    path = os.path.join(Config.LOG_DIR, filename)
+    rotation = Config.LOG_ROTATION or "process"
+    if rotation not in ("process", "external"):
+        raise ValueError(f"LOG_ROTATION must be 'process' or 'external', not {rotation!r}")
+    if rotation == "external":
+        handler = logging.handlers.WatchedFileHandler(path, delay=True)
+        handler.setFormatter(JsonFormatter())
+        return handler
+    if Config.LOG_ROTATE_WHEN:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=Config.LOG_ROTATE_WHEN, backupCount=Config.LOG_BACKUP_COUNT, utc=True, delay=True)
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT, delay=True)
+    if Config.LOG_COMPRESS:
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = _gzip_rotator
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+class _Pipeline:
+    """One queue and listener thread per process; restarted in forked children."""
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.queue_handler = DroppingQueueHandler(queue.Queue(Config.LOG_QUEUE_SIZE))
+        self._lock = threading.Lock()
+        self._listen()
+
+    def _listen(self):
+        self.listener = logging.handlers.QueueListener(
+            self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def restart(self):
+        # a fresh lock and queue: either may have been in use by another thread at fork time
+        self._lock = threading.Lock()
+        self.queue_handler.queue = queue.Queue(Config.LOG_QUEUE_SIZE)
+        self._listen()
+
+    def stop(self):
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()  # drains what is queued
+                self.listener = None
+        for h in self.handlers:
+            h.close()
+
+_pipeline = None
 
 def setup_logging():
+    global _pipeline
+    if _pipeline is not None:
+        return
+    main = _file_handler("mlserve.log")
+    # prediction records have their own file; everything else goes to mlserve.log and the console
+    main.addFilter(lambda r: not r.name.startswith(PREDICTION_LOGGER))
+    predictions = _file_handler("predictions.log")
+    predictions.addFilter(lambda r: r.name.startswith(PREDICTION_LOGGER))
+    handlers = [main, predictions]
+    if Config.LOG_TO_CONSOLE:
+        console = logging.StreamHandler()
+        console.setFormatter(JsonFormatter())
+        console.addFilter(lambda r: not r.name.startswith(PREDICTION_LOGGER))
+        handlers.append(console)
+    _pipeline = _Pipeline(handlers)
+
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    handler = logging.FileHandler(os.path.join(Config.LOG_DIR, "mlserve.log"))
-    handler.setFormatter(JsonFormatter())
-    console = logging.StreamHandler()
-    console.setFormatter(JsonFormatter())
-    logger.addHandler(handler)
-    logger.addHandler(console)
+    logger.addHandler(_pipeline.queue_handler)
+    atexit.register(_pipeline.stop)
+    os.register_at_fork(after_in_child=_pipeline.restart)  # the listener thread does not survive fork
+
+# ---- prediction logs
+
+PREDICTION_LOGGER = "mlserve.predictions"
+prediction_log = logging.getLogger(PREDICTION_LOGGER)
+
+def prediction_sample_rate(options):
+    """The share of this version's requests to log: its ``prediction_log`` option, else the default.
+    Raises ValueError for a malformed option."""
+    opt = (options or {}).get("prediction_log")
+    if opt is None:
+        return Config.PREDICTION_LOG_SAMPLE_RATE
+    if isinstance(opt, bool):
+        return 1.0 if opt else 0.0
+    if not isinstance(opt, dict):
+        raise ValueError('the "prediction_log" option must be a boolean or a JSON object')
+    rate = opt.get("sample_rate", Config.PREDICTION_LOG_SAMPLE_RATE)
+    if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+        # "nan" would never compare as in range: it has to be a real number of [0, 1]
+        raise ValueError("prediction_log sample_rate must be a number from 0 to 1")
+    return float(rate)
+
+def log_prediction(options, **fields):
+    """Log one request as a structured record, subject to the version's sample rate."""
+    rate = prediction_sample_rate(options)
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return
+    prediction_log.info("prediction", extra={"fields": dict(fields, sample_rate=rate)})
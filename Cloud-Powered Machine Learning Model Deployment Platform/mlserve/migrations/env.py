@@ -0,0 +1,33 @@
+from logging.config import fileConfig
+from alembic import context
+from mlserve.db import Base, engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+def run_migrations_offline():
+    context.configure(url=str(engine.url), target_metadata=Base.metadata, literal_binds=True,
+                      render_as_batch=engine.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+def _run_migrations(conn):
+    context.configure(connection=conn, target_metadata=Base.metadata,
+                      render_as_batch=conn.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    conn = config.attributes.get("connection")
+    if conn is not None:  # mlserve.db.init_db(), inside its own transaction
+        _run_migrations(conn)
+        return
+    # the application engine, so migrations get the same SQLite pragmas / pool settings
+    with engine.connect() as conn:
+        _run_migrations(conn)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,44 @@
+"""Initial schema: models and model_versions.
+
+Databases created by earlier releases already have these tables; they are left untouched, so
+``alembic upgrade head`` works on an existing mlserve.db without stamping it first.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table("models"):
+        op.create_table(
+            "models",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("name", sa.String(128), unique=True, nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    if not insp.has_table("model_versions"):
+        op.create_table(
+            "model_versions",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("model_id", sa.Integer, sa.ForeignKey("models.id"), nullable=False),
+            sa.Column("version", sa.String(32), nullable=False),
+            sa.Column("framework", sa.String(32), nullable=False),
+            sa.Column("path", sa.Text, nullable=False),
+            sa.Column("input_schema", sa.Text, nullable=True),
+            sa.Column("state", sa.String(32)),
+            sa.Column("active", sa.Boolean),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("model_id", "version", name="uq_model_version"),
+        )
+
+def downgrade():
+    op.drop_table("model_versions")
+    op.drop_table("models")
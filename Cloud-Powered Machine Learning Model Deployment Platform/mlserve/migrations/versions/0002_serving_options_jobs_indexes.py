@@ -0,0 +1,74 @@
+"""Per-version serving options, training/scoring job tables and the active-version index.
+
+Each step is skipped if the database already has it: releases before the migrations created
+the schema with create_all() and added new columns on start.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    insp = sa.inspect(op.get_bind())
+    if "options" not in {c["name"] for c in insp.get_columns("model_versions")}:
+        with op.batch_alter_table("model_versions") as batch:
+            batch.add_column(sa.Column("options", sa.Text, nullable=True))
+    if "ix_model_versions_model_id_active" not in {i["name"] for i in insp.get_indexes("model_versions")}:
+        op.create_index("ix_model_versions_model_id_active", "model_versions", ["model_id", "active"])
+
+    if not insp.has_table("training_jobs"):
+        op.create_table(
+            "training_jobs",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("model_name", sa.String(128), nullable=False),
+            sa.Column("version", sa.String(32), nullable=False),
+            sa.Column("target", sa.String(128), nullable=False),
+            sa.Column("algo", sa.String(32)),
+            sa.Column("n_jobs", sa.Integer),
+            sa.Column("csv_path", sa.Text, nullable=False),
+            sa.Column("status", sa.String(32)),
+            sa.Column("rows", sa.Integer, nullable=True),
+            sa.Column("score", sa.Float, nullable=True),
+            sa.Column("train_seconds", sa.Float, nullable=True),
+            sa.Column("artifact_path", sa.Text, nullable=True),
+            sa.Column("error", sa.Text, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+    if "mode" not in {c["name"] for c in sa.inspect(op.get_bind()).get_columns("training_jobs")}:
+        with op.batch_alter_table("training_jobs") as batch:
+            batch.add_column(sa.Column("mode", sa.String(16), nullable=True))
+
+    if not insp.has_table("scoring_jobs"):
+        op.create_table(
+            "scoring_jobs",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("model_name", sa.String(128), nullable=False),
+            sa.Column("version", sa.String(32), nullable=True),
+            sa.Column("input_path", sa.Text, nullable=False),
+            sa.Column("output_path", sa.Text, nullable=False),
+            sa.Column("status", sa.String(32)),
+            sa.Column("total_rows", sa.Integer, nullable=True),
+            sa.Column("rows_done", sa.Integer),
+            sa.Column("chunks_done", sa.Integer),
+            sa.Column("rows_per_sec", sa.Float, nullable=True),
+            sa.Column("error", sa.Text, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+def downgrade():
+    op.drop_table("scoring_jobs")
+    op.drop_table("training_jobs")
+    op.drop_index("ix_model_versions_model_id_active", table_name="model_versions")
+    with op.batch_alter_table("model_versions") as batch:
+        batch.drop_column("options")
@@ -0,0 +1,26 @@
+"""Content hash of each version's artifact (mlserve.artifact_store).
+
+Versions registered before the store keep a NULL sha256 until
+``python -m mlserve.artifact_store adopt`` moves their files into it.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    insp = sa.inspect(op.get_bind())
+    if "sha256" not in {c["name"] for c in insp.get_columns("model_versions")}:
+        with op.batch_alter_table("model_versions") as batch:
+            batch.add_column(sa.Column("sha256", sa.String(64), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table("model_versions") as batch:
+        batch.drop_column("sha256")
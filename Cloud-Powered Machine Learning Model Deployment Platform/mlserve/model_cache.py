@@ -0,0 +1,135 @@
+import logging, os, threading
+from collections import OrderedDict
+from prometheus_client import Counter, Gauge
+
+log = logging.getLogger(__name__)
+
+CACHE_HITS = Counter("mlserve_model_cache_hits_total", "Model loads served from the in-process cache")
+CACHE_MISSES = Counter("mlserve_model_cache_misses_total", "Model loads that had to read the artifact")
+CACHE_EVICTIONS = Counter("mlserve_model_cache_evictions_total", "Models dropped from the cache", ["reason"])
+CACHE_BYTES = Gauge("mlserve_model_cache_resident_bytes", "Estimated bytes held by cached models")
+CACHE_MODELS = Gauge("mlserve_model_cache_models", "Models held by the cache")
+
+def estimate_bytes(path):
+    """Rough resident size of a loaded artifact: its size on disk (file or directory)."""
+    if os.path.isdir(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+class ModelCache:
+    """LRU cache of loaded models bounded by an estimated memory budget.
+
+    Models pinned as the active version of a model name are never evicted; pinning a new
+    version for a name unpins and unloads the previous one. ``max_bytes <= 0`` disables the
+    budget (nothing is evicted except on deactivation).
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (model, nbytes)
+        self._pinned = {}  # model name -> key
+        self._pinned_keys = set()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def resident_bytes(self):
+        return self._bytes
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_MISSES.inc()
+                return None
+            self._entries.move_to_end(key)
+        CACHE_HITS.inc()
+        return entry[0]
+
+    def peek(self, key):
+        """The cached model for ``key`` or None, without counting a hit/miss or touching LRU order."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key, model, nbytes, pin=None):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (model, nbytes)
+            self._bytes += nbytes
+            if pin is not None:
+                self._set_pin(pin, key)
+            self._evict()
+            self._update_gauges()
+
+    def pin(self, name, key):
+        if self._pinned.get(name) == key:
+            return
+        with self._lock:
+            self._set_pin(name, key)
+            self._evict()
+            self._update_gauges()
+
+    def _set_pin(self, name, key):
+        previous = self._pinned.get(name)
+        if previous == key:
+            return
+        self._pinned[name] = key
+        self._pinned_keys = set(self._pinned.values())
+        if previous is not None and previous not in self._pinned_keys:
+            self._drop(previous, "deactivated")
+
+    def unpin(self, name, unload=True):
+        with self._lock:
+            key = self._pinned.pop(name, None)
+            self._pinned_keys = set(self._pinned.values())
+            if key is not None and unload and key not in self._pinned_keys:
+                self._drop(key, "deactivated")
+            self._update_gauges()
+        return key
+
+    def unload(self, key):
+        with self._lock:
+            if key in self._pinned_keys:
+                for name in [n for n, k in self._pinned.items() if k == key]:
+                    del self._pinned[name]
+                self._pinned_keys = set(self._pinned.values())
+            dropped = self._drop(key, "unloaded")
+            self._update_gauges()
+        return dropped
+
+    def _drop(self, key, reason):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        CACHE_EVICTIONS.labels(reason=reason).inc()
+        return True
+
+    def _evict(self):
+        if self.max_bytes <= 0:
+            return
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                return
+            if key not in self._pinned_keys:
+                self._drop(key, "budget")
+        if self._bytes > self.max_bytes:
+            log.warning("model cache over budget: %d pinned bytes > %d", self._bytes, self.max_bytes)
+
+    def _update_gauges(self):
+        CACHE_BYTES.set(self._bytes)
+        CACHE_MODELS.set(len(self._entries))
@@ -1,16 +1,166 @@
-import os, json, shutil
+import contextlib, logging, os, json, shutil, threading, time
+from collections import namedtuple
 from sqlalchemy import select
-from .db import SessionLocal, Model, ModelVersion, init_db
+from sqlalchemy.orm import selectinload
+from .artifact_store import ArtifactStore, CHUNK, suffix_of
+from .db import SessionLocal, WriteSession, Model, ModelVersion, init_db
 from .config import Config
+from .validation import compile_validator
+
+log = logging.getLogger(__name__)
+
+# What /predict needs to know about a model's active version, resolved once and cached.
+ActiveVersion = namedtuple("ActiveVersion", ["name", "version", "framework", "path", "schema", "validator", "options"])
+
+# First bytes of the compressed containers joblib can write; an uncompressed joblib file starts
+# with the pickle PROTO opcode instead.
+_JOBLIB_PICKLE_MAGIC = b"\x80"
+
+def _is_compressed_joblib(fh):
+    head = fh.read(1)
+    fh.seek(0)
+    return head != _JOBLIB_PICKLE_MAGIC
+
+def _open_upload(file_storage):
+    # werkzeug's FileStorage holds an open stream; LocalFile opens its file on disk
+    if hasattr(file_storage, "open"):
+        return file_storage.open()
+    return contextlib.nullcontext(file_storage.stream)
+
+def _read_generation():
+    try:
+        st = os.stat(Config.GENERATION_FILE)
+    except FileNotFoundError:
+        return None
+    # the file is replaced on every bump, so the inode changes even within one mtime tick
+    return (st.st_ino, st.st_mtime_ns)
 
 class Registry:
     def __init__(self):
         init_db()
         os.makedirs(Config.ARTIFACT_DIR, exist_ok=True)
+        self.store = ArtifactStore()
+        self._active = {}  # name -> (ActiveVersion, generation, resolved_at, raw_schema)
+        self._lock = threading.Lock()
+
+    def generation(self):
+        return _read_generation()
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._active.clear()
+            else:
+                self._active.pop(name, None)
+        tmp = f"{Config.GENERATION_FILE}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w") as fh:
+            fh.write(str(time.time_ns()))
+        os.replace(tmp, Config.GENERATION_FILE)
+
+    def resolve_active(self, name):
+        """Return the ActiveVersion for ``name`` or None if it has no active version."""
+        gen = _read_generation()
+        now = time.monotonic()
+        hit = self._active.get(name)
+        if hit is not None and hit[1] == gen and now - hit[2] < Config.RESOLVE_CACHE_TTL:
+            return hit[0]
+
+        with SessionLocal() as s:
+            row = s.execute(
+                select(ModelVersion.version, ModelVersion.framework, ModelVersion.path,
+                       ModelVersion.input_schema, ModelVersion.options)
+                .join(Model, Model.id == ModelVersion.model_id)
+                .where(Model.name == name, ModelVersion.active.is_(True))
+            ).first()
+        if row is None:
+            with self._lock:
+                self._active.pop(name, None)
+            return None
+        if hit is not None and hit[0].version == row.version and hit[3] == row.input_schema:
+            # same version and schema, only the stamp moved: keep the compiled validator
+            active = hit[0]._replace(framework=row.framework, path=row.path,
+                                     options=json.loads(row.options) if row.options else {})
+        else:
+            schema = json.loads(row.input_schema) if row.input_schema else None
+            active = ActiveVersion(
+                name=name,
+                version=row.version,
+                framework=row.framework,
+                path=row.path,
+                schema=schema,
+                validator=compile_validator(schema) if schema else None,
+                options=json.loads(row.options) if row.options else {},
+            )
+        with self._lock:
+            self._active[name] = (active, gen, now, row.input_schema)
+        return active
+
+    def get_version(self, name, version=None):
+        """Resolve a specific version (uncached) or, with ``version=None``, the active one."""
+        if version is None:
+            return self.resolve_active(name)
+        with SessionLocal() as s:
+            row = s.execute(
+                select(ModelVersion.version, ModelVersion.framework, ModelVersion.path,
+                       ModelVersion.input_schema, ModelVersion.options)
+                .join(Model, Model.id == ModelVersion.model_id)
+                .where(Model.name == name, ModelVersion.version == version)
+            ).first()
+        if row is None:
+            return None
+        schema = json.loads(row.input_schema) if row.input_schema else None
+        return ActiveVersion(
+            name=name,
+            version=row.version,
+            framework=row.framework,
+            path=row.path,
+            schema=schema,
+            validator=compile_validator(schema) if schema else None,
+            options=json.loads(row.options) if row.options else {},
+        )
+
+    def active_model_names(self):
+        with SessionLocal() as s:
+            return list(s.execute(
+                select(Model.name).join(ModelVersion, Model.id == ModelVersion.model_id)
+                .where(ModelVersion.active.is_(True)).distinct()
+            ).scalars())
 
-    def list_models(self):
+    def has_model(self, name):
         with SessionLocal() as s:
-            models = s.query(Model).all()
+            return s.execute(select(Model.id).where(Model.name == name)).first() is not None
+
+    def list_models(self, prefix=None, framework=None, active_only=False):
+        return self.page_models(prefix=prefix, framework=framework, active_only=active_only)[0]
+
+    def page_models(self, prefix=None, framework=None, active_only=False, limit=None, after=None):
+        """Models ordered by name, with their versions, in two queries however many there are.
+
+        ``framework``/``active_only`` filter both the versions shown and the models listed (a model
+        is listed if any version matches). Returns ``(models, last_name)``; ``last_name`` is set
+        when more models follow and is passed back as ``after`` for the next page.
+        """
+        criteria = []
+        if framework:
+            criteria.append(ModelVersion.framework == framework)
+        if active_only:
+            criteria.append(ModelVersion.active.is_(True))
+        versions = Model.versions.and_(*criteria) if criteria else Model.versions
+        q = select(Model).options(selectinload(versions)).order_by(Model.name)
+        if prefix:
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            q = q.where(Model.name.like(escaped + "%", escape="\\"))
+        if criteria:
+            q = q.where(Model.versions.any(*criteria))
+        if after is not None:
+            q = q.where(Model.name > after)
+        if limit is not None:
+            q = q.limit(limit + 1)
+        with SessionLocal() as s:
+            models = s.execute(q).scalars().all()
+            more = limit is not None and len(models) > limit
+            if more:
+                models = models[:limit]
             out = []
             for m in models:
                 versions = [{
@@ -18,18 +168,34 @@ class Registry:
                     "framework": v.framework,
                     "state": v.state,
                     "active": v.active,
+                    "options": json.loads(v.options) if v.options else {},
                     "created_at": v.created_at.isoformat() if v.created_at else None
-                } for v in m.versions]
+                } for v in sorted(m.versions, key=lambda v: v.id)]
                 out.append({"name": m.name, "versions": versions})
-            return out
+        return out, (out[-1]["name"] if more else None)
 
-    def register(self, name, version, framework, file_storage, input_schema=None):
-        dest_dir = os.path.join(Config.ARTIFACT_DIR, name, version)
-        os.makedirs(dest_dir, exist_ok=True)
-        dest_path = os.path.join(dest_dir, file_storage.filename)
-        file_storage.save(dest_path)
+    def store_artifact(self, framework, file_storage):
+        """Stream an upload into the artifact store; returns its Blob."""
+        with _open_upload(file_storage) as src, self.store.writer(suffix_of(file_storage.filename)) as w:
+            if framework == "sklearn" and Config.MMAP_ARTIFACTS and _is_compressed_joblib(src):
+                # stored uncompressed so its arrays can be memory-mapped
+                import joblib
+                joblib.dump(joblib.load(src), w)
+            else:
+                shutil.copyfileobj(src, w, CHUNK)
+        return w.blob
 
-        with SessionLocal() as s:
+    def register(self, name, version, framework, file_storage=None, input_schema=None, options=None, blob=None):
+        """Record ``version`` of ``name``. The artifact is either an upload (``file_storage``: a
+        werkzeug FileStorage or a training.LocalFile), streamed into the artifact store, or a
+        ``blob`` the caller already wrote there."""
+        if blob is None:
+            blob = self.store_artifact(framework, file_storage)
+        if not blob.created:
+            log.info("artifact of %s:%s is already stored as %s", name, version, blob.sha256)
+        dest_path = blob.path
+
+        with WriteSession() as s:
             model = s.execute(select(Model).where(Model.name == name)).scalar_one_or_none()
             if not model:
                 model = Model(name=name)
@@ -48,10 +214,15 @@ class Registry:
                 # overwrite fields but keep 'active' flag as-is
                 existing.framework = framework
                 existing.path = dest_path
+                existing.sha256 = blob.sha256
                 existing.input_schema = input_schema or existing.input_schema
+                if options is not None:
+                    existing.options = json.dumps(options)
                 existing.state = "validated"
                 s.commit()
-                return {"name": name, "version": version, "framework": framework, "path": dest_path, "updated": True}
+                self.invalidate(name)
+                return {"name": name, "version": version, "framework": framework, "path": dest_path,
+                        "sha256": blob.sha256, "updated": True}
 
             # otherwise create a new row
             mv = ModelVersion(
@@ -59,15 +230,47 @@ class Registry:
                 version=version,
                 framework=framework,
                 path=dest_path,
+                sha256=blob.sha256,
                 input_schema=input_schema or None,
+                options=json.dumps(options) if options else None,
                 state="validated",
                 active=False
             )
             s.add(mv)
             s.commit()
-        return {"name": name, "version": version, "framework": framework, "path": dest_path}
-    def activate(self, name, version):
+        self.invalidate(name)
+        return {"name": name, "version": version, "framework": framework, "path": dest_path, "sha256": blob.sha256}
+
+    def adopt_artifacts(self):
+        """Move the artifacts of versions registered before the artifact store into it, so
+        identical ones are kept once. Returns ``{"adopted", "deduplicated", "missing"}`` counts."""
         with SessionLocal() as s:
+            rows = s.execute(
+                select(ModelVersion.id, ModelVersion.path, Model.name)
+                .join(Model, Model.id == ModelVersion.model_id)
+                .where(ModelVersion.sha256.is_(None))
+            ).all()
+        by_path = {}
+        for row in rows:
+            by_path.setdefault(row.path, []).append(row)
+        counts = {"adopted": 0, "deduplicated": 0, "missing": 0}
+        for path, versions in by_path.items():
+            if not os.path.isfile(path):
+                counts["missing"] += len(versions)
+                continue
+            blob = self.store.adopt(path)
+            with WriteSession() as s:
+                for row in versions:
+                    mv = s.get(ModelVersion, row.id)
+                    mv.path, mv.sha256 = blob.path, blob.sha256
+                s.commit()
+            counts["adopted" if blob.created else "deduplicated"] += 1
+            for name in {row.name for row in versions}:
+                self.invalidate(name)
+        return counts
+
+    def activate(self, name, version):
+        with WriteSession() as s:
             model = s.execute(select(Model).where(Model.name == name)).scalar_one_or_none()
             if not model:
                 raise ValueError(f"Model '{name}' not found.")
@@ -81,4 +284,19 @@ class Registry:
                 if mv.active:
                     mv.state = "deployed"
             s.commit()
+        self.invalidate(name)
         return {"name": name, "active_version": version}
+
+    def set_options(self, name, version, options):
+        """Replace the serving options of one version; takes effect on the next resolution."""
+        with WriteSession() as s:
+            mv = s.execute(
+                select(ModelVersion).join(Model, Model.id == ModelVersion.model_id)
+                .where(Model.name == name, ModelVersion.version == version)
+            ).scalar_one_or_none()
+            if not mv:
+                raise ValueError(f"Version '{version}' not found for model '{name}'.")
+            mv.options = json.dumps(options) if options else None
+            s.commit()
+        self.invalidate(name)
+        return {"name": name, "version": version, "options": options or {}}
@@ -0,0 +1,296 @@
+"""Per-row prediction cache.
+
+Enabled per version with ``{"result_cache": {"ttl": 60, "backend": "memory"}}`` (or ``true``).
+Every input row of a validated request is hashed canonically; rows seen before are answered from
+the cache and only the misses go through the model, their outputs merged back in request order.
+
+Keys are namespaced by model and version and by what the version answers with: its artifact,
+runtime options and input schema. Re-registering or retuning a version (in any worker) makes its
+earlier entries unreachable, while other versions keep theirs; stale entries age out by TTL and size.
+Backends: ``memory`` (this process, LRU) and ``sqlite`` (one file shared by every worker on the
+host); more can be added with register_store().
+"""
+import hashlib, logging, math, pickle, sqlite3, threading, time
+from collections import OrderedDict
+from prometheus_client import Counter, Gauge
+from .config import Config
+from .backends import is_frame
+
+log = logging.getLogger(__name__)
+
+CACHE_ROWS = Counter("mlserve_result_cache_rows_total", "Input rows looked up in the result cache", ["model", "result"])
+CACHE_HIT_RATIO = Gauge("mlserve_result_cache_hit_ratio", "Share of looked-up rows answered from the result cache since start", ["model"])
+
+MISS = object()
+
+def cache_options(options):
+    """Normalise a version's ``result_cache`` option to ``(backend, ttl_s)`` or None.
+    Raises ValueError for a malformed option."""
+    opt = (options or {}).get("result_cache")
+    if not opt:
+        return None
+    if opt is True:
+        opt = {}
+    if not isinstance(opt, dict):
+        raise ValueError('the "result_cache" option must be true or a JSON object')
+    if not opt.get("enabled", True):
+        return None
+    backend = opt.get("backend", Config.RESULT_CACHE_BACKEND)
+    if backend not in _STORES:
+        raise ValueError(f"result_cache backend must be one of {', '.join(sorted(_STORES))}")
+    try:
+        ttl = float(opt.get("ttl", Config.RESULT_CACHE_TTL))
+    except (TypeError, ValueError):
+        raise ValueError("result_cache ttl must be a number of seconds")
+    if not math.isfinite(ttl) or ttl < 0:
+        raise ValueError("result_cache ttl must be a finite, non-negative number of seconds")
+    return backend, ttl
+
+# ---- row hashing
+
+def _canon(value):
+    # JSON numbers: 1 and 1.0 are the same feature value
+    if type(value) is int:
+        return float(value)
+    if isinstance(value, dict):
+        return {k: _canon(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canon(v) for v in value]
+    return value
+
+def _dumps():
+    try:
+        import orjson
+        return lambda obj: orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    except ImportError:
+        import json
+        return lambda obj: json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def namespace(active):
+    """Key prefix of ``active``'s entries."""
+    stamp = [active.name, active.version, active.framework, active.path,
+             (active.options or {}).get("runtime"), active.schema]
+    return _digest(_dumps()(stamp))[:8]
+
+def row_hashes(inputs):
+    """One digest per input row, or None if ``inputs`` has no row structure we can hash."""
+    try:
+        if isinstance(inputs, list):
+            dumps = _dumps()
+            return [_digest(dumps(_canon(r))) for r in inputs]
+        if is_frame(inputs):
+            import pandas as pd
+            # columns and dtypes are part of every key; the rows themselves are hashed vectorised
+            sig = _digest(repr([(str(c), str(t)) for c, t in inputs.dtypes.items()]).encode())[:8]
+            return [sig + h.tobytes() for h in pd.util.hash_pandas_object(inputs, index=False).to_numpy()]
+        if hasattr(inputs, "dtype") and getattr(inputs, "ndim", 0) >= 1 and inputs.dtype.kind in "biufU":
+            import numpy as np
+            arr = np.ascontiguousarray(inputs)
+            sig = f"{arr.dtype.str}{arr.shape[1:]}".encode()
+            return [_digest(sig + r.tobytes()) for r in arr.reshape(len(arr), -1)]
+    except (TypeError, ValueError):  # unhashable contents (e.g. bytes from msgpack)
+        return None
+    return None
+
+def select_rows(inputs, index):
+    """The rows of ``inputs`` at ``index``, in the same container type."""
+    if isinstance(inputs, list):
+        return [inputs[i] for i in index]
+    if is_frame(inputs):
+        return inputs.iloc[index].reset_index(drop=True)
+    return inputs[index]
+
+# ---- stores
+
+class MemoryStore:
+    """LRU dict in this process."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get_many(self, keys, now):
+        out = []
+        with self._lock:
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is None or entry[0] <= now:
+                    out.append(MISS)
+                else:
+                    self._entries.move_to_end(k)
+                    out.append(entry[1])
+        return out
+
+    def put_many(self, items, expires):
+        with self._lock:
+            for k, v in items:
+                self._entries[k] = (expires, v)
+                self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SqliteStore:
+    """A SQLite file shared by every worker on the host (WAL mode, one connection per thread).
+
+    Size is enforced approximately: expired rows, then the soonest-expiring ones, are deleted
+    every max_entries/10 writes.
+    """
+
+    _CHUNK = 500  # keys per SELECT, well under SQLite's bound-parameter limit
+
+    def __init__(self, max_entries, path=None):
+        self.max_entries = max_entries
+        self.path = path or Config.RESULT_CACHE_PATH
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS ix_results_expires ON results (expires)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = OFF")  # a cache: losing the tail on a crash is fine
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys, now):
+        found = {}
+        conn = self._conn()
+        for i in range(0, len(keys), self._CHUNK):
+            chunk = keys[i:i + self._CHUNK]
+            found.update(conn.execute(
+                f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(chunk))}) AND expires > ?",
+                [*chunk, now],
+            ))
+        return [pickle.loads(found[k]) if k in found else MISS for k in keys]
+
+    def put_many(self, items, expires):
+        conn = self._conn()
+        conn.executemany("INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)",
+                         [(k, pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL), expires) for k, v in items])
+        self._writes += len(items)
+        if self._writes >= max(100, self.max_entries // 10):
+            self._writes = 0
+            self._trim(conn)
+
+    def _trim(self, conn):
+        conn.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+        excess = conn.execute("SELECT count(*) FROM results").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY expires LIMIT ?)", (excess,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM results")
+
+_STORES = {"memory": MemoryStore, "sqlite": SqliteStore}
+
+def register_store(name, factory):
+    """Make ``factory(max_entries)`` available as result cache backend ``name``."""
+    _STORES[name] = factory
+
+# ---- cache
+
+class Lookup:
+    """Cached outputs for one request's rows; ``misses`` are the row indices still to be run."""
+
+    def __init__(self, cache, store, keys, values, ttl):
+        self._cache = cache
+        self._store = store
+        self._keys = keys
+        self._values = values
+        self._ttl = ttl
+        self.misses = [i for i, v in enumerate(values) if v is MISS]
+
+    @property
+    def complete(self):
+        return not self.misses
+
+    @property
+    def partial(self):
+        return 0 < len(self.misses) < len(self._values)
+
+    def merge(self, framework, out=None):
+        """Cache ``out`` (the model output for the missed rows, in order) and return the output
+        for every row of the request."""
+        import numpy as np
+        multi = framework == "onnx"  # a list of output arrays
+        if self.misses:
+            fresh = list(zip(*out)) if multi else list(out)
+            self._cache.store(self._store, [(self._keys[i], v) for i, v in zip(self.misses, fresh)], self._ttl)
+            if len(self.misses) == len(self._values):
+                return out
+            for i, v in zip(self.misses, fresh):
+                self._values[i] = v
+        if multi:
+            return [np.asarray(col) for col in zip(*self._values)]
+        return np.asarray(self._values)
+
+class ResultCache:
+    """The result caches of this process: one store per backend, shared by every version."""
+
+    def __init__(self):
+        self._stores = {}
+        self._stats = {}  # model -> [hit rows, looked-up rows]
+        self._lock = threading.Lock()
+
+    def _store(self, backend):
+        store = self._stores.get(backend)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(backend)
+                if store is None:
+                    factory = _STORES.get(backend)
+                    if factory is None:
+                        raise ValueError(f"Unknown result cache backend '{backend}'")
+                    store = self._stores[backend] = factory(Config.RESULT_CACHE_MAX_ENTRIES)
+        return store
+
+    def lookup(self, active, inputs):
+        """Return a Lookup for ``inputs``, or None if caching is off for this version or the
+        inputs have no row structure (the request then runs uncached)."""
+        opts = cache_options(active.options)
+        if opts is None or inputs is None:
+            return None
+        backend, ttl = opts
+        try:
+            hashes = row_hashes(inputs)
+            if not hashes:
+                return None
+            ns = namespace(active)
+            keys = [ns + h for h in hashes]
+            store = self._store(backend)
+            values = store.get_many(keys, time.time())
+        except Exception as e:  # the cache must never fail a prediction
+            log.warning("result cache lookup failed for %s:%s: %s", active.name, active.version, e)
+            return None
+        hits = sum(v is not MISS for v in values)
+        self._count(active.name, hits, len(values))
+        return Lookup(self, store, keys, values, ttl)
+
+    def store(self, store, items, ttl):
+        try:
+            store.put_many(items, time.time() + ttl)
+        except Exception as e:
+            log.warning("result cache write failed: %s", e)
+
+    def _count(self, model, hits, rows):
+        CACHE_ROWS.labels(model=model, result="hit").inc(hits)
+        CACHE_ROWS.labels(model=model, result="miss").inc(rows - hits)
+        with self._lock:
+            stats = self._stats.setdefault(model, [0, 0])
+            stats[0] += hits
+            stats[1] += rows
+            ratio = stats[0] / stats[1]
+        CACHE_HIT_RATIO.labels(model=model).set(ratio)
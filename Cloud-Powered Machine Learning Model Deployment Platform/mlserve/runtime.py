@@ -1,68 +1,151 @@
-import joblib
+import json
+from itertools import chain
+from .config import Config
+from .artifact_store import verify
+from .model_cache import ModelCache, estimate_bytes
+from .backends import get_backend, is_frame as _is_frame
 
-def _try_import(module_name):
-    try:
-        return __import__(module_name)
-    except Exception:
-        return None
+# keys of a version's "runtime" option; each backend uses the ones that apply to it
+RUNTIME_KEYS = ("intra_op_threads", "inter_op_threads", "graph_optimization", "optimized_model_cache",
+                "optimize_for_inference")
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
 
-torch = _try_import("torch")
-onnxruntime = _try_import("onnxruntime")
+def runtime_options(options):
+    """A version's ``runtime`` option, passed to its backend's load(), or None when unset.
+    Raises ValueError for keys or values no backend understands."""
+    opt = (options or {}).get("runtime")
+    if not opt:
+        return None
+    if not isinstance(opt, dict):
+        raise ValueError('the "runtime" option must be a JSON object')
+    unknown = sorted(set(opt) - set(RUNTIME_KEYS))
+    if unknown:
+        raise ValueError(f"unknown runtime option(s): {', '.join(unknown)}")
+    level = opt.get("graph_optimization")
+    if level is not None and level not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"graph_optimization must be one of {', '.join(GRAPH_OPTIMIZATION_LEVELS)}")
+    for k in ("intra_op_threads", "inter_op_threads"):
+        if k in opt and (not isinstance(opt[k], int) or opt[k] < 0):
+            raise ValueError(f"{k} must be a non-negative integer")
+    return dict(opt)
 
 class ModelRuntime:
-    def __init__(self):
-        self.cache = {}
-
-    def load(self, framework: str, path: str):
-        key = (framework, path)
-        if key in self.cache:
-            return self.cache[key]
-        if framework == "sklearn":
-            model = joblib.load(path)
-        elif framework == "torch":
-            if torch is None:
-                raise RuntimeError("PyTorch not installed.")
-            model = torch.jit.load(path) if path.endswith('.pt') else torch.load(path, map_location="cpu")
-            model.eval()
-        elif framework == "onnx":
-            if onnxruntime is None:
-                raise RuntimeError("onnxruntime not installed.")
-            model = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'])
-        else:
-            raise ValueError(f"Unsupported framework: {framework}")
-        self.cache[key] = model
+    def __init__(self, max_cache_bytes=None):
+        if max_cache_bytes is None:
+            max_cache_bytes = Config.MODEL_CACHE_MAX_MB * 1024 * 1024
+        self.cache = ModelCache(max_cache_bytes)
+
+    @staticmethod
+    def key(framework: str, path: str, options: dict = None):
+        """Cache key of a model: versions sharing an artifact share the loaded model unless their
+        runtime options differ."""
+        if not options:
+            return (framework, path)
+        return (framework, path, json.dumps(options, sort_keys=True))
+
+    def key_for(self, active):
+        return self.key(active.framework, active.path, runtime_options(active.options))
+
+    def load(self, framework: str, path: str, pin: str = None, options: dict = None):
+        """Return the loaded model, reading the artifact on a cache miss.
+
+        ``pin`` names the model this version is active for; pinned versions are never evicted
+        and pinning a new version for the same name unloads the previous one. ``options`` are
+        the version's runtime options (see runtime_options).
+        """
+        key = self.key(framework, path, options)
+        model = self.cache.get(key)
+        if model is not None:
+            if pin is not None:
+                self.cache.pin(pin, key)
+            return model
+        model = self._load(framework, path, options)
+        self.cache.put(key, model, estimate_bytes(path), pin=pin)
         return model
 
-    def predict(self, framework: str, model, payload: dict):
-        inputs = payload.get("inputs")
+    def unload(self, framework: str, path: str, options: dict = None):
+        return self.cache.unload(self.key(framework, path, options))
+
+    def _load(self, framework: str, path: str, options: dict = None):
+        if Config.ARTIFACT_VERIFY:
+            verify(path)
+        backend = get_backend(framework)
+        # backends from before runtime options take only the path
+        return backend.load(path, options) if options else backend.load(path)
+
+    def infer(self, framework: str, model, inputs):
+        """Run ``model`` on ``inputs`` and return its raw output.
+
+        ``inputs`` is what a request's "inputs" decodes to: JSON lists/objects, or a numpy array /
+        DataFrame decoded straight from a binary body. The output is an array (a list of arrays
+        for onnx) so callers can encode it without going through Python lists.
+        """
         if inputs is None:
             raise ValueError("Payload must include 'inputs'.")
-        if framework == "sklearn":
-            import numpy as np
-            # Allow list of dicts (from auto-train) OR list of lists (manual schema)
-            if isinstance(inputs, list) and inputs and isinstance(inputs[0], dict):
-                # Convert list-of-dicts to DataFrame then back to array via columns order
-                import pandas as pd
-                df = pd.DataFrame(inputs)
-                preds = model.predict(df).tolist()
-            else:
-                X = np.array(inputs)
-                preds = model.predict(X).tolist()
-            return {"predictions": preds}
-        elif framework == "torch":
-            import torch as T
-            X = T.tensor(inputs, dtype=T.float32)
-            with T.inference_mode():
-                out = model(X)
-            out = out.detach().cpu().numpy().tolist()
-            return {"predictions": out}
-        elif framework == "onnx":
-            import numpy as np
-            if isinstance(inputs, dict):
-                ort_inputs = {k: (np.array(v) if not hasattr(v, 'dtype') else v) for k, v in inputs.items()}
-            else:
-                ort_inputs = {"input": np.array(inputs)}
-            out = model.run(None, ort_inputs)
-            return {"predictions": [o.tolist() for o in out]}
+        return get_backend(framework).infer(model, inputs)
+
+    def predict(self, framework: str, model, payload: dict):
+        return {"predictions": jsonable(framework, self.infer(framework, model, payload.get("inputs")))}
+
+    def infer_many(self, framework: str, model, inputs_list):
+        return run_merged(self.infer, framework, model, inputs_list)
+
+    def predict_many(self, framework: str, model, payloads):
+        outs = self.infer_many(framework, model, [p.get("inputs") for p in payloads])
+        return [{"predictions": jsonable(framework, o)} for o in outs]
+
+def run_merged(infer, framework, model, inputs_list):
+    """Run several requests' inputs through one ``infer`` call and split the raw output back.
+
+    Inputs are concatenated along the first (row) axis, so every request must use the same
+    input layout; mixed layouts are simply run one by one.
+    """
+    if any(x is None for x in inputs_list):
+        raise ValueError("Payload must include 'inputs'.")
+    layouts = {_layout(x) for x in inputs_list}
+    if len(inputs_list) == 1 or len(layouts) != 1 or ("other",) in layouts:
+        return [infer(framework, model, x) for x in inputs_list]
+
+    first = inputs_list[0]
+    if isinstance(first, dict):
+        merged = {k: list(chain.from_iterable(x[k] for x in inputs_list)) for k in first}
+        counts = [len(next(iter(x.values()))) for x in inputs_list]
+    elif _is_frame(first):
+        import pandas as pd
+        merged = pd.concat(inputs_list, ignore_index=True)
+        counts = [len(x) for x in inputs_list]
+    elif hasattr(first, "dtype"):
+        import numpy as np
+        merged = np.concatenate(inputs_list)
+        counts = [len(x) for x in inputs_list]
+    else:
+        merged = list(chain.from_iterable(inputs_list))
+        counts = [len(x) for x in inputs_list]
+    out = infer(framework, model, merged)
+
+    parts, start = [], 0
+    for n in counts:
+        if framework == "onnx":
+            parts.append([o[start:start + n] for o in out])
         else:
-            raise ValueError(f"Unsupported framework: {framework}")
+            parts.append(out[start:start + n])
+        start += n
+    return parts
+
+def jsonable(framework, out):
+    """Turn infer() output into plain lists for a JSON response."""
+    if framework == "onnx":
+        return [o.tolist() for o in out]
+    return out.tolist()
+
+def _layout(inputs):
+    # what infer() would do with these inputs; only requests with equal layouts can be merged
+    if isinstance(inputs, dict):
+        return ("named", tuple(sorted(inputs)))
+    if _is_frame(inputs):
+        return ("frame", tuple(inputs.columns))
+    if hasattr(inputs, "dtype") and getattr(inputs, "ndim", 0) >= 1:
+        return ("array", inputs.dtype.str, inputs.shape[1:])
+    if isinstance(inputs, list) and inputs:
+        return ("rows", type(inputs[0]).__name__)
+    return ("other",)
@@ -0,0 +1,155 @@
+"""Per-stage timing of /predict requests.
+
+Each request carries a Trace that times its stages (auth, decode, registry, admission, load with
+a cache hit/miss description, validation, result_cache, inference, serialize). When the request
+ends the stages are observed into
+``mlserve_predict_stage_seconds`` under the model and version actually served (unknown model
+names collapse into one label value), rendered as a ``Server-Timing`` header, and, if
+TRACE_EXPORT_PATH is set, written as OpenTelemetry-style spans (one JSON object per line: a
+root span for the request and a child per stage). An incoming W3C ``traceparent`` header is
+honoured so spans join the caller's trace.
+"""
+import atexit, json, os, queue, random, threading, time
+from contextlib import contextmanager
+from prometheus_client import Histogram
+from .config import Config
+
+UNKNOWN = "__unknown__"
+
+STAGE_BUCKETS = (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+STAGE_LATENCY = Histogram(
+    "mlserve_predict_stage_seconds", "Time spent in each /predict stage (s)",
+    ["model", "version", "stage"], buckets=STAGE_BUCKETS,
+)
+
+class Trace:
+    """Stage timings of one request, in the order they ran."""
+
+    def __init__(self, name, traceparent=None):
+        self.name = name
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter()
+        self.stages = []  # (stage, offset_s, duration_s, desc)
+        self.trace_id, self.parent_id = _parse_traceparent(traceparent)
+
+    @contextmanager
+    def stage(self, stage, desc=None):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t, desc, start=t)
+
+    def add(self, stage, seconds, desc=None, start=None):
+        offset = (start if start is not None else time.perf_counter() - seconds) - self._t0
+        self.stages.append((stage, offset, seconds, desc))
+
+    def elapsed(self):
+        return time.perf_counter() - self._t0
+
+    def totals(self):
+        """``{stage: (seconds, desc)}`` with repeated stages summed, in first-run order."""
+        out = {}
+        for stage, _, seconds, desc in self.stages:
+            total, first = out.get(stage, (0.0, desc))
+            out[stage] = (total + seconds, first)
+        return out
+
+    def server_timing(self):
+        parts = []
+        for stage, (seconds, desc) in self.totals().items():
+            part = f"{stage};dur={seconds * 1e3:.3f}"
+            parts.append(part + f';desc="{desc}"' if desc else part)
+        parts.append(f"total;dur={self.elapsed() * 1e3:.3f}")
+        return ", ".join(parts)
+
+    def finish(self, model, version, status):
+        """Record the stages under ``model``/``version`` (label values the caller has bounded)."""
+        for stage, (seconds, desc) in self.totals().items():
+            # "load" splits into load_hit / load_miss so the two distributions stay apart
+            label = f"{stage}_{desc}" if desc else stage
+            STAGE_LATENCY.labels(model=model, version=version or "", stage=label).observe(seconds)
+        if _exporter is not None and random.random() < Config.TRACE_SAMPLE_RATE:
+            _exporter.export(self._spans(model, version, status))
+
+    def _spans(self, model, version, status):
+        trace_id = self.trace_id or os.urandom(16).hex()
+        root_id = os.urandom(8).hex()
+        attrs = {"mlserve.model": model, "mlserve.version": version or "", "http.status_code": int(status)}
+        spans = [{
+            "trace_id": trace_id, "span_id": root_id, "parent_span_id": self.parent_id,
+            "name": f"POST /predict/{self.name}",
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + int(self.elapsed() * 1e9),
+            "attributes": attrs,
+            "status": "ERROR" if int(status) >= 500 else "OK",
+        }]
+        for stage, offset, seconds, desc in self.stages:
+            start = self.start_ns + int(offset * 1e9)
+            spans.append({
+                "trace_id": trace_id, "span_id": os.urandom(8).hex(), "parent_span_id": root_id,
+                "name": stage,
+                "start_time_unix_nano": start,
+                "end_time_unix_nano": start + int(seconds * 1e9),
+                "attributes": {"mlserve.cache": desc} if desc else {},
+                "status": "OK",
+            })
+        return spans
+
+def _parse_traceparent(header):
+    # version-traceid-parentid-flags
+    parts = (header or "").strip().split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16 and parts[1] != "0" * 32:
+        return parts[1], parts[2]
+    return None, None
+
+class FileSpanExporter:
+    """Appends spans as JSON lines from a background thread; drops spans when it falls behind.
+
+    The thread is started on first export in each process, so a forked worker gets its own.
+    """
+
+    def __init__(self, path, max_queue=10000):
+        self.path = path
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _start(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self.max_queue)
+                self._thread = threading.Thread(target=self._run, name="mlserve-span-exporter", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def export(self, spans):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        with open(self.path, "a", buffering=1 << 16) as fh:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    break
+                fh.writelines(json.dumps(s, separators=(",", ":")) + "\n" for s in spans)
+                if self._queue.empty():
+                    fh.flush()
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+_exporter = None
+if Config.TRACE_EXPORT_PATH:
+    _exporter = FileSpanExporter(Config.TRACE_EXPORT_PATH)
+    atexit.register(_exporter.close)
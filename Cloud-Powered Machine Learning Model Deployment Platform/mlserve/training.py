@@ -0,0 +1,340 @@
+"""Background training jobs for the /train page.
+
+POST /train only records a job and returns its id; the fit runs in a separate process pool so
+training never holds a serving worker (or the GIL) while it reads, fits and serialises. When
+the fit finishes the artifact is registered through Registry.register like any upload.
+
+Jobs run in one of two modes: ``batch`` loads the CSV into memory (fit_csv), ``stream`` reads
+it in chunks and fits ``partial_fit`` estimators (fit_csv_streaming) for files larger than RAM.
+Both produce the same kind of Pipeline and input schema.
+"""
+import logging, multiprocessing, os, threading, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from .config import Config
+from .db import SessionLocal, WriteSession, TrainingJob
+
+log = logging.getLogger(__name__)
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def _update(job_id, **fields):
+    with WriteSession() as s:
+        job = s.get(TrainingJob, job_id)
+        for k, v in fields.items():
+            setattr(job, k, v)
+        s.commit()
+
+def build_input_schema(name, num_cols, cat_cols):
+    # schema: list of objects with original feature names
+    return {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "title": f"{name}_request",
+        "type": "object",
+        "properties": {
+            "inputs": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {col: {"type": "number"} for col in num_cols} | {col: {"type": "string"} for col in cat_cols},
+                    "required": num_cols + cat_cols,
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["inputs"],
+        "additionalProperties": False
+    }
+
+class LocalFile:
+    """Adapts a file already on disk to the ``file_storage`` interface of Registry.register."""
+
+    def __init__(self, src, filename):
+        self.filename = filename
+        self._src = src
+
+    def open(self):
+        return open(self._src, "rb")
+
+def fit_csv(csv_path, target, algo="auto", n_jobs=1):
+    """Fit the auto-train pipeline on a CSV; returns ``(pipeline, score, num_cols, cat_cols, rows)``."""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import OneHotEncoder
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.linear_model import LogisticRegression, LinearRegression
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from threadpoolctl import threadpool_limits
+
+    df = pd.read_csv(csv_path)
+    if target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found. Columns: {list(df.columns)}")
+    y = df[target]
+    X = df.drop(columns=[target])
+
+    cat_cols = [c for c in X.columns if pd.api.types.is_string_dtype(X[c].dtype)]
+    num_cols = [c for c in X.columns if c not in cat_cols]
+
+    pre = ColumnTransformer(
+        transformers=[
+            ('num', 'passthrough', num_cols),
+            ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=False), cat_cols),
+        ]
+    )
+
+    # choose task
+    if algo in ("logreg","rf_clf"):
+        is_classification = True
+    elif algo in ("linreg","rf_reg"):
+        is_classification = False
+    else:
+        is_classification = pd.api.types.is_string_dtype(y.dtype) or (y.nunique() <= 20)
+
+    if is_classification:
+        model = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=n_jobs) if algo=="rf_clf" else LogisticRegression(max_iter=1000)
+    else:
+        model = RandomForestRegressor(n_estimators=200, random_state=42, n_jobs=n_jobs) if algo=="rf_reg" else LinearRegression()
+
+    pipe = Pipeline(steps=[('pre', pre), ('model', model)])
+    Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.2, random_state=42)
+    # keep BLAS/OpenMP inside the job's core budget as well
+    with threadpool_limits(limits=n_jobs):
+        pipe.fit(Xtr, ytr)
+        score = pipe.score(Xte, yte)
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = None  # the serving process decides its own parallelism
+    return pipe, float(score), num_cols, cat_cols, len(df)
+
+STREAM_ALGOS = ("sgd_clf", "sgd_reg", "nb")
+
+def _is_holdout(start, n):
+    # every fifth row (by position in the file) is held out: the streaming analogue of test_size=0.2
+    import numpy as np
+    return (np.arange(start, start + n) % 5) == 0
+
+def fit_csv_streaming(csv_path, target, algo="auto", n_jobs=1, chunk_rows=None, epochs=None):
+    """Out-of-core variant of fit_csv for CSVs larger than memory.
+
+    Pass 1 learns column types, categorical vocabularies, numeric mean/variance and all of the
+    target's classes. Then ``epochs`` passes feed the training rows chunk by chunk to a
+    ``partial_fit`` estimator through a sparse one-hot encoding, and a last pass scores the
+    held-out rows. Only one chunk is in memory at a time.
+    """
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from sklearn.impute import SimpleImputer
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.linear_model import SGDClassifier, SGDRegressor
+    from sklearn.naive_bayes import BernoulliNB
+    from threadpoolctl import threadpool_limits
+
+    chunk_rows = chunk_rows or Config.TRAIN_STREAM_CHUNK_ROWS
+    epochs = epochs or Config.TRAIN_STREAM_EPOCHS
+    if algo not in STREAM_ALGOS + ("auto",):
+        raise ValueError(f"Algorithm '{algo}' cannot be trained in stream mode; use one of {', '.join(STREAM_ALGOS)} or auto.")
+
+    # pass 1: schema, vocabularies, numeric stats, target classes
+    num_cols = cat_cols = None
+    vocab, scaler = {}, StandardScaler()
+    target_values, target_is_str, rows = set(), False, 0
+    # an explicit classifier needs every class up front (partial_fit refuses new ones later);
+    # for auto, a numeric target is only a classification while it has <= 20 distinct values
+    all_classes = algo in ("sgd_clf", "nb")
+    first_X = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        if num_cols is None:
+            if target not in chunk.columns:
+                raise ValueError(f"Target column '{target}' not found. Columns: {list(chunk.columns)}")
+            X = chunk.drop(columns=[target])
+            cat_cols = [c for c in X.columns if pd.api.types.is_string_dtype(X[c].dtype)]
+            num_cols = [c for c in X.columns if c not in cat_cols]
+            vocab = {c: set() for c in cat_cols}
+            target_is_str = pd.api.types.is_string_dtype(chunk[target].dtype)
+            first_X = X.head(2)
+        chunk = chunk.dropna(subset=[target])
+        rows += len(chunk)
+        for c in cat_cols:
+            vocab[c].update(chunk[c].dropna().astype(str).unique())
+        if num_cols:
+            scaler.partial_fit(chunk[num_cols].to_numpy(dtype=np.float64))
+        if all_classes or target_is_str or len(target_values) <= 20:
+            target_values.update(chunk[target].unique().tolist())
+    if num_cols is None or not rows:
+        raise ValueError("The CSV has no rows with a target value.")
+
+    if algo in ("sgd_clf", "nb"):
+        is_classification = True
+    elif algo == "sgd_reg":
+        is_classification = False
+    else:
+        is_classification = target_is_str or len(target_values) <= 20
+    classes = np.array(sorted(target_values, key=str), dtype=object if target_is_str else None) if is_classification else None
+
+    if algo == "nb":
+        model = BernoulliNB()
+    elif is_classification:
+        model = SGDClassifier(loss="log_loss", random_state=42)
+    else:
+        model = SGDRegressor(random_state=42)
+
+    # numeric NaNs are imputed with the streamed mean before scaling; unseen categories encode to zeros
+    num_pipe = Pipeline([("impute", SimpleImputer()), ("scale", StandardScaler())])
+    pre = ColumnTransformer(
+        transformers=[
+            ('num', num_pipe if num_cols else 'drop', num_cols),
+            ('cat', OneHotEncoder(categories=[sorted(vocab[c]) for c in cat_cols], handle_unknown='ignore',
+                                  sparse_output=True), cat_cols),
+        ],
+        sparse_threshold=1.0,
+    )
+    pre.fit(first_X.astype({c: str for c in cat_cols}))  # structure only; stats come from pass 1
+    if num_cols:
+        fitted = pre.named_transformers_["num"]
+        fitted.named_steps["impute"].statistics_ = scaler.mean_.copy()
+        for attr in ("mean_", "var_", "scale_", "n_samples_seen_"):
+            setattr(fitted.named_steps["scale"], attr, getattr(scaler, attr))
+
+    def chunks():
+        start = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, dtype={c: str for c in cat_cols}):
+            chunk = chunk.dropna(subset=[target])
+            holdout = _is_holdout(start, len(chunk))
+            start += len(chunk)
+            yield chunk, holdout
+
+    rng = np.random.default_rng(42)
+    with threadpool_limits(limits=n_jobs):
+        for _ in range(epochs):
+            for chunk, holdout in chunks():
+                train = chunk[~holdout]
+                if not len(train):
+                    continue
+                train = train.iloc[rng.permutation(len(train))]  # SGD wants shuffled rows; files are often sorted
+                Xt = pre.transform(train.drop(columns=[target]))
+                if is_classification:
+                    model.partial_fit(Xt, train[target].to_numpy(), classes=classes)
+                else:
+                    model.partial_fit(Xt, train[target].to_numpy(dtype=np.float64))
+
+        # streamed hold-out score: accuracy for classifiers, R^2 for regressors
+        n = correct = 0
+        sum_y = sum_y2 = sse = 0.0
+        for chunk, holdout in chunks():
+            test = chunk[holdout]
+            if not len(test):
+                continue
+            pred = model.predict(pre.transform(test.drop(columns=[target])))
+            y = test[target].to_numpy()
+            n += len(y)
+            if is_classification:
+                correct += int((pred == y).sum())
+            else:
+                y = y.astype(np.float64)
+                sum_y += y.sum()
+                sum_y2 += (y * y).sum()
+                sse += ((y - pred) ** 2).sum()
+    if not n:
+        score = float("nan")
+    elif is_classification:
+        score = correct / n
+    else:
+        sst = sum_y2 - sum_y * sum_y / n
+        score = 1.0 - sse / sst if sst > 0 else float("nan")
+
+    pipe = Pipeline(steps=[('pre', pre), ('model', model)])
+    return pipe, float(score), num_cols, cat_cols, rows
+
+def run_training_job(job_id):
+    """Runs inside a pool process: fit, save the artifact, register it, record the outcome."""
+    import json
+    import joblib
+    from .registry import Registry
+
+    with SessionLocal() as s:
+        job = s.get(TrainingJob, job_id)
+        name, version, target, algo, n_jobs, csv_path = job.model_name, job.version, job.target, job.algo, job.n_jobs, job.csv_path
+        mode = job.mode or "batch"
+    _update(job_id, status="running", started_at=_now())
+    started = time.monotonic()
+    try:
+        fit = fit_csv_streaming if mode == "stream" else fit_csv
+        pipe, score, num_cols, cat_cols, rows = fit(csv_path, target, algo, n_jobs)
+
+        # dump straight into the artifact store: hashed while it is written, never copied
+        registry = Registry()
+        with registry.store.writer(".joblib") as artifact:
+            joblib.dump(pipe, artifact)
+        schema_json = json.dumps(build_input_schema(name, num_cols, cat_cols))
+        registered = registry.register(name=name, version=version, framework="sklearn", input_schema=schema_json,
+                                       blob=artifact.blob)
+    except Exception as e:
+        log.exception("training job %s failed", job_id)
+        _update(job_id, status="failed", error=str(e), finished_at=_now(), train_seconds=time.monotonic() - started)
+        return {"ok": False, "error": str(e)}
+    _update(job_id, status="succeeded", score=score, rows=rows, artifact_path=registered["path"],
+            finished_at=_now(), train_seconds=time.monotonic() - started)
+    try:
+        os.remove(csv_path)
+    except OSError:
+        pass
+    return {"ok": True, "score": score}
+
+def create_job(name, version, target, algo="auto", n_jobs=None, mode=None):
+    """Record a queued job; the uploaded CSV is expected at the returned path."""
+    n_jobs = max(1, min(int(n_jobs or Config.TRAIN_N_JOBS), Config.TRAIN_MAX_N_JOBS))
+    mode = mode or ("stream" if algo in STREAM_ALGOS else "batch")
+    with WriteSession() as s:
+        job = TrainingJob(model_name=name, version=version, target=target, algo=algo, n_jobs=n_jobs,
+                          mode=mode, csv_path="", status="queued")
+        s.add(job)
+        s.flush()
+        job_dir = os.path.join(Config.JOB_DIR, f"train-{job.id}")
+        os.makedirs(job_dir, exist_ok=True)
+        job.csv_path = os.path.join(job_dir, "input.csv")
+        s.commit()
+        return job.id, job.csv_path
+
+def job_status(job_id):
+    with SessionLocal() as s:
+        job = s.get(TrainingJob, job_id)
+        if job is None:
+            return None
+        return {
+            "id": job.id,
+            "name": job.model_name,
+            "version": job.version,
+            "target": job.target,
+            "algo": job.algo,
+            "mode": job.mode or "batch",
+            "n_jobs": job.n_jobs,
+            "status": job.status,
+            "rows": job.rows,
+            "score": job.score,
+            "train_seconds": job.train_seconds,
+            "artifact": job.artifact_path,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def submit(job_id):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a threaded server process; each fit gets a clean interpreter
+            _pool = ProcessPoolExecutor(Config.TRAIN_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    future = _pool.submit(run_training_job, job_id)
+
+    def _done(f):
+        if f.exception() is not None:  # the worker process itself died
+            _update(job_id, status="failed", error=str(f.exception()), finished_at=_now())
+    future.add_done_callback(_done)
+    return future
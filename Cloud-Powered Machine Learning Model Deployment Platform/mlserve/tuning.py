@@ -0,0 +1,124 @@
+"""Auto-tuning of a version's ``runtime`` options.
+
+    python -m mlserve.tuning tune --model iris [--version 2.0] [--rows 32] [--threads 1,2,4] [--dry-run]
+
+Loads the version once per candidate setting and times inference on a batch built from its
+input schema. For onnx the candidates are intra-op thread counts x graph optimisation levels;
+for torch they are thread counts x optimize_for_inference. The fastest setting by median latency
+is saved as the version's ``runtime`` option, merged into what it already has. Run it on the
+hardware, and with the worker count, the version will be served with.
+"""
+import itertools, os, time
+from .runtime import ModelRuntime, runtime_options
+from .warmup import synthetic_payload
+
+TUNABLE = ("onnx", "torch")
+
+def thread_counts():
+    """1, 2, 4, ... up to the cores this process may use."""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    counts = [n for n in (2 ** i for i in range(8)) if n < cores]
+    return counts + [cores]
+
+def candidates(framework, threads):
+    if framework == "onnx":
+        grid = itertools.product(threads, ("basic", "extended", "all"))
+        return [{"intra_op_threads": t, "graph_optimization": level} for t, level in grid]
+    if framework == "torch":
+        grid = itertools.product(threads, (False, True))
+        return [{"intra_op_threads": t, "optimize_for_inference": opt} for t, opt in grid]
+    return []
+
+def sample_inputs(active, rows, features=None):
+    """A ``rows``-row batch for ``active``: from its input schema, or ``features`` zero columns."""
+    import numpy as np
+    payload = synthetic_payload(active.schema)
+    if payload is not None:
+        inputs = payload["inputs"] * rows
+        return inputs if isinstance(inputs[0], dict) else np.asarray(inputs, dtype=np.float32)
+    if features:
+        return np.zeros((rows, features), dtype=np.float32)
+    return None
+
+def measure(runtime, framework, path, options, inputs, repeat, warmup=5):
+    """Median and p95 seconds per inference of the model loaded with ``options``."""
+    model = runtime.load(framework, path, options=options)
+    try:
+        for _ in range(warmup):
+            runtime.infer(framework, model, inputs)
+        latencies = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            runtime.infer(framework, model, inputs)
+            latencies.append(time.perf_counter() - t)
+    finally:
+        runtime.unload(framework, path, options=options)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+def tune(registry, name, version=None, rows=32, repeat=50, threads=None, features=None, on_result=None):
+    """Time every candidate for ``name``/``version`` (default: the active one).
+
+    Returns ``(ActiveVersion, best runtime option, results)`` with results as ``(option, p50, p95)``
+    sorted fastest first. Raises ValueError when the version cannot be tuned.
+    """
+    active = registry.get_version(name, version)
+    if active is None:
+        raise ValueError(f"Model '{name}' has no {'version ' + repr(version) if version else 'active version'}.")
+    if active.framework not in TUNABLE:
+        raise ValueError(f"Nothing to tune for {active.framework} models (tunable: {', '.join(TUNABLE)}).")
+    inputs = sample_inputs(active, rows, features)
+    if inputs is None:
+        raise ValueError("Cannot build a sample batch from the version's input schema; pass the feature count.")
+    base = runtime_options(active.options) or {}
+    runtime = ModelRuntime(max_cache_bytes=0)
+    results = []
+    for candidate in candidates(active.framework, threads or thread_counts()):
+        options = dict(base, **candidate)
+        p50, p95 = measure(runtime, active.framework, active.path, options, inputs, repeat)
+        results.append((options, p50, p95))
+        if on_result is not None:
+            on_result(options, p50, p95)
+    results.sort(key=lambda r: r[1])
+    return active, results[0][0], results
+
+# ---- CLI
+
+def _cli():
+    import json
+    import click
+
+    @click.group()
+    def cli():
+        """Inference tuning."""
+
+    @cli.command("tune")
+    @click.option("--model", "model_name", required=True, help="Registered model name.")
+    @click.option("--version", default=None, help="Model version (default: the active one).")
+    @click.option("--rows", type=int, default=32, show_default=True, help="Rows per timed batch.")
+    @click.option("--repeat", type=int, default=50, show_default=True, help="Timed calls per setting.")
+    @click.option("--threads", default=None, help="Thread counts to try, comma-separated (default: 1, 2, 4, ... cores).")
+    @click.option("--features", type=int, default=None, help="Input width when the version has no usable schema.")
+    @click.option("--dry-run", is_flag=True, help="Report the fastest setting without saving it.")
+    def tune_cmd(model_name, version, rows, repeat, threads, features, dry_run):
+        """Benchmark runtime settings for a version and save the fastest."""
+        from .registry import Registry
+        registry = Registry()
+
+        def report(options, p50, p95):
+            click.echo(f"{json.dumps(options, sort_keys=True):<90} p50 {p50 * 1e3:8.3f} ms  p95 {p95 * 1e3:8.3f} ms", err=True)
+
+        try:
+            active, best, _ = tune(registry, model_name, version, rows=rows, repeat=repeat,
+                                   threads=[int(t) for t in threads.split(",") if t] if threads else None,
+                                   features=features, on_result=report)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        if not dry_run:
+            registry.set_options(model_name, active.version, dict(active.options, runtime=best))
+        click.echo(json.dumps({"model": model_name, "version": active.version, "runtime": best, "saved": not dry_run}, indent=2))
+
+    cli()
+
+if __name__ == "__main__":
+    _cli()
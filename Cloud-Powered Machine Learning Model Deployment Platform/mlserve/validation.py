@@ -0,0 +1,160 @@
+from operator import itemgetter
+from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+# JSON types the tabular fast path understands, mapped to the Python types json.loads produces.
+# bool is deliberately absent: JSON Schema does not treat true/false as numbers.
+_TABULAR_TYPES = {"number": (int, float), "string": (str,)}
+
+def tabular_columns(schema):
+    """Return ``[(column, json_type), ...]`` if ``schema`` is the flat row schema ``train_csv``
+    generates (fixed columns, number/string types, no extra properties), else None."""
+    try:
+        if set(schema) - {"$schema", "title", "type", "properties", "required", "additionalProperties"}:
+            return None
+        if schema["type"] != "object" or schema["additionalProperties"] is not False:
+            return None
+        if set(schema["properties"]) != {"inputs"} or set(schema["required"]) != {"inputs"}:
+            return None
+        inputs = schema["properties"]["inputs"]
+        if set(inputs) != {"type", "items"} or inputs["type"] != "array":
+            return None
+        items = inputs["items"]
+        if set(items) != {"type", "properties", "required", "additionalProperties"}:
+            return None
+        if items["type"] != "object" or items["additionalProperties"] is not False:
+            return None
+        props = items["properties"]
+        if not props or set(items["required"]) != set(props):
+            return None
+        columns = []
+        for col, spec in props.items():
+            if not isinstance(spec, dict) or set(spec) != {"type"} or spec["type"] not in _TABULAR_TYPES:
+                return None
+            columns.append((col, spec["type"]))
+        return columns
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+def _matrix_width(schema):
+    """``(min, max)`` row width if ``schema`` takes ``inputs`` as a list of number lists, else None."""
+    try:
+        items = schema["properties"]["inputs"]["items"]
+        if items.get("type") == "array" and items.get("items", {}).get("type") in ("number", "integer"):
+            return items.get("minItems", 0), items.get("maxItems")
+    except (KeyError, TypeError, AttributeError):
+        pass
+    return None
+
+def _numeric(dtype):
+    return dtype.kind in "iuf"
+
+class SchemaValidator:
+    """A jsonschema validator compiled once; raises the same error ``jsonschema.validate`` would."""
+
+    columns = None
+
+    def __init__(self, schema):
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        self._validator = cls(schema)
+        self._width = _matrix_width(schema)
+
+    def validate(self, payload):
+        error = best_match(self._validator.iter_errors(payload))
+        if error is not None:
+            raise error
+
+    def validate_columnar(self, inputs):
+        """Check a decoded array/DataFrame by dtype and shape instead of per element."""
+        if self._width is None:
+            return  # nothing in the schema we can check without materialising rows
+        if hasattr(inputs, "columns"):
+            dtypes = list(inputs.dtypes)
+            width = len(dtypes)
+        else:
+            if inputs.ndim != 2:
+                raise ValidationError(f"Expected a 2-D array, got shape {inputs.shape}")
+            dtypes = [inputs.dtype]
+            width = inputs.shape[1]
+        if not all(_numeric(d) for d in dtypes):
+            raise ValidationError(f"Expected numeric inputs, got {', '.join(sorted({str(d) for d in dtypes}))}")
+        lo, hi = self._width
+        if width < lo or (hi is not None and width > hi):
+            raise ValidationError(f"Expected rows of {lo}..{hi if hi is not None else ''} values, got {width}")
+
+class TabularValidator(SchemaValidator):
+    """Whole-batch type/shape check for flat row schemas.
+
+    Valid batches are accepted without walking the schema per element. Anything the fast check
+    does not accept is handed to the compiled jsonschema validator, so error messages (and the
+    final verdict on edge cases) are exactly jsonschema's.
+    """
+
+    def __init__(self, schema, columns):
+        super().__init__(schema)
+        self.columns = columns
+        self._keys = frozenset(c for c, _ in columns)
+        self._getter = itemgetter(*[c for c, _ in columns])
+        self._types = [frozenset(_TABULAR_TYPES[t]) for _, t in columns]
+
+    def _fast_ok(self, payload):
+        if type(payload) is not dict or len(payload) != 1:
+            return False
+        rows = payload.get("inputs")
+        if type(rows) is not list:
+            return False
+        if not rows:
+            return True
+        keys = self._keys
+        try:
+            if not all(k == keys for k in map(dict.keys, rows)):
+                return False
+        except TypeError:  # a row that is not a dict
+            return False
+        getter = self._getter
+        if len(self._types) == 1:
+            cols = [list(map(getter, rows))]
+        else:
+            cols = zip(*map(getter, rows))
+        for col, allowed in zip(cols, self._types):
+            if not allowed.issuperset(map(type, col)):
+                return False
+        return True
+
+    def validate(self, payload):
+        if not self._fast_ok(payload):
+            super().validate(payload)
+
+    def validate_columnar(self, inputs):
+        if hasattr(inputs, "columns"):
+            present = set(inputs.columns)
+            missing = [c for c, _ in self.columns if c not in present]
+            if missing:
+                raise ValidationError(f"Missing columns: {missing}")
+            extra = sorted(present - self._keys, key=str)
+            if extra:
+                raise ValidationError(f"Unexpected columns: {extra}")
+            import pandas as pd
+            for col, t in self.columns:
+                series = inputs[col]
+                if t == "number":
+                    ok = _numeric(series.dtype)
+                else:
+                    ok = pd.api.types.infer_dtype(series, skipna=False) == "string"
+                if not ok:
+                    raise ValidationError(f"Column '{col}' must be of type {t}, got {series.dtype}")
+            return
+        if inputs.ndim != 2 or inputs.shape[1] != len(self.columns):
+            raise ValidationError(f"Expected a 2-D array with {len(self.columns)} columns, got shape {inputs.shape}")
+        if any(t != "number" for _, t in self.columns):
+            raise ValidationError("This model has string columns; send them as Arrow or JSON, not a bare array")
+        if not _numeric(inputs.dtype):
+            raise ValidationError(f"Expected numeric inputs, got {inputs.dtype}")
+
+def compile_validator(schema):
+    columns = tabular_columns(schema)
+    if columns is not None:
+        return TabularValidator(schema, columns)
+    return SchemaValidator(schema)
@@ -0,0 +1,127 @@
+import logging, threading, time
+from .config import Config
+from .runtime import runtime_options
+from .validation import tabular_columns
+
+log = logging.getLogger(__name__)
+
+def synthetic_payload(schema):
+    """Build a one-row request that satisfies ``schema``, or None if we cannot guess one."""
+    if not schema:
+        return None
+    columns = tabular_columns(schema)
+    if columns is not None:
+        return {"inputs": [{c: (0.0 if t == "number" else "") for c, t in columns}]}
+    try:
+        items = schema["properties"]["inputs"]["items"]
+        if items.get("type") == "array" and items.get("items", {}).get("type") == "number":
+            width = items.get("minItems") or items.get("maxItems")
+            if width:
+                return {"inputs": [[0.0] * int(width)]}
+    except (KeyError, TypeError, AttributeError):
+        pass
+    return None
+
+class Warmer:
+    """Keeps active models loaded so requests never pay the artifact load.
+
+    At boot every active version is loaded (plus an optional synthetic inference). When the
+    registry reports a new active version that is not resident yet, requests keep being served
+    by the previous version while the new one loads in the background; the new version is
+    swapped in only once its load succeeded. The previous model object is released when the
+    last in-flight request (or batch) holding it finishes.
+    """
+
+    def __init__(self, registry, runtime):
+        self.registry = registry
+        self.runtime = runtime
+        self.state = "idle"  # idle | loading | ready
+        self._serving = {}  # name -> ActiveVersion currently served
+        self._loading = {}  # name -> version being loaded in the background
+        self._errors = {}  # "name:version", or just "name" when it could not be resolved -> error message
+        self._lock = threading.Lock()
+
+    def status(self):
+        with self._lock:
+            return {
+                "ready": self.state == "ready",
+                "state": self.state,
+                "serving": {n: a.version for n, a in self._serving.items()},
+                "loading": dict(self._loading),
+                "errors": dict(self._errors),
+            }
+
+    def start(self):
+        self.state = "loading"
+        threading.Thread(target=self.preload, name="mlserve-preload", daemon=True).start()
+
+    def preload(self):
+        """Load every active version from the registry; blocks until done."""
+        self.state = "loading"
+        started = time.monotonic()
+        try:
+            for name in self.registry.active_model_names():
+                # one unusable row (e.g. a schema that does not compile) must not stop the others
+                try:
+                    active = self.registry.resolve_active(name)
+                except Exception as e:
+                    log.exception("failed to resolve the active version of %s", name)
+                    with self._lock:
+                        self._errors[name] = str(e)
+                    continue
+                if active is not None:
+                    self._load(active)
+        except Exception:
+            log.exception("preload stopped early")
+        finally:
+            # never stuck at 503: what did not load is loaded on its first request instead
+            self.state = "ready"
+        log.info("preloaded %d active models in %.2fs", len(self._serving), time.monotonic() - started)
+
+    def acquire(self, active):
+        """Return ``(version, model)`` to serve for the registry's current ``active`` version."""
+        # peek, so runtime.load below is the one lookup that counts as a cache hit or miss
+        if self.runtime.cache.peek(self.runtime.key_for(active)) is None:
+            current = self._serving.get(active.name)
+            failed = f"{active.name}:{active.version}" in self._errors
+            if Config.HOT_SWAP and current is not None and current.version != active.version and not failed:
+                current_model = self.runtime.cache.peek(self.runtime.key_for(current))
+                if current_model is not None:
+                    self.swap_async(active)
+                    return current, current_model
+        model = self.runtime.load(active.framework, active.path, pin=active.name, options=runtime_options(active.options))
+        if self._serving.get(active.name) is not active:
+            with self._lock:
+                self._serving[active.name] = active
+        return active, model
+
+    def swap_async(self, active):
+        with self._lock:
+            if self._loading.get(active.name) == active.version:
+                return
+            self._loading[active.name] = active.version
+        threading.Thread(target=self._load, args=(active,), name=f"mlserve-swap-{active.name}", daemon=True).start()
+
+    def _load(self, active):
+        label = f"{active.name}:{active.version}"
+        try:
+            # load unpinned first so a failed warm-up leaves the current version in place
+            model = self.runtime.load(active.framework, active.path, options=runtime_options(active.options))
+            payload = synthetic_payload(active.schema) if Config.WARMUP_INFERENCE else None
+            if payload is not None:
+                try:
+                    self.runtime.predict(active.framework, model, payload)
+                except Exception as e:
+                    log.warning("warm-up inference failed for %s: %s", label, e)
+            self.runtime.cache.pin(active.name, self.runtime.key_for(active))
+            with self._lock:
+                self._serving[active.name] = active
+                self._errors.pop(label, None)
+        except Exception as e:
+            log.exception("failed to load %s", label)
+            with self._lock:
+                self._errors[label] = str(e)
+        finally:
+            with self._lock:
+                if self._loading.get(active.name) == active.version:
+                    del self._loading[active.name]
@@ -0,0 +1,54 @@
+"""Shared fixtures. The server reads its configuration once, on import, so the environment is
+pointed at a throwaway directory here, before any test module imports mlserve."""
+import base64, io, json, os, tempfile
+import pytest
+
+ROOT = tempfile.mkdtemp(prefix="mlserve-tests-")
+os.environ.update(
+    DB_URL=f"sqlite:///{os.path.join(ROOT, 'mlserve.db')}",
+    ARTIFACT_DIR=os.path.join(ROOT, "artifacts"),
+    LOG_DIR=os.path.join(ROOT, "logs"),
+    JOB_DIR=os.path.join(ROOT, "jobs"),
+    FLASK_ENV="production",
+    PRELOAD_ON_START="0",
+    LOG_TO_CONSOLE="0",
+)
+
+def sklearn_artifact(label):
+    """A joblib-dumped classifier that predicts ``label`` for any row of two numbers."""
+    import joblib
+    from sklearn.dummy import DummyClassifier
+    buf = io.BytesIO()
+    joblib.dump(DummyClassifier(strategy="most_frequent").fit([[0.0, 0.0]], [label]), buf)
+    return buf.getvalue()
+
+@pytest.fixture(scope="session")
+def app():
+    from mlserve.app import app
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture(scope="session")
+def auth():
+    from mlserve.config import Config
+    token = base64.b64encode(f"{Config.AUTH_USERNAME}:{Config.AUTH_PASSWORD}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+@pytest.fixture
+def register(client, auth):
+    """``register(name, version, artifact, options=None, schema=None)`` through the API; returns
+    the response JSON."""
+    def _register(name, version, artifact, options=None, schema=None):
+        data = {"name": name, "version": version, "framework": "sklearn",
+                "artifact": (io.BytesIO(artifact), "model.joblib")}
+        if options is not None:
+            data["options"] = json.dumps(options)
+        if schema is not None:
+            data["input_schema"] = (io.BytesIO(json.dumps(schema).encode()), "schema.json")
+        resp = client.post("/models/register", headers=auth, data=data, content_type="multipart/form-data")
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        return resp.get_json()
+    return _register
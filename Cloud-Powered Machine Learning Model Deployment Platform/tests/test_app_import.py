@@ -0,0 +1,17 @@
+"""A process spawned from ``python -m mlserve.app`` imports that module again as __mp_main__;
+it must not set up a second server (log files, database, pools) on the way."""
+import os, subprocess, sys
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_spawned_children_build_no_server(tmp_path):
+    code = ("import logging, runpy; ns = runpy.run_module('mlserve.app', run_name='__mp_main__'); "
+            "assert ns['registry'] is None and ns['executors'] is None; "
+            "assert not logging.getLogger().handlers")
+    env = dict(os.environ, DB_URL=f"sqlite:///{tmp_path / 'child.db'}", LOG_DIR=str(tmp_path / "logs"),
+               ARTIFACT_DIR=str(tmp_path / "artifacts"), PRELOAD_ON_START="1")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT, env=env, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert not (tmp_path / "child.db").exists()
+    assert not (tmp_path / "artifacts").exists()
+    assert not os.listdir(tmp_path / "logs")
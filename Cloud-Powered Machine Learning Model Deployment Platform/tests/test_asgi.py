@@ -0,0 +1,61 @@
+"""mlserve.asgi driven directly, one ASGI request at a time."""
+import asyncio, io, json
+import pytest
+from conftest import sklearn_artifact
+
+def _request(path, body, headers=(), chunk=None, declare_length=True):
+    from mlserve.asgi import application
+    chunk = chunk or max(1, len(body))
+    parts = [body[i:i + chunk] for i in range(0, len(body), chunk)] or [b""]
+    messages = [{"type": "http.request", "body": p, "more_body": i < len(parts) - 1} for i, p in enumerate(parts)]
+    received = []
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers]
+    if declare_length:
+        raw.append((b"content-length", str(len(body)).encode()))
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": raw,
+             "http_version": "1.1", "scheme": "http", "server": ("test", 80), "client": ("127.0.0.1", 1)}
+
+    async def receive():
+        received.append(1)
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+    asyncio.run(application(scope, receive, send))
+    status = sent[0]["status"]
+    return status, b"".join(m.get("body", b"") for m in sent[1:]), len(received)
+
+@pytest.fixture(scope="module")
+def version(app, auth):
+    from mlserve.app import registry
+    from mlserve.artifact_store import ArtifactStore
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    registry.register("asgi-limit", "1.0", "sklearn", blob=blob)
+    registry.activate("asgi-limit", "1.0")
+    return "asgi-limit"
+
+@pytest.fixture
+def small_limit(app, monkeypatch):
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", 1000)
+
+def test_predict_body_over_the_limit_is_413(auth, version, small_limit):
+    headers = [("Authorization", auth["Authorization"]), ("Content-Type", "application/json")]
+    status, body, _ = _request(f"/predict/{version}", json.dumps({"inputs": [[1.0, 2.0]]}).encode(), headers)
+    assert status == 200, body
+    big = json.dumps({"inputs": [[1.0, 2.0]] * 200}).encode()
+    # announced by Content-Length: refused before reading anything
+    status, _, reads = _request(f"/predict/{version}", big, headers)
+    assert (status, reads) == (413, 0)
+    # chunked: reading stops at the first chunk past the limit
+    status, _, reads = _request(f"/predict/{version}", big, headers, chunk=400, declare_length=False)
+    assert (status, reads) == (413, 3)
+
+def test_other_routes_share_the_limit(app, auth, small_limit):
+    status, _, _ = _request("/models/register", b"x" * 2000, [("Authorization", auth["Authorization"])],
+                            chunk=400, declare_length=False)
+    assert status == 413
+
+def test_wsgi_predict_body_over_the_limit_is_413(client, auth, version, small_limit):
+    resp = client.post(f"/predict/{version}", headers=auth, json={"inputs": [[1.0, 2.0]] * 200})
+    assert resp.status_code == 413
@@ -0,0 +1,31 @@
+import io
+from conftest import sklearn_artifact
+
+class _BrokenRegistry:
+    def get_version(self, name, version=None):
+        raise RuntimeError("registry unavailable")
+
+def test_a_failure_before_scoring_fails_the_job(app, tmp_path):
+    from mlserve import batch
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a,b\n1.0,2.0\n")
+    job_id, _ = batch.create_job("batch-broken", input_path=str(input_path))
+    status = batch.run_job(job_id, workers=1, registry=_BrokenRegistry())
+    assert status["status"] == "failed"
+    assert "registry unavailable" in status["error"]
+
+def test_an_output_that_cannot_be_opened_fails_the_job(app, tmp_path):
+    from mlserve import batch
+    from mlserve.app import registry
+    from mlserve.artifact_store import ArtifactStore
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    registry.register("batch-output", "1.0", "sklearn", blob=blob)
+    registry.activate("batch-output", "1.0")
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a,b\n1.0,2.0\n")
+    (tmp_path / "taken").write_text("a file, not a directory")
+    job_id, _ = batch.create_job("batch-output", input_path=str(input_path),
+                                 output_path=str(tmp_path / "taken" / "predictions.csv"))
+    status = batch.run_job(job_id, workers=1, registry=registry)
+    assert status["status"] == "failed"
+    assert status["version"] == "1.0"
@@ -0,0 +1,51 @@
+import pytest
+from conftest import sklearn_artifact
+
+def test_reregistered_artifact_is_served_through_the_batcher(client, auth, register):
+    register("rebatch", "1.0", sklearn_artifact(1), options={"batching": {"max_batch_size": 8, "max_wait_ms": 1}})
+    assert client.post("/models/rebatch/activate", headers=auth, json={"version": "1.0"}).status_code == 200
+    resp = client.post("/predict/rebatch", headers=auth, json={"inputs": [[1.0, 2.0]]})
+    assert resp.get_json()["result"]["predictions"] == [1]
+
+    # same version, new artifact: the batcher built for the old model must not keep serving it
+    register("rebatch", "1.0", sklearn_artifact(0))
+    resp = client.post("/predict/rebatch", headers=auth, json={"inputs": [[1.0, 2.0]]})
+    assert resp.get_json()["result"]["predictions"] == [0]
+
+def test_changed_runtime_options_rebuild_the_batcher(app, register):
+    from mlserve.app import batchers, registry
+    register("rebatch-opts", "1.0", sklearn_artifact(1), options={"batching": True})
+    registry.activate("rebatch-opts", "1.0")
+    first = batchers.get(registry.resolve_active("rebatch-opts"), object())
+    assert batchers.get(registry.resolve_active("rebatch-opts"), object()) is first
+
+    registry.set_options("rebatch-opts", "1.0", {"batching": True, "runtime": {"intra_op_threads": 1}})
+    assert batchers.get(registry.resolve_active("rebatch-opts"), object()) is not first
+
+def test_closed_batcher_refuses_requests():
+    from mlserve.batching import MicroBatcher
+    batcher = MicroBatcher("closed", "1.0", lambda payloads: [p["inputs"] for p in payloads], 4, 0.001)
+    assert batcher.predict({"inputs": [1]}) == [1]
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit({"inputs": [2]})
+
+def test_timed_out_request_is_left_out_of_the_batch():
+    import threading
+    from mlserve.batching import MicroBatcher
+    release, seen = threading.Event(), []
+
+    def run_batch(payloads):
+        seen.extend(p["inputs"] for p in payloads)
+        release.wait(5)
+        return [p["inputs"] for p in payloads]
+
+    batcher = MicroBatcher("slow", "1.0", run_batch, 1, 0)
+    first = batcher.submit({"inputs": ["first"]})  # holds the batcher until released
+    with pytest.raises(TimeoutError):
+        batcher.predict({"inputs": ["late"]}, timeout=0.05)
+    release.set()
+    assert first.result(5) == ["first"]
+    assert batcher.predict({"inputs": ["next"]}, timeout=5) == ["next"]
+    assert seen == [["first"], ["next"]]
+    batcher.close()
@@ -0,0 +1,37 @@
+"""init_db() runs the Alembic migrations; each check uses its own database in a fresh process,
+since the engine is built from DB_URL on import."""
+import os, sqlite3, subprocess, sys
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INIT = "from mlserve.db import init_db; init_db()"
+
+def _start(db):
+    return subprocess.Popen([sys.executable, "-c", INIT], cwd=PROJECT, stderr=subprocess.PIPE, text=True,
+                            env=dict(os.environ, DB_URL=f"sqlite:///{db}"))
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def test_upgrades_a_database_from_before_migrations(tmp_path):
+    db = tmp_path / "old.db"
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE models (id INTEGER PRIMARY KEY, name VARCHAR(128) NOT NULL UNIQUE, created_at DATETIME)")
+        conn.execute("CREATE TABLE model_versions (id INTEGER PRIMARY KEY, model_id INTEGER NOT NULL, "
+                     "version VARCHAR(32) NOT NULL, framework VARCHAR(32) NOT NULL, path TEXT NOT NULL, "
+                     "input_schema TEXT, state VARCHAR(32), active BOOLEAN, created_at DATETIME)")
+        conn.execute("INSERT INTO models (name) VALUES ('kept')")
+    proc = _start(db)
+    assert proc.wait(60) == 0, proc.stderr.read()
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT version_num FROM alembic_version").fetchall() == [("0003",)]
+        assert {"options", "sha256"} <= _columns(conn, "model_versions")
+        assert "mode" in _columns(conn, "training_jobs")
+        assert conn.execute("SELECT name FROM models").fetchall() == [("kept",)]
+
+def test_workers_starting_at_once(tmp_path):
+    db = tmp_path / "new.db"
+    procs = [_start(db) for _ in range(4)]
+    for proc in procs:
+        assert proc.wait(60) == 0, proc.stderr.read()
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT version_num FROM alembic_version").fetchall() == [("0003",)]
@@ -0,0 +1,46 @@
+import io, multiprocessing, os, time
+import pytest
+from conftest import sklearn_artifact
+
+@pytest.fixture(scope="module")
+def executor(app):
+    from mlserve.artifact_store import ArtifactStore
+    from mlserve.executor import ProcessExecutor
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    executor = ProcessExecutor("executor", "1.0", "sklearn", blob.path, workers=1, max_queue=4)
+    yield executor
+    executor.close(wait=True)
+
+def test_requests_after_close_are_refused(executor):
+    assert executor.infer("sklearn", None, [[1.0, 2.0]]).tolist() == [1]
+    executor.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        executor.submit([[1.0, 2.0]])
+
+def _exit_at_once(*args):
+    os._exit(3)
+
+def test_failed_restart_fails_the_request_and_keeps_the_slot(app, monkeypatch):
+    from mlserve import executor as ex
+    from mlserve.artifact_store import ArtifactStore
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    executor = ex.ProcessExecutor("restart", "1.0", "sklearn", blob.path, workers=1, max_queue=4)
+    try:
+        assert executor.infer("sklearn", None, [[1.0, 2.0]], timeout=60).tolist() == [1]
+        worker, = [p for p in multiprocessing.active_children() if p.name == "mlserve-infer-restart-1.0-0"]
+        # the running process dies and its replacement exits before the handshake
+        monkeypatch.setattr(ex, "_serve", _exit_at_once)
+        worker.kill()
+        worker.join(5)
+        with pytest.raises(ex.WorkerDied):
+            executor.infer("sklearn", None, [[1.0, 2.0]], timeout=60)
+        # the slot retries the start straight away, and that attempt exits at once as well
+        deadline = time.monotonic() + 10
+        while [p for p in multiprocessing.active_children() if p.name.startswith("mlserve-infer-restart")]:
+            assert time.monotonic() < deadline, "inference process left running"
+            time.sleep(0.05)
+
+        monkeypatch.undo()
+        assert executor.infer("sklearn", None, [[1.0, 2.0]], timeout=60).tolist() == [1]
+    finally:
+        executor.close(wait=True)
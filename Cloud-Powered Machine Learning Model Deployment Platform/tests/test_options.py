@@ -0,0 +1,73 @@
+import io, json
+import pytest
+from conftest import sklearn_artifact
+
+# option blocks the serving path cannot use: refused with a 400 when registered or set
+INVALID = [
+    {"batching": {"max_batch_size": "x"}},
+    {"batching": {"max_wait_ms": None}},
+    {"batching": {"max_wait_ms": "inf"}},
+    {"batching": [8]},
+    {"executor": {"mode": "process", "workers": "four"}},
+    {"executor": {"mode": "process", "cpu_affinity": 3}},
+    {"executor": {"mode": "processes"}},
+    {"executor": "process"},
+    {"admission": {"max_concurrency": "many"}},
+    {"admission": {"max_queue": [16]}},
+    {"admission": {"max_wait_ms": "nan"}},
+    {"admission": 4},
+    {"result_cache": {"ttl": "a minute"}},
+    {"result_cache": {"ttl": -1}},
+    {"result_cache": {"backend": "redis"}},
+    {"result_cache": "memory"},
+    {"runtime": {"intra_op_threads": -1}},
+    {"runtime": {"unknown": 1}},
+    {"prediction_log": {"sample_rate": "often"}},
+    {"prediction_log": {"sample_rate": "nan"}},
+    {"prediction_log": {"sample_rate": float("nan")}},
+    {"prediction_log": {"sample_rate": "0.5"}},
+    {"prediction_log": {"sample_rate": 7}},
+    {"prediction_log": {"sample_rate": -0.1}},
+    {"prediction_log": {"sample_rate": True}},
+    {"prediction_log": 0.5},
+]
+
+VALID = [
+    {"batching": True},
+    {"batching": {"max_batch_size": 8, "max_wait_ms": 2}},
+    {"batching": {"enabled": False}},
+    {"executor": {"mode": "process", "workers": 2, "max_queue": 8, "cpu_affinity": [0]}},
+    {"executor": {"mode": "thread"}},
+    {"admission": {"max_concurrency": 4, "max_queue": 16, "max_wait_ms": 250}},
+    {"result_cache": True},
+    {"result_cache": {"ttl": 30, "backend": "sqlite"}},
+    {"runtime": {"intra_op_threads": 2}},
+    {"prediction_log": {"sample_rate": 0.1}},
+    {"prediction_log": {"sample_rate": 1}},
+    {"prediction_log": False},
+]
+
+@pytest.fixture(scope="module")
+def version(app):
+    from mlserve.app import registry
+    from mlserve.artifact_store import ArtifactStore
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    registry.register("options", "1.0", "sklearn", blob=blob)
+    return "/models/options/versions/1.0/options"
+
+@pytest.mark.parametrize("options", INVALID, ids=json.dumps)
+def test_invalid_options_are_refused(client, auth, version, options):
+    resp = client.post(version, headers=auth, json=options)
+    assert resp.status_code == 400
+    assert "Invalid options" in resp.get_data(as_text=True)
+
+    resp = client.post("/models/register", headers=auth, content_type="multipart/form-data", data={
+        "name": "options-new", "version": "1.0", "framework": "sklearn", "options": json.dumps(options),
+        "artifact": (io.BytesIO(sklearn_artifact(1)), "model.joblib")})
+    assert resp.status_code == 400
+
+@pytest.mark.parametrize("options", VALID, ids=json.dumps)
+def test_valid_options_are_stored(client, auth, version, options):
+    resp = client.post(version, headers=auth, json=options)
+    assert resp.status_code == 200
+    assert resp.get_json()["options"]["options"] == options
@@ -0,0 +1,34 @@
+import json
+import pytest
+from conftest import sklearn_artifact
+
+@pytest.fixture(scope="module")
+def model(app):
+    from mlserve.app import registry
+    from mlserve.artifact_store import ArtifactStore
+    import io
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    registry.register("predict", "1.0", "sklearn", blob=blob)
+    registry.activate("predict", "1.0")
+    return "/predict/predict"
+
+@pytest.mark.parametrize("body", [[[1.0, 2.0]], [{"inputs": [[1.0, 2.0]]}], 3, "inputs", None], ids=json.dumps)
+def test_body_that_is_not_an_object_is_refused(client, auth, model, body):
+    resp = client.post(model, headers=auth, data=json.dumps(body), content_type="application/json")
+    assert resp.status_code == 400
+    assert "must be an object with an" in resp.get_data(as_text=True)
+
+def test_msgpack_array_body_is_refused(client, auth, model):
+    msgpack = pytest.importorskip("msgpack")
+    resp = client.post(model, headers=auth, data=msgpack.packb([[1.0, 2.0]]), content_type="application/msgpack")
+    assert resp.status_code == 400
+
+def test_object_body_is_served(client, auth, model):
+    resp = client.post(model, headers=auth, json={"inputs": [[1.0, 2.0]]})
+    assert resp.status_code == 200
+    assert resp.get_json()["result"]["predictions"] == [1]
+
+@pytest.mark.parametrize("body", ["{}", '{"rows": [[1.0, 2.0]]}', "not json"])
+def test_body_without_inputs_is_refused(client, auth, model, body):
+    resp = client.post(model, headers=auth, data=body, content_type="application/json")
+    assert resp.status_code == 400
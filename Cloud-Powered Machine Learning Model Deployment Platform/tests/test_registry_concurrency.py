@@ -0,0 +1,70 @@
+"""A short, test-sized run of benchmarks/stress_registry.py: concurrent register, activate and
+resolve against one database must produce no errors and leave one consistent active version."""
+import collections, io, multiprocessing, threading
+from sqlalchemy import func, select
+from conftest import sklearn_artifact
+
+MODELS = ("contended-a", "contended-b")
+
+def _active_counts(names):
+    from mlserve.db import SessionLocal, Model, ModelVersion
+    with SessionLocal() as s:
+        rows = s.execute(
+            select(Model.name, func.count(ModelVersion.id))
+            .join(ModelVersion, Model.id == ModelVersion.model_id)
+            .where(Model.name.in_(names), ModelVersion.active.is_(True))
+            .group_by(Model.name)
+        ).all()
+    return dict(rows)
+
+def test_threads_register_activate_resolve(app):
+    from mlserve.app import registry
+    from mlserve.artifact_store import ArtifactStore
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    registered = collections.defaultdict(set)
+    errors = []
+
+    def hammer(wid):
+        try:
+            for i in range(15):
+                name, version = MODELS[i % len(MODELS)], f"t{wid}-{i}"
+                registry.register(name, version, "sklearn", blob=blob)
+                registered[name].add(version)
+                registry.activate(name, version)
+                active = registry.resolve_active(name)
+                # whichever thread activated last, the answer is a registered, active version
+                if active is None or active.version not in registered[name]:
+                    errors.append(f"{name}: resolved {active and active.version!r}")
+        except Exception as e:
+            errors.append(f"worker {wid}: {e!r}")
+
+    threads = [threading.Thread(target=hammer, args=(w,)) for w in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(60)
+    assert errors == []
+    assert _active_counts(MODELS) == {name: 1 for name in MODELS}
+    for name in MODELS:
+        registry.invalidate(name)
+        assert registry.resolve_active(name).version == registry.get_version(name).version
+
+def test_processes_register_activate_predict(app):
+    # separate processes with their own app instance, as gunicorn workers
+    from benchmarks.stress_registry import _worker
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(w, 2.0, 2, results)) for w in range(3)]
+    for p in procs:
+        p.start()
+    outcomes = [results.get(timeout=120) for _ in procs]
+    for p in procs:
+        p.join(30)
+    counts = collections.Counter()
+    for _, c, errs in outcomes:
+        counts.update(c)
+        assert errs == []
+    server_errors = {k: n for k, n in counts.items() if int(k.rsplit(" ", 1)[1]) >= 500}
+    assert server_errors == {}
+    assert counts["register 200"] > 0 and counts["activate 200"] > 0
+    assert _active_counts(("stress0", "stress1")) == {"stress0": 1, "stress1": 1}
@@ -0,0 +1,41 @@
+from conftest import sklearn_artifact
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"inputs": {"type": "array", "items": {
+        "type": "array", "items": {"type": "number"}, "minItems": 2, "maxItems": 2}}},
+    "required": ["inputs"],
+    "additionalProperties": False,
+}
+
+def _predict(client, auth, name, payload):
+    return client.post(f"/predict/{name}", headers=auth, json=payload)
+
+def test_cached_rows_do_not_bypass_validation(client, auth, register):
+    register("cached", "1.0", sklearn_artifact(1), options={"result_cache": True}, schema=SCHEMA)
+    client.post("/models/cached/activate", headers=auth, json={"version": "1.0"})
+    assert _predict(client, auth, "cached", {"inputs": [[1.0, 2.0]]}).status_code == 200
+
+    # every row is a cache hit, but the envelope breaks the schema
+    assert _predict(client, auth, "cached", {"inputs": [[1.0, 2.0]], "extra": 1}).status_code == 400
+    assert _predict(client, auth, "cached", {"inputs": [[1.0, 2.0], [1.0]]}).status_code == 400
+
+def test_entries_are_scoped_to_the_version(app, register):
+    from mlserve.app import registry, result_cache
+    register("scoped-a", "1.0", sklearn_artifact(1), options={"result_cache": True})
+    register("scoped-b", "1.0", sklearn_artifact(1), options={"result_cache": True})
+    registry.activate("scoped-a", "1.0")
+    registry.activate("scoped-b", "1.0")
+    a = registry.resolve_active("scoped-a")
+    lookup = result_cache.lookup(a, [[1.0, 2.0]])
+    lookup.merge(a.framework, [1])
+    assert result_cache.lookup(a, [[1.0, 2.0]]).complete
+
+    # registering or activating another model leaves these entries alone
+    register("scoped-b", "2.0", sklearn_artifact(0))
+    registry.activate("scoped-b", "2.0")
+    assert result_cache.lookup(registry.resolve_active("scoped-a"), [[1.0, 2.0]]).complete
+
+    # a new artifact for the version itself does not reuse them
+    register("scoped-a", "1.0", sklearn_artifact(0))
+    assert not result_cache.lookup(registry.resolve_active("scoped-a"), [[1.0, 2.0]]).complete
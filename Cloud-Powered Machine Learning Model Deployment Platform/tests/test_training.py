@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize("algo", ["sgd_clf", "nb"])
+def test_streaming_classifier_sees_classes_first_met_late(tmp_path, algo):
+    from mlserve.training import fit_csv_streaming
+    # 30 numeric classes, five new ones per chunk: more than auto's 20 before the last chunks
+    csv = tmp_path / "late-classes.csv"
+    rows = ["x,y"] + [f"{i % 7}.5,{i // 2}" for i in range(60)]
+    csv.write_text("\n".join(rows) + "\n")
+    pipe, score, *_ = fit_csv_streaming(str(csv), "y", algo=algo, chunk_rows=10, epochs=1)
+    assert set(pipe.named_steps["model"].classes_.tolist()) == set(range(30))
+    assert np.isfinite(score)
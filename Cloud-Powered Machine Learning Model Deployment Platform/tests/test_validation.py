@@ -0,0 +1,109 @@
+"""The compiled validators must agree with jsonschema.validate on every payload: same verdict,
+and for invalid payloads the same error message."""
+import random
+import jsonschema
+import pytest
+from mlserve.validation import SchemaValidator, TabularValidator, compile_validator
+
+# what train_csv generates for a CSV with two numeric columns and one string column
+TABULAR = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {"inputs": {"type": "array", "items": {
+        "type": "object",
+        "properties": {"sepal": {"type": "number"}, "petal": {"type": "number"}, "kind": {"type": "string"}},
+        "required": ["sepal", "petal", "kind"],
+        "additionalProperties": False,
+    }}},
+    "required": ["inputs"],
+    "additionalProperties": False,
+}
+
+MATRIX = {
+    "type": "object",
+    "properties": {"inputs": {"type": "array", "items": {
+        "type": "array", "items": {"type": "number"}, "minItems": 2, "maxItems": 2}}},
+    "required": ["inputs"],
+}
+
+ROW = {"sepal": 5.1, "petal": 1, "kind": "setosa"}
+
+TABULAR_CASES = {
+    "valid": {"inputs": [ROW, dict(ROW, sepal=4)]},
+    "empty": {"inputs": []},
+    "missing column": {"inputs": [ROW, {"sepal": 1.0, "petal": 2.0}]},
+    "extra column": {"inputs": [dict(ROW, colour="red")]},
+    "string for number": {"inputs": [dict(ROW, petal="1.4")]},
+    "number for string": {"inputs": [dict(ROW, kind=3)]},
+    "bool for number": {"inputs": [dict(ROW, sepal=True)]},
+    "null": {"inputs": [dict(ROW, kind=None)]},
+    "row not an object": {"inputs": [ROW, [5.1, 1, "setosa"]]},
+    "inputs not a list": {"inputs": ROW},
+    "missing inputs": {"rows": [ROW]},
+    "extra top-level key": {"inputs": [ROW], "extra": 1},
+    "payload not an object": [ROW],
+}
+
+MATRIX_CASES = {
+    "valid": {"inputs": [[1, 2.5], [0.0, -1]]},
+    "short row": {"inputs": [[1.0]]},
+    "long row": {"inputs": [[1.0, 2.0, 3.0]]},
+    "string value": {"inputs": [[1.0, "2"]]},
+    "extra top-level key allowed": {"inputs": [[1.0, 2.0]], "extra": 1},
+}
+
+def _outcome(check, payload):
+    try:
+        check(payload)
+    except jsonschema.ValidationError as e:
+        return e.message
+    return None
+
+def assert_parity(schema, payload, validator=None):
+    expected = _outcome(lambda p: jsonschema.validate(p, schema), payload)
+    assert _outcome((validator or compile_validator(schema)).validate, payload) == expected
+
+def test_flat_row_schema_gets_the_fast_path():
+    assert isinstance(compile_validator(TABULAR), TabularValidator)
+    assert type(compile_validator(MATRIX)) is SchemaValidator
+
+@pytest.mark.parametrize("case", TABULAR_CASES)
+def test_tabular_parity(case):
+    assert_parity(TABULAR, TABULAR_CASES[case])
+
+@pytest.mark.parametrize("case", MATRIX_CASES)
+def test_schema_validator_parity(case):
+    assert_parity(MATRIX, MATRIX_CASES[case])
+
+def test_invalid_rows_fall_back_to_jsonschema_messages():
+    validator = compile_validator(TABULAR)
+    with pytest.raises(jsonschema.ValidationError) as fast:
+        validator.validate({"inputs": [ROW, dict(ROW, petal="1.4")]})
+    with pytest.raises(jsonschema.ValidationError) as reference:
+        jsonschema.validate({"inputs": [ROW, dict(ROW, petal="1.4")]}, TABULAR)
+    assert fast.value.message == reference.value.message == "'1.4' is not of type 'number'"
+
+def test_random_payloads_parity():
+    rng = random.Random(0)
+    values = [0, -3, 2.5, float("1e300"), "x", "", True, False, None, [], {}]
+    keys = ["sepal", "petal", "kind", "other"]
+    validator = compile_validator(TABULAR)
+    for _ in range(500):
+        rows = []
+        for _ in range(rng.randint(0, 4)):
+            if rng.random() < 0.05:
+                rows.append(rng.choice(values))
+                continue
+            row = dict(ROW) if rng.random() < 0.7 else {}
+            for _ in range(rng.randint(0, 2)):
+                action = rng.random()
+                key = rng.choice(keys)
+                if action < 0.2:
+                    row.pop(key, None)
+                else:
+                    row[key] = rng.choice(values)
+            rows.append(row)
+        payload = {"inputs": rows}
+        if rng.random() < 0.05:
+            payload["extra"] = 1
+        assert_parity(TABULAR, payload, validator)
@@ -0,0 +1,47 @@
+import io
+from conftest import sklearn_artifact
+
+def test_bad_schema_is_refused_at_registration(client, auth):
+    for schema, status in ((b'{"type": 5}', 400), (b"[1, 2]", 400), (b'{"type": "object"}', 200)):
+        resp = client.post("/models/register", headers=auth, content_type="multipart/form-data", data={
+            "name": "schema-check", "version": "1.0", "framework": "sklearn",
+            "artifact": (io.BytesIO(sklearn_artifact(1)), "model.joblib"),
+            "input_schema": (io.BytesIO(schema), "schema.json")})
+        assert resp.status_code == status, schema
+
+def test_preload_reaches_ready_past_a_broken_version(app):
+    from mlserve.app import registry
+    from mlserve.artifact_store import ArtifactStore
+    from mlserve.runtime import ModelRuntime
+    from mlserve.warmup import Warmer
+    blob = ArtifactStore().put(io.BytesIO(sklearn_artifact(1)), ".joblib")
+    # a row written before registration checked schemas
+    registry.register("preload-broken", "1.0", "sklearn", blob=blob, input_schema='{"type": 5}')
+    registry.activate("preload-broken", "1.0")
+    registry.register("preload-ok", "1.0", "sklearn", blob=blob)
+    registry.activate("preload-ok", "1.0")
+
+    warmer = Warmer(registry, ModelRuntime())
+    warmer.preload()
+    status = warmer.status()
+    assert status["ready"]
+    assert status["serving"]["preload-ok"] == "1.0"
+    assert "preload-broken" in status["errors"]
+
+def test_acquire_counts_one_cache_lookup(app, register):
+    from prometheus_client import REGISTRY
+    from mlserve.app import registry
+    from mlserve.runtime import ModelRuntime
+    from mlserve.warmup import Warmer
+    register("acquire-count", "1.0", sklearn_artifact(1))
+    registry.activate("acquire-count", "1.0")
+    active = registry.resolve_active("acquire-count")
+    warmer = Warmer(registry, ModelRuntime())
+
+    def counts():
+        return tuple(REGISTRY.get_sample_value(f"mlserve_model_cache_{kind}_total") for kind in ("misses", "hits"))
+    misses, hits = counts()
+    warmer.acquire(active)
+    assert counts() == (misses + 1, hits)
+    warmer.acquire(active)
+    assert counts() == (misses + 1, hits + 1)